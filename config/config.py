@@ -32,6 +32,23 @@ BROWSER_OPTIONS = [
     "--window-size=1200,800" # 设置窗口大小
 ]
 
+# ========== WebDriver传输层配置 ==========
+# 每个驱动的keep-alive连接池大小 (连接用完时阻塞等待，不会临时新建)
+DRIVER_POOL_MAXSIZE = 4
+# 单次WebDriver HTTP请求超时时间(秒)
+DRIVER_REQUEST_TIMEOUT = 120
+
+# ========== 网络整形配置 ==========
+# 通过CDP屏蔽统计请求、跨浏览器复用静态资源磁盘缓存、可选商品图片占位 (run_tests.py netbench 对比开启前后的页面加载耗时)
+NETWORK_SHAPING = False
+NETWORK_BLOCK_PATTERNS = [
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*backtrace.io*",
+]
+NETWORK_ASSET_CACHE_DIR = "test_reports/asset_cache"  # 磁盘缓存根目录(预热缓存及各浏览器的副本)，为空则不缓存
+NETWORK_STUB_IMAGES = False                           # 商品图片替换为1×1占位图
+
 # ========== 等待时间配置 ==========
 DEFAULT_WAIT_TIME = 0.4
 IMPLICIT_WAIT_TIME = 0.4
@@ -40,6 +57,13 @@ PAGE_LOAD_TIMEOUT = 30
 # ========== 测试报告配置 ==========
 REPORTS_DIR = "test_reports"
 LOGS_DIR = "logs"
+# 历史结果库 (SQLite)，为空则不写入
+RESULTS_DB_PATH = "test_reports/results.db"
+# 失败附件(截图、页面源码、控制台日志、cookie、最近的驱动命令)
+ARTIFACTS_DIR = "test_reports/artifacts"
+ARTIFACT_MAX_BYTES = 200 * 1024 * 1024        # 单次运行附件总大小上限
+ARTIFACT_PAGE_SOURCE_MAX_BYTES = 2 * 1024 * 1024  # 单个页面源码大小上限(超出截断)
+ARTIFACT_RECENT_COMMANDS = 20                 # 保留的最近驱动命令条数
 
 # ========== URL配置 ==========
 BASE_URL = "https://www.saucedemo.com/"
@@ -47,3 +71,56 @@ BASE_URL = "https://www.saucedemo.com/"
 # ========== 测试执行配置 ==========
 # 是否在用户间切换时重启浏览器 (True: 重启浏览器, False: 只登出登入)
 RESTART_BROWSER_BETWEEN_USERS = False
+# 是否在收集阶段按代价模型重排用例 (可用 --no-smart-order 临时关闭)
+SMART_TEST_ORDERING = True
+# 重排代价模型中各操作的估算耗时(秒)
+ORDERING_COSTS = {
+    "user_switch": 3.0,   # 登出 + 登录
+    "navigation": 0.5,    # 跳转到用例起始页面
+    "reset": 0.3,         # 用例结束后重置应用状态
+    "step": 0.3,          # 一次不跳转页面的场景步骤(点击/输入)
+    "checkpoint_restore": 0.8,  # 恢复场景检查点(重写cookie和存储 + 整页加载)
+}
+# 状态审计：每个用例结束后用一次脚本调用检查应用状态是否干净 (也可用 --audit-state 开启)
+STATE_AUDIT = False
+# 场景共享前缀只执行一次，分支场景从浏览器状态检查点恢复
+SCENARIO_PREFIX_SHARING = True
+# 失败重跑：失败的场景用例在浏览器池的全新浏览器上与后续用例并行重跑 (可用 --no-rerun 临时关闭)
+RERUN_FAILED = True
+RERUN_MAX_ATTEMPTS = 2    # 每个失败用例最多重跑次数
+RERUN_POOL_SIZE = 2       # 重跑专用浏览器池大小(同时进行的重跑数)
+# 会话健康检查：用例之间探测共享浏览器，崩溃或卡死时替换浏览器并重新登录
+SESSION_HEALTH_CHECK = True
+SESSION_PING_DEADLINE = 5  # 探测命令的截止时间(秒)，超时即判定浏览器卡死
+# 时间预算(秒)：超出时中止正在进行的WebDriver调用并报告为超时，None表示不限时
+TEST_TIME_BUDGET = 120      # 每个用例(call阶段)，可用 @pytest.mark.time_budget(秒) 覆盖
+SCENARIO_STEP_BUDGET = 30   # 场景的每个步骤，可在Step(..., budget=秒)上覆盖
+PAGE_ACTION_BUDGET = 30     # 登录/登出/重置等页面对象方法
+# 表单填写：默认一次脚本调用填写整张表单(赋值后逐字段读回校验)；True时逐字段clear + send_keys模拟真实键盘输入
+FORM_KEYSTROKES = False
+# 运行指标：METRICS_PORT不为None时在本地端口提供 GET /metrics (OpenMetrics文本，0为随机端口，可用 --metrics-port 覆盖)；
+# METRICS_EXPORT为True时运行结束写出 test_reports/metrics_时间戳.txt
+METRICS_PORT = None
+METRICS_EXPORT = True
+# 实时进度面板：控制台只显示紧凑的进度视图(按用户/功能的进度、吞吐、剩余时间、最慢进行中用例、失败数)，
+# 详细日志只写入日志文件 (也可用 --dashboard 开启)；刷新间隔(秒)即刷新频率上限，剩余时间按最近N天的历史耗时估算
+PROGRESS_DASHBOARD = False
+PROGRESS_REFRESH_INTERVAL = 0.5
+PROGRESS_HISTORY_DAYS = 30
+# 用例影响分析：--record-impact 记录每个用例用到的页面对象方法/核心函数/定位器(建议夜间全量运行时记录)；
+# --impact-base REF 只运行受 git diff REF 中 pages/、core/、config/、scenarios/、conftest.py 改动影响的用例
+IMPACT_MAP_PATH = "test_reports/impact_map.json"
+IMPACT_BASE_REF = "origin/main"   # run_tests.py impact 默认的比较基准
+# 结果缓存：只读用例(场景cacheable=True 或 @pytest.mark.result_cache)在测试源码、用到的代码、用户和目标版本都没变时
+# 回放上次的通过结果 (也可用 --result-cache 开启，--force-rerun 忽略缓存重新执行并刷新条目)；
+# 依赖用例影响记录(nightly生成)，目标版本标识为空时不使用缓存 (可用 --target-build 指定)
+RESULT_CACHE = False
+RESULT_CACHE_DIR = "test_reports/result_cache"
+RESULT_CACHE_TTL = 24 * 3600     # 条目有效期(秒)，可用 @pytest.mark.result_cache(ttl=秒) 覆盖
+RESULT_CACHE_BUILD_ID = None
+
+# ========== 负载模式配置 ==========
+# 虚拟用户数、爬坡时间(秒)、每个虚拟用户的场景迭代次数
+LOAD_VIRTUAL_USERS = 5
+LOAD_RAMP_UP = 5
+LOAD_ITERATIONS = 1
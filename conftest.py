@@ -14,18 +14,120 @@ if project_root not in sys.path:
 
 from core.webdriver_utils import WebDriverManager
 from reports.test_reporter import test_reporter, TestResult
-from core.logger_config import logger
+from reports.artifacts import artifact_collector
+from core.logger_config import logger, set_console_output
 from core.exceptions import TestException
-from config import USERNAMES, PASSWORD
+from core.test_ordering import plan_order, get_case_user_index
+from core.dirty_state import dirty_state
+from core.page_state import page_state
+from core.element_cache import element_cache
+from core.metrics import run_metrics, MetricsServer
+from core.impact import impact_recorder, ImpactMap, diff_changes, select_cases
+from reports.live_progress import progress_dashboard
+from reports.result_cache import result_cache, case_source, ResultCache
+from core.rerun import rerun_manager
+from core.session_health import session_health
+from core.deadlines import time_budget
+from core.exceptions import DeadlineException
+from config import (USERNAMES, PASSWORD, SMART_TEST_ORDERING, STATE_AUDIT, RERUN_FAILED,
+                    SESSION_HEALTH_CHECK, TEST_TIME_BUDGET, METRICS_PORT, METRICS_EXPORT, PROGRESS_DASHBOARD,
+                    IMPACT_MAP_PATH, RESULT_CACHE, RESULT_CACHE_BUILD_ID)
 
 # 全局变量存储当前测试会话信息
 current_session = {
     'driver': None,
     'current_user': None,
     'user_index': 0,
-    'pages': {}
+    'pages': {},
+    'user_switch_time': 0.0,    # 本次用例切换用户的耗时(秒)
+    'phase_durations': {},      # 用例nodeid -> 已完成阶段的耗时
+    'pending_result': None,     # 等待teardown耗时回填的测试结果
+    'user_switches': 0,         # 实际发生的用户切换次数(首次登录不计)
+    'ordering': None,           # 用例重排的估算结果
+    'metrics_server': None,     # 运行指标HTTP端点
+    'impact_recording': False,  # 是否在记录用例影响
+    'cached': {}                # 用例nodeid -> (结果缓存键, 命中的缓存条目)
 }
 
+def pytest_addoption(parser):
+    parser.addoption("--no-smart-order", action="store_true", default=False,
+                     help="关闭按代价模型重排用例，保持文件中的定义顺序")
+    parser.addoption("--audit-state", action="store_true", default=False,
+                     help="每个用例结束后审计应用状态，发现未登记的改动时告警并重置")
+    parser.addoption("--no-rerun", action="store_true", default=False,
+                     help="关闭失败场景用例在独立浏览器上的重跑")
+    parser.addoption("--metrics-port", type=int, default=METRICS_PORT,
+                     help="在本地端口提供OpenMetrics指标端点 GET /metrics (0为随机端口)")
+    parser.addoption("--dashboard", action="store_true", default=PROGRESS_DASHBOARD,
+                     help="控制台显示实时进度面板，代替逐条用例输出和INFO日志(详细日志仍写入日志文件)")
+    parser.addoption("--record-impact", action="store_true", default=False,
+                     help="记录每个用例用到的页面对象方法、核心函数和定位器，合并写入用例影响记录")
+    parser.addoption("--impact-base", default=None, metavar="REF",
+                     help="只运行受 git diff REF 中 pages/、core/、config/、scenarios/、conftest.py 改动影响的用例")
+    parser.addoption("--result-cache", action="store_true", default=RESULT_CACHE,
+                     help="只读用例在代码和目标版本都没变时回放缓存的通过结果")
+    parser.addoption("--target-build", default=RESULT_CACHE_BUILD_ID, metavar="BUILD",
+                     help="被测应用的版本标识，结果缓存按版本区分")
+    parser.addoption("--force-rerun", action="store_true", default=False,
+                     help="忽略结果缓存重新执行所有用例，并刷新缓存条目")
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "depends_on(*tests): 必须在指定测试函数的所有用例之后执行")
+    config.addinivalue_line("markers", "isolated: 需要全新的用户会话，执行前强制重新登录")
+    config.addinivalue_line("markers", "navigation(start, end): 用例起始/结束页面，供重排代价模型使用")
+    config.addinivalue_line("markers", "time_budget(seconds): 用例的时间预算，覆盖TEST_TIME_BUDGET")
+    config.addinivalue_line("markers", "result_cache(ttl=None): 只读用例，可回放缓存的通过结果，ttl覆盖RESULT_CACHE_TTL")
+    
+    if config.getoption("--result-cache") and not config.getoption("--target-build"):
+        logger.warning("结果缓存已开启但未指定目标版本(--target-build)，本次不使用缓存")
+    
+    port = config.getoption("--metrics-port")
+    if port is not None and current_session['metrics_server'] is None:
+        try:
+            current_session['metrics_server'] = MetricsServer(run_metrics, port).start()
+        except OSError as e:
+            logger.warning(f"运行指标端点启动失败: {str(e)}")
+    
+    # 🔥 实时进度面板只在主进程中显示 (pytest-xdist的worker没有终端，报告会汇总到主进程)
+    if config.getoption("--dashboard") and not hasattr(config, "workerinput") \
+            and not config.pluginmanager.is_registered(progress_dashboard):
+        set_console_output("WARNING", progress_dashboard.console)
+        config.pluginmanager.register(progress_dashboard.start(), "live_progress")
+    
+    if config.getoption("--record-impact") and not current_session['impact_recording']:
+        impact_recorder.start()
+        current_session['impact_recording'] = True
+
+def pytest_collection_modifyitems(session, config, items):
+    """按改动选择受影响的用例，再按代价模型重排用例，减少用户切换和页面导航"""
+    base = config.getoption("--impact-base")
+    if base:
+        _select_impacted(config, items, base)
+    if not SMART_TEST_ORDERING or config.getoption("--no-smart-order"):
+        return
+    ordered, stats = plan_order(items)
+    items[:] = ordered
+    current_session['ordering'] = stats
+    logger.info(f"用例已重排: 预计用户切换 {stats['original_switches']} -> {stats['planned_switches']} 次, "
+                f"预计代价 {stats['original_cost']:.1f}s -> {stats['planned_cost']:.1f}s")
+
+def _select_impacted(config, items, base):
+    """只保留受 git diff base 中改动影响的端到端用例，无法判断时保留全部用例"""
+    cases = [item.nodeid for item in items if _uses_user_session(item)]
+    try:
+        changes = diff_changes(base)
+        selected, reason = select_cases(cases, ImpactMap.load(IMPACT_MAP_PATH), changes)
+    except Exception as e:
+        logger.warning(f"用例影响分析失败，运行全部用例: {str(e)}")
+        return
+    skipped = set(cases) - set(selected)
+    deselected = [item for item in items if item.nodeid in skipped]
+    if deselected:
+        items[:] = [item for item in items if item.nodeid not in skipped]
+        config.hook.pytest_deselected(items=deselected)
+    logger.info(f"用例影响分析(相对 {base}): 改动文件 {len(changes.files)} 个, {reason}, "
+                f"运行 {len(items)} 个用例, 跳过 {len(deselected)} 个")
+
 @pytest.fixture(scope="session")
 def session_driver():
     """会话级WebDriver fixture - 整个测试会话只创建一次"""
@@ -39,27 +141,46 @@ def session_driver():
         logger.error(f"会话级WebDriver初始化失败: {str(e)}")
         pytest.fail(f"会话级WebDriver初始化失败: {str(e)}")
     finally:
+        # 会话期间浏览器可能因失效被替换，关闭当前使用的实例
+        driver = current_session['driver'] or driver
         if driver:
             WebDriverManager.close_driver(driver)
             current_session['driver'] = None
             logger.info("会话级WebDriver已关闭")
 
 @pytest.fixture(scope="function")
-def user_session(session_driver):
+def user_session(session_driver, request):
     """用户会话fixture - 管理用户登录状态"""
-    from pages.page_objects import LoginPage, InventoryPage
+    from pages.page_objects import BasePage, LoginPage, InventoryPage
+    
+    driver = current_session['driver'] or session_driver
     
-    driver = session_driver
+    # 🔥 用例开始前探测共享浏览器，失效时替换并重新登录当前用户
+    if SESSION_HEALTH_CHECK and not session_health.ping(driver):
+        try:
+            driver = session_health.replace(driver, current_session['current_user'])
+            current_session['driver'] = driver
+            _invalidate_checkpoints(request.node)
+        except Exception as e:
+            logger.error(f"替换失效浏览器失败: {str(e)}")
+            pytest.fail(f"替换失效浏览器失败: {str(e)}")
     
-    # 计算当前应该使用的用户
-    user_index = current_session['user_index']
+    # 计算当前应该使用的用户：参数化用例由user_count决定(重排后仍然稳定)，否则按顺序轮换
+    user_index = get_case_user_index(request.node)
+    if user_index is None:
+        user_index = current_session['user_index']
     current_user = USERNAMES[user_index % len(USERNAMES)]
+    isolated = request.node.get_closest_marker("isolated") is not None
     
     # 检查是否需要切换用户
-    if current_session['current_user'] != current_user:
+    current_session['user_switch_time'] = 0.0
+    if current_session['current_user'] != current_user or isolated:
+        switch_start = time.perf_counter()
         try:
             # 🔥 如果有当前用户，先重置应用状态再登出
             if current_session['current_user'] is not None:
+                current_session['user_switches'] += 1
+                run_metrics.user_switches.inc()
                 try:
                     inventory_page = InventoryPage(driver)
                     
@@ -69,14 +190,10 @@ def user_session(session_driver):
                     logger.info(f"用户 {current_session['current_user']} 已登出")
                     
                 except Exception as e:
-                    logger.warning(f"重置状态或登出失败: {str(e)}")
-                    # 如果重置或登出失败，强制导航到登录页
-                    try:
-                        from config import BASE_URL
-                        driver.get(BASE_URL)
-                        time.sleep(0.2)
-                    except:
-                        pass
+                    # 登出失败时清除登录态回到登录页，这一步再失败则本次用户切换失败
+                    logger.warning(f"用户 {current_session['current_user']} 登出失败，清除登录态: {str(e)}")
+                    driver.delete_all_cookies()
+                    BasePage(driver).route_to("")
             
             # 登录新用户
             login_page = LoginPage(driver)
@@ -91,6 +208,8 @@ def user_session(session_driver):
         except Exception as e:
             logger.error(f"用户切换失败: {str(e)}")
             pytest.fail(f"用户切换失败: {str(e)}")
+        finally:
+            current_session['user_switch_time'] = time.perf_counter() - switch_start
     
     # 返回当前用户信息和driver
     yield {
@@ -99,8 +218,26 @@ def user_session(session_driver):
         'user_index': user_index
     }
 
+def _uses_user_session(item):
+    """是否为SauceDemo端到端用例(使用user_session)；报告、结果库、重跑和影响记录只处理这类用例，
+    tests/下基础设施的单元测试不计入"""
+    return "user_session" in getattr(item, "fixturenames", ())
+
+def _record_impact_phase(item, when):
+    """切换影响记录的目标，非端到端用例运行期间暂停记录"""
+    if not current_session['impact_recording']:
+        return
+    if _uses_user_session(item):
+        impact_recorder.phase(item.nodeid, when)
+    else:
+        impact_recorder.pause()
+
 def pytest_runtest_setup(item):
     """测试用例设置钩子"""
+    _record_impact_phase(item, "setup")
+    if not _uses_user_session(item):
+        return
+    
     # 在每个测试功能的第一个用户测试前重置用户索引
     test_name = item.name.split('[')[0]  # 去除参数化部分
     
@@ -109,12 +246,65 @@ def pytest_runtest_setup(item):
         current_session['user_index'] = 0
         pytest_runtest_setup.last_test_name = test_name
         logger.info(f"开始新测试功能: {test_name}")
+    
+    _check_result_cache(item)
+
+def _check_result_cache(item):
+    """只读用例命中结果缓存时跳过执行(在fixture之前，不切换用户也不打开页面)，由makereport回放结果"""
+    marker = item.get_closest_marker("result_cache")
+    user_index = get_case_user_index(item)
+    build_id = item.config.getoption("--target-build")
+    if marker is None or user_index is None or not build_id or not item.config.getoption("--result-cache"):
+        return
+    try:
+        key = result_cache.key(item.nodeid, case_source(item.function), USERNAMES[user_index], str(build_id))
+    except Exception as e:
+        logger.warning(f"计算结果缓存键失败: {str(e)}")
+        return
+    if key is None:
+        return
+    entry = None if item.config.getoption("--force-rerun") else result_cache.lookup(key, marker.kwargs.get("ttl"))
+    current_session['cached'][item.nodeid] = (key, entry)
+    if entry is not None:
+        pytest.skip(f"结果缓存命中: {entry['execution_time']} 在版本 {build_id} 上通过")
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    """在用例的时间预算内执行测试主体，超出时中止正在进行的WebDriver调用"""
+    marker = item.get_closest_marker("time_budget")
+    budget = marker.args[0] if marker else TEST_TIME_BUDGET
+    _record_impact_phase(item, "call")
+    with time_budget(budget, f"用例 {item.name}"):
+        return (yield)
+
+def pytest_runtest_teardown(item):
+    """用例teardown阶段的调用(fixture清理)记为所有用例共享"""
+    _record_impact_phase(item, "teardown")
 
 @pytest.hookimpl(tryfirst=True, hookwrapper=True)
 def pytest_runtest_makereport(item, call):
     """收集测试结果的钩子函数"""
     outcome = yield
     rep = outcome.get_result()
+    if not _uses_user_session(item):
+        return
+    
+    # 记录各阶段耗时 (pytest的rep.duration基于单调时钟)
+    current_session['phase_durations'].setdefault(item.nodeid, {})[rep.when] = rep.duration
+    
+    cached = current_session['cached'].get(item.nodeid)
+    if rep.when == "setup" and rep.skipped and cached is not None and cached[1] is not None:
+        test_reporter.add_test_result(ResultCache.replay(cached[1]))
+        run_metrics.tests.inc("cached")
+    
+    if rep.when == "teardown":
+        current_session['cached'].pop(item.nodeid, None)
+        phases = current_session['phase_durations'].pop(item.nodeid, {})
+        pending = current_session.get('pending_result')
+        if pending is not None:
+            pending.teardown_duration = phases.get("teardown", 0.0)
+            pending.update_duration()
+            current_session['pending_result'] = None
     
     if rep.when == "call":
         test_name = item.name.split('[')[0] if '[' in item.name else item.name
@@ -123,6 +313,8 @@ def pytest_runtest_makereport(item, call):
         username = current_session.get('current_user', '')
         
         status = "PASSED" if rep.passed else "FAILED"
+        if rep.failed and call.excinfo is not None and call.excinfo.errisinstance(DeadlineException):
+            status = "TIMEOUT"
         execution_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
         error_message = ""
@@ -136,6 +328,15 @@ def pytest_runtest_makereport(item, call):
                         error_message = '\n'.join(assertion_lines[:3])
             except Exception as e:
                 error_message = f"错误信息处理失败: {str(e)}"
+        if status == "TIMEOUT":
+            error_message = str(call.excinfo.value)
+        
+        # 🔥 失败后探测共享浏览器：会话失效时本用例记为ERROR，不再对失效的浏览器采集附件
+        session_lost = (rep.failed and SESSION_HEALTH_CHECK and current_session.get('driver') is not None
+                        and not session_health.ping(current_session['driver']))
+        if session_lost:
+            status = "ERROR"
+            error_message = f"{session_health.last_error}\n{error_message}"
         
         description = item.function.__doc__ or ""
         
@@ -145,24 +346,103 @@ def pytest_runtest_makereport(item, call):
             status=status,
             execution_time=execution_time,
             error_message=error_message,
-            description=description
+            description=description,
+            setup_duration=current_session['phase_durations'].get(item.nodeid, {}).get("setup", 0.0),
+            call_duration=rep.duration,
+            user_switch_duration=current_session.get('user_switch_time', 0.0)
         )
         
+        # 🔥 失败时采集附件(截图、页面源码等)，写盘在后台线程完成
+        if rep.failed and current_session.get('driver') and not session_lost:
+            try:
+                record = artifact_collector.capture(current_session['driver'], f"{item.name}_{username}", error_message)
+                test_result.artifact_dir = record.directory
+                test_result.artifact_files = record.files
+                _attach_html_extras(item, rep, record)
+            except Exception as e:
+                logger.warning(f"采集失败附件失败: {str(e)}")
+        
         test_reporter.add_test_result(test_result)
+        run_metrics.tests.inc(status.lower())
+        run_metrics.test_duration.observe(rep.duration)
         
-        # 🔥 每个测试用例完成后，执行应用状态重置
+        # 失败的用例可能停在任意页面，下次导航前重新查询浏览器
+        if rep.failed and current_session.get('driver'):
+            page_state.forget(current_session['driver'])
+        
+        # 替换失效的浏览器并重新登录，后续用例不受影响
+        if session_lost:
+            try:
+                current_session['driver'] = session_health.replace(current_session['driver'], username)
+                _invalidate_checkpoints(item)
+            except Exception as e:
+                logger.error(f"替换失效浏览器失败，下一个用例开始前重试: {str(e)}")
+        
+        # 🔥 失败的场景用例提交到独立浏览器上重跑，与后续用例并行执行
+        scenario = getattr(item.function, "scenario", None)
+        if rep.failed and scenario is not None and RERUN_FAILED and not item.config.getoption("--no-rerun"):
+            try:
+                rerun_manager.submit(test_result, scenario, username)
+            except Exception as e:
+                logger.warning(f"提交失败重跑失败: {str(e)}")
+        
+        # 🔥 每个测试用例完成后，只重置被改动过的应用状态
+        reset_start = time.perf_counter()
         try:
             if current_session.get('driver') and current_session.get('current_user'):
                 from pages.page_objects import InventoryPage
-                inventory_page = InventoryPage(current_session['driver'])
-                inventory_page.reset_app_state()
-                logger.info(f"测试用例 {test_name} 完成后应用状态已重置")
+                driver = current_session['driver']
+                inventory_page = InventoryPage(driver)
+                changed = dirty_state.pop(driver)
+                if changed:
+                    inventory_page.reset_app_state(changed)
+                    dirty_state.stats['resets'] += 1
+                    logger.info(f"测试用例 {test_name} 完成后应用状态已重置: {', '.join(sorted(changed))}")
+                else:
+                    dirty_state.stats['skipped'] += 1
+                    logger.debug(f"测试用例 {test_name} 未改动应用状态，跳过重置")
+                
+                if STATE_AUDIT or item.config.getoption("--audit-state"):
+                    leaks = inventory_page.audit_app_state()
+                    if leaks:
+                        dirty_state.stats['leaks'] += 1
+                        logger.warning(f"状态审计: 测试用例 {test_name} 残留未重置的状态 {', '.join(sorted(leaks))}，执行补充重置")
+                        inventory_page.reset_app_state(leaks)
         except Exception as e:
             logger.warning(f"测试用例完成后重置状态失败: {str(e)}")
+        test_result.reset_duration = time.perf_counter() - reset_start
+        test_result.update_duration()
+        current_session['pending_result'] = test_result
+        
+        # 只缓存通过的结果，失败时删除旧条目
+        if cached is not None:
+            try:
+                if status == "PASSED":
+                    result_cache.store(cached[0], test_result)
+                else:
+                    result_cache.invalidate(cached[0])
+            except OSError as e:
+                logger.warning(f"写入结果缓存失败: {str(e)}")
         
         # 测试完成后，增加用户索引以便下个测试使用下个用户
         current_session['user_index'] += 1
 
+def _invalidate_checkpoints(item):
+    """替换失效的浏览器后丢弃场景检查点，共享前缀在新浏览器上重新执行"""
+    planner = getattr(item.cls, "scenario_planner", None)
+    if planner:
+        planner.invalidate()
+
+def _attach_html_extras(item, rep, record):
+    """pytest-html可用时在HTML报告中附上失败截图和附件目录(不等待后台线程写盘)"""
+    if not item.config.pluginmanager.hasplugin("html"):
+        return
+    try:
+        import pytest_html
+    except ImportError:
+        return
+    rep.extras = getattr(rep, "extras", []) + record.html_extras(pytest_html.extras)
+
 def pytest_sessionfinish(session, exitstatus):
     """测试会话结束时保存结果到Excel"""
     try:
@@ -171,18 +451,55 @@ def pytest_sessionfinish(session, exitstatus):
             try:
                 from pages.page_objects import InventoryPage
                 inventory_page = InventoryPage(current_session['driver'])
-                inventory_page.reset_app_state()
+                inventory_page.reset_app_state(dirty_state.pop(current_session['driver']))
                 inventory_page.logout()
                 logger.info("测试会话结束，应用状态已重置并登出")
             except Exception as e:
                 logger.warning(f"会话结束时重置状态失败: {str(e)}")
         
+        ordering = current_session.get('ordering')
+        if ordering:
+            logger.info(f"用户切换次数: 预计 {ordering['planned_switches']}, 实际 {current_session['user_switches']} "
+                        f"(未重排预计 {ordering['original_switches']})")
+        stats = dirty_state.stats
+        logger.info(f"应用状态重置: 执行 {stats['resets']} 次, 跳过 {stats['skipped']} 次, 审计发现残留 {stats['leaks']} 次")
+        pages = page_state.stats
+        logger.info(f"页面状态: 按记录判断 {pages['tracked']} 次, 查询浏览器 {pages['queried']} 次")
+        elements = element_cache.stats
+        logger.info(f"元素缓存: 命中 {elements['hits']} 次, 未命中 {elements['misses']} 次, "
+                    f"失效 {elements['stale']} 次 (命中率 {element_cache.hit_rate():.1f}%)")
+        cache = result_cache.stats
+        if cache['hits'] or cache['stored'] or cache['uncacheable']:
+            logger.info(f"结果缓存: 命中 {cache['hits']} 次, 未命中 {cache['misses']} 次, 过期 {cache['expired']} 次, "
+                        f"写入 {cache['stored']} 次, 失效 {cache['invalidated']} 次, "
+                        f"无影响记录 {cache['uncacheable']} 次")
+        health = session_health.stats
+        if health['replaced'] or health['dead'] or health['hung']:
+            logger.warning(f"会话健康检查: 探测 {health['pings']} 次, 崩溃 {health['dead']} 次, "
+                           f"卡死 {health['hung']} 次, 替换浏览器 {health['replaced']} 次")
+        
+        # 等待失败重跑得出结论、后台线程写完失败附件，报告才完整
+        rerun_manager.close()
+        artifact_collector.close()
+        
         if test_reporter.test_results:
             filepath = test_reporter.save_results_to_excel()
+            test_reporter.save_results_to_store()
             if filepath:
                 summary = test_reporter.get_test_summary()
                 logger.info(f"测试摘要: {summary}")
+            if METRICS_EXPORT:
+                run_metrics.write()
         else:
             logger.warning("没有测试结果需要保存")
+        
+        if current_session['impact_recording']:
+            impact_recorder.stop()
+            current_session['impact_recording'] = False
+            ImpactMap.load(IMPACT_MAP_PATH).merge(impact_recorder).save(IMPACT_MAP_PATH)
+        
+        if current_session['metrics_server'] is not None:
+            current_session['metrics_server'].stop()
+            current_session['metrics_server'] = None
     except Exception as e:
         logger.error(f"pytest_sessionfinish执行失败: {str(e)}")
\ No newline at end of file
@@ -1,3 +1,4 @@
 from .exceptions import *
 from .logger_config import logger
-from .webdriver_utils import WebDriverManager, ElementOperations
\ No newline at end of file
+from .webdriver_utils import WebDriverManager, ElementOperations
+from .async_webdriver import AsyncWebDriverManager, AsyncElementOperations
\ No newline at end of file
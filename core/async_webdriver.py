@@ -0,0 +1,385 @@
+"""
+异步WebDriver客户端 - 基于asyncio的W3C WebDriver协议实现
+
+单个事件循环即可同时驱动多个浏览器会话，不再需要一个浏览器一个线程。
+到同一驱动服务器的HTTP连接通过连接池复用(keep-alive)。
+"""
+import asyncio
+import json
+import time
+from urllib.parse import urlparse
+
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException
+from selenium.webdriver.remote.errorhandler import ErrorHandler
+from selenium.webdriver.remote.locator_converter import LocatorConverter
+
+from config import BROWSER_OPTIONS, DEFAULT_WAIT_TIME, IMPLICIT_WAIT_TIME, PAGE_LOAD_TIMEOUT
+from core.logger_config import logger
+from core.exceptions import ElementException
+
+ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+
+# 等待元素时的轮询间隔(秒)
+POLL_FREQUENCY = 0.05
+
+
+class AsyncConnectionPool:
+    """按(host, port)分组的异步HTTP/1.1 keep-alive连接池"""
+
+    def __init__(self, max_connections_per_host=32, request_timeout=120):
+        self.max_connections_per_host = max_connections_per_host
+        self.request_timeout = request_timeout
+        self._idle = {}
+        self._semaphores = {}
+        self.stats = {"requests": 0, "connections_opened": 0, "connections_reused": 0}
+
+    def _semaphore(self, key):
+        if key not in self._semaphores:
+            self._semaphores[key] = asyncio.Semaphore(self.max_connections_per_host)
+        return self._semaphores[key]
+
+    async def _acquire(self, key):
+        """取出空闲连接或新建连接，返回(reader, writer, 是否复用)"""
+        idle = self._idle.setdefault(key, [])
+        while idle:
+            reader, writer = idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                self.stats["connections_reused"] += 1
+                return reader, writer, True
+            writer.close()
+        reader, writer = await asyncio.open_connection(*key)
+        self.stats["connections_opened"] += 1
+        return reader, writer, False
+
+    def _release(self, key, reader, writer, keep_alive):
+        if keep_alive and not writer.is_closing():
+            self._idle.setdefault(key, []).append((reader, writer))
+        else:
+            writer.close()
+
+    async def request(self, method, url, payload=None):
+        """发送一次HTTP请求，返回(状态码, 响应体文本)"""
+        parsed = urlparse(url)
+        key = (parsed.hostname, parsed.port or 80)
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        path = parsed.path + (f"?{parsed.query}" if parsed.query else "")
+        head = (
+            f"{method} {path} HTTP/1.1\r\n"
+            f"Host: {parsed.hostname}:{key[1]}\r\n"
+            "Accept: application/json\r\n"
+            "Content-Type: application/json;charset=UTF-8\r\n"
+            "Connection: keep-alive\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n"
+        ).encode("ascii")
+
+        async with self._semaphore(key):
+            for attempt in range(2):
+                reader, writer, reused = await self._acquire(key)
+                try:
+                    writer.write(head + body)
+                    await writer.drain()
+                    status, data, keep_alive = await asyncio.wait_for(
+                        self._read_response(reader), self.request_timeout
+                    )
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    writer.close()
+                    # 复用的连接可能已被服务端关闭，换新连接重试一次
+                    if reused and attempt == 0:
+                        continue
+                    raise
+                except BaseException:
+                    writer.close()
+                    raise
+                break
+            self.stats["requests"] += 1
+            self._release(key, reader, writer, keep_alive)
+        return status, data
+
+    @staticmethod
+    async def _read_response(reader):
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("连接已被服务端关闭")
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    await reader.readline()
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+            data = b"".join(chunks)
+        else:
+            data = await reader.readexactly(int(headers.get("content-length", 0)))
+
+        keep_alive = headers.get("connection", "").lower() != "close"
+        return status, data.decode("utf-8"), keep_alive
+
+    async def close(self):
+        for connections in self._idle.values():
+            for _, writer in connections:
+                writer.close()
+        self._idle.clear()
+
+
+class AsyncWebElement:
+    """异步元素引用"""
+
+    def __init__(self, session, element_id):
+        self.session = session
+        self.id = element_id
+
+    def _path(self, suffix=""):
+        return f"/element/{self.id}{suffix}"
+
+    async def find_element(self, by, value):
+        return await self.session._find(by, value, self._path("/element"))
+
+    async def find_elements(self, by, value):
+        return await self.session._find(by, value, self._path("/elements"))
+
+    async def click(self):
+        await self.session.execute("POST", self._path("/click"), {})
+
+    async def clear(self):
+        await self.session.execute("POST", self._path("/clear"), {})
+
+    async def send_keys(self, text):
+        await self.session.execute("POST", self._path("/value"), {"text": text, "value": list(text)})
+
+    async def text(self):
+        return await self.session.execute("GET", self._path("/text"))
+
+    async def get_attribute(self, name):
+        return await self.session.execute("GET", self._path(f"/attribute/{name}"))
+
+    async def get_property(self, name):
+        return await self.session.execute("GET", self._path(f"/property/{name}"))
+
+    async def is_enabled(self):
+        return await self.session.execute("GET", self._path("/enabled"))
+
+    async def is_displayed(self):
+        return await self.session.execute("GET", self._path("/displayed"))
+
+
+class AsyncWebDriver:
+    """异步WebDriver会话，接口与Selenium的同步driver对应，方法均为协程"""
+
+    _error_handler = ErrorHandler()
+    _locator_converter = LocatorConverter()
+
+    def __init__(self, server_url, pool):
+        self.server_url = server_url.rstrip("/")
+        self.pool = pool
+        self.session_id = None
+
+    async def start_session(self, capabilities=None):
+        """创建浏览器会话"""
+        if capabilities is None:
+            capabilities = {
+                "browserName": "MicrosoftEdge",
+                "ms:edgeOptions": {"args": list(BROWSER_OPTIONS)},
+            }
+        value = await self._command("POST", "/session", {"capabilities": {"alwaysMatch": capabilities}})
+        self.session_id = value["sessionId"]
+        await self.execute("POST", "/timeouts", {
+            "implicit": int(IMPLICIT_WAIT_TIME * 1000),
+            "pageLoad": int(PAGE_LOAD_TIMEOUT * 1000),
+        })
+        return self
+
+    async def _command(self, method, path, payload=None):
+        status, data = await self.pool.request(method, self.server_url + path, payload)
+        if status >= 400:
+            self._error_handler.check_response({"status": status, "value": data})
+        value = json.loads(data).get("value") if data else None
+        return self._unwrap(value)
+
+    async def execute(self, method, path, payload=None):
+        """执行会话内命令"""
+        return await self._command(method, f"/session/{self.session_id}{path}", payload)
+
+    def _unwrap(self, value):
+        if isinstance(value, dict):
+            if ELEMENT_KEY in value:
+                return AsyncWebElement(self, value[ELEMENT_KEY])
+            return {k: self._unwrap(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self._unwrap(v) for v in value]
+        return value
+
+    def _wrap(self, value):
+        if isinstance(value, AsyncWebElement):
+            return {ELEMENT_KEY: value.id}
+        if isinstance(value, (list, tuple)):
+            return [self._wrap(v) for v in value]
+        if isinstance(value, dict):
+            return {k: self._wrap(v) for k, v in value.items()}
+        return value
+
+    async def _find(self, by, value, path):
+        using, selector = self._locator_converter.convert(by, value)
+        return await self.execute("POST", path, {"using": using, "value": selector})
+
+    async def get(self, url):
+        await self.execute("POST", "/url", {"url": url})
+
+    async def current_url(self):
+        return await self.execute("GET", "/url")
+
+    async def title(self):
+        return await self.execute("GET", "/title")
+
+    async def find_element(self, by, value):
+        return await self._find(by, value, "/element")
+
+    async def find_elements(self, by, value):
+        return await self._find(by, value, "/elements")
+
+    async def execute_script(self, script, *args):
+        return await self.execute("POST", "/execute/sync", {"script": script, "args": self._wrap(list(args))})
+
+    async def get_cookies(self):
+        return await self.execute("GET", "/cookie")
+
+    async def add_cookie(self, cookie):
+        await self.execute("POST", "/cookie", {"cookie": cookie})
+
+    async def delete_all_cookies(self):
+        await self.execute("DELETE", "/cookie")
+
+    async def quit(self):
+        if self.session_id:
+            try:
+                await self._command("DELETE", f"/session/{self.session_id}")
+            finally:
+                self.session_id = None
+
+
+class AsyncWebDriverManager:
+    """异步WebDriver管理器 - 多个会话共享同一个连接池"""
+
+    def __init__(self, server_url, max_connections_per_host=32):
+        self.server_url = server_url
+        self.pool = AsyncConnectionPool(max_connections_per_host=max_connections_per_host)
+        self.drivers = []
+
+    async def create_driver(self, capabilities=None):
+        """创建异步WebDriver实例"""
+        try:
+            driver = await AsyncWebDriver(self.server_url, self.pool).start_session(capabilities)
+            self.drivers.append(driver)
+            logger.debug(f"异步WebDriver创建成功: {driver.session_id}")
+            return driver
+        except Exception as e:
+            logger.error(f"创建异步WebDriver失败: {str(e)}")
+            raise ElementException(f"创建异步WebDriver失败: {str(e)}", e)
+
+    async def close_driver(self, driver):
+        """关闭异步WebDriver"""
+        try:
+            await driver.quit()
+        except Exception as e:
+            logger.warning(f"关闭异步WebDriver时出现异常: {str(e)}")
+        finally:
+            if driver in self.drivers:
+                self.drivers.remove(driver)
+
+    async def close(self):
+        """关闭所有会话和连接"""
+        await asyncio.gather(*(self.close_driver(driver) for driver in list(self.drivers)))
+        await self.pool.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+
+class AsyncElementOperations:
+    """异步元素操作类，与ElementOperations一一对应"""
+
+    async def _wait_for(self, finder, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                result = await finder()
+                if result:
+                    return result
+            except (NoSuchElementException, StaleElementReferenceException):
+                pass
+            if time.monotonic() >= deadline:
+                raise TimeoutException()
+            await asyncio.sleep(POLL_FREQUENCY)
+
+    async def safe_find_element(self, driver, by, value, timeout=DEFAULT_WAIT_TIME):
+        """安全查找元素"""
+        try:
+            element = await self._wait_for(lambda: driver.find_element(by, value), timeout)
+            logger.debug(f"成功找到元素: {by}={value}")
+            return element
+        except TimeoutException:
+            logger.error(f"查找元素超时: {by}={value}")
+            raise ElementException(f"查找元素超时: {by}={value}")
+        except Exception as e:
+            logger.error(f"查找元素失败: {by}={value}, 错误: {str(e)}")
+            raise ElementException(f"查找元素失败: {by}={value}", e)
+
+    async def safe_find_elements(self, driver, by, value, timeout=DEFAULT_WAIT_TIME):
+        """安全查找多个元素"""
+        try:
+            elements = await self._wait_for(lambda: driver.find_elements(by, value), timeout)
+            logger.debug(f"成功找到 {len(elements)} 个元素: {by}={value}")
+            return elements
+        except TimeoutException:
+            logger.warning(f"查找元素超时: {by}={value}")
+            return []
+        except Exception as e:
+            logger.error(f"查找元素失败: {by}={value}, 错误: {str(e)}")
+            return []
+
+    async def safe_click(self, driver, element, timeout=DEFAULT_WAIT_TIME):
+        """安全点击元素"""
+        try:
+            async def clickable():
+                return await element.is_displayed() and await element.is_enabled()
+
+            await self._wait_for(clickable, timeout)
+            await element.click()
+            logger.debug("元素点击成功")
+            await asyncio.sleep(0.1)  # 短暂等待
+        except Exception as e:
+            logger.error(f"点击元素失败: {str(e)}")
+            raise ElementException(f"点击元素失败: {str(e)}", e)
+
+    async def safe_send_keys(self, element, text):
+        """安全输入文本"""
+        try:
+            await element.clear()
+            await element.send_keys(text)
+            logger.debug(f"文本输入成功: {text}")
+        except Exception as e:
+            logger.error(f"输入文本失败: {str(e)}")
+            raise ElementException(f"输入文本失败: {str(e)}", e)
+
+    async def safe_get_text(self, element):
+        """安全获取元素文本"""
+        try:
+            text = await element.text()
+            logger.debug(f"获取文本成功: {text}")
+            return text
+        except Exception as e:
+            logger.error(f"获取文本失败: {str(e)}")
+            raise ElementException(f"获取文本失败: {str(e)}", e)
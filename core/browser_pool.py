@@ -0,0 +1,103 @@
+"""
+浏览器池 - 复用已创建的WebDriver实例，供并发场景按需借还
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+from core.logger_config import logger
+from core.metrics import run_metrics
+from core.exceptions import ElementException
+from core.webdriver_utils import WebDriverManager
+
+
+class BrowserPool:
+    """WebDriver实例池，按需创建，最多size个"""
+
+    def __init__(self, size, factory=None, name="default"):
+        self.size = size
+        self.name = name
+        self.factory = factory or WebDriverManager.create_driver
+        self._idle = []      # 空闲浏览器(后进先出)
+        self._drivers = []   # 已创建的浏览器，None为正在创建的占位
+        # 空闲浏览器归还或名额(丢弃/创建失败)空出时唤醒等待者
+        self._lock = threading.Condition()
+        self._closed = False
+        self.stats = {"created": 0, "acquired": 0, "discarded": 0, "in_use": 0, "wait_time": 0.0}
+        run_metrics.track_pool(self)
+
+    def acquire(self, timeout=None):
+        """借出一个浏览器；池满时等待其他使用者归还"""
+        start = time.perf_counter()
+        deadline = None if timeout is None else start + timeout
+        with self._lock:
+            while True:
+                if self._idle:
+                    driver = self._idle.pop()
+                    break
+                if len(self._drivers) < self.size:
+                    # 先占位，避免并发时超出上限
+                    self._drivers.append(None)
+                    driver = None
+                    break
+                remaining = None if deadline is None else deadline - time.perf_counter()
+                if remaining is not None and remaining <= 0:
+                    raise ElementException(f"等待空闲浏览器超时: {timeout}s")
+                self._lock.wait(remaining)
+        if driver is None:
+            try:
+                driver = self.factory()
+            except Exception:
+                with self._lock:
+                    self._drivers.remove(None)
+                    self._lock.notify()
+                raise
+            with self._lock:
+                self._drivers[self._drivers.index(None)] = driver
+                self.stats["created"] += 1
+        with self._lock:
+            self.stats["acquired"] += 1
+            self.stats["in_use"] += 1
+            self.stats["wait_time"] += time.perf_counter() - start
+        return driver
+
+    def release(self, driver, discard=False):
+        """归还浏览器；discard=True时关闭该实例(如浏览器状态已不可信)"""
+        with self._lock:
+            self.stats["in_use"] -= 1
+            if discard or self._closed:
+                if driver in self._drivers:
+                    self._drivers.remove(driver)
+                self.stats["discarded"] += int(discard)
+            else:
+                self._idle.append(driver)
+            self._lock.notify()
+        if discard or self._closed:
+            WebDriverManager.close_driver(driver)
+
+    @contextmanager
+    def browser(self, timeout=None):
+        """借用浏览器的上下文管理器，出现异常时丢弃该实例"""
+        driver = self.acquire(timeout)
+        try:
+            yield driver
+        except Exception:
+            self.release(driver, discard=True)
+            raise
+        else:
+            self.release(driver)
+
+    def utilisation(self):
+        """当前池利用率(0~1)"""
+        with self._lock:
+            return self.stats["in_use"] / self.size if self.size else 0.0
+
+    def close(self):
+        """关闭池中所有浏览器"""
+        with self._lock:
+            self._closed = True
+            drivers = [driver for driver in self._drivers if driver is not None]
+            self._drivers = []
+        for driver in drivers:
+            WebDriverManager.close_driver(driver)
+        logger.info(f"浏览器池已关闭，共创建 {self.stats['created']} 个浏览器")
@@ -0,0 +1,97 @@
+"""
+时间预算 - 为用例、场景步骤和页面对象方法声明时间预算，超出时中止正在进行的WebDriver调用
+
+预算按线程嵌套记录，生效的截止时间取所有外层预算中最早的一个。
+传输层在发送每条命令前检查截止时间，并把HTTP请求的超时缩短到剩余预算，
+因此卡住的WebDriver调用会在预算用完时被中止，而不是等到DRIVER_REQUEST_TIMEOUT。
+预算用完后抛出的任何异常都转换为DeadlineException，报告为超时并指明超时所在的步骤。
+"""
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from core.exceptions import DeadlineException
+
+_local = threading.local()
+
+
+@dataclass
+class Budget:
+    """一个时间预算"""
+    label: str
+    seconds: float
+    expires_at: float
+
+
+def _stack():
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+def _overrun():
+    """已经用完的预算中截止时间最早的一个，没有则返回None"""
+    now = time.monotonic()
+    expired = [budget for budget in _stack() if budget.expires_at <= now]
+    return min(expired, key=lambda budget: budget.expires_at) if expired else None
+
+
+def _timeout_error(overrun, original_exception=None):
+    step = _stack()[-1].label
+    message = f"{overrun.label} 超出时间预算 {overrun.seconds}s"
+    if step != overrun.label:
+        message += f"，超时发生在 {step}"
+    return DeadlineException(message, original_exception, step=step)
+
+
+def remaining():
+    """当前线程剩余的预算(秒)，没有预算时返回None"""
+    stack = _stack()
+    if not stack:
+        return None
+    return min(budget.expires_at for budget in stack) - time.monotonic()
+
+
+def check():
+    """预算已用完时抛出DeadlineException"""
+    overrun = _overrun()
+    if overrun is not None:
+        raise _timeout_error(overrun)
+
+
+@contextmanager
+def time_budget(seconds, label):
+    """在预算内执行代码块，seconds为None或0时不限时"""
+    if not seconds:
+        yield None
+        return
+    stack = _stack()
+    budget = Budget(label, seconds, time.monotonic() + seconds)
+    stack.append(budget)
+    try:
+        yield budget
+    except DeadlineException:
+        raise
+    except Exception as e:
+        # 页面对象会把底层异常包装为业务异常，预算用完时统一报告为超时
+        overrun = _overrun()
+        if overrun is None:
+            raise
+        raise _timeout_error(overrun, e) from e
+    finally:
+        stack.pop()
+
+
+def budgeted(seconds, label=None):
+    """为页面对象方法声明时间预算的装饰器"""
+    def decorator(func):
+        name = label or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with time_budget(seconds, name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,46 @@
+"""
+应用状态脏标记 - 页面对象在改变应用状态(购物车、结账、排序)时登记，用例结束后只重置被改动的部分
+
+脏标记按driver记录(每个浏览器会话一份)，driver被回收后自动释放。
+"""
+import threading
+import weakref
+
+# 可追踪的应用状态
+CART = "cart"           # 购物车内容(localStorage)
+CHECKOUT = "checkout"   # 结账信息/结账流程页面
+SORT = "sort"           # 商品列表排序选项
+STATE_KINDS = frozenset((CART, CHECKOUT, SORT))
+
+
+class DirtyStateTracker:
+    """按浏览器会话记录被改动过的应用状态"""
+
+    def __init__(self):
+        self._dirty = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self.stats = {"resets": 0, "skipped": 0, "leaks": 0}
+
+    def mark(self, driver, *kinds):
+        """登记driver所在会话中被改动的状态"""
+        with self._lock:
+            self._dirty.setdefault(driver, set()).update(kinds)
+
+    def peek(self, driver):
+        """查看当前的脏状态(不清除)"""
+        with self._lock:
+            return frozenset(self._dirty.get(driver, ()))
+
+    def pop(self, driver):
+        """取出并清除当前的脏状态"""
+        with self._lock:
+            return self._dirty.pop(driver, set())
+
+    def clear(self, driver):
+        """状态已恢复干净(如重置或登出之后)"""
+        with self._lock:
+            self._dirty.pop(driver, None)
+
+
+# 全局脏标记实例
+dirty_state = DirtyStateTracker()
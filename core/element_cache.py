@@ -0,0 +1,55 @@
+"""
+元素句柄缓存 - 同一页面状态内按定位器复用已找到的元素，重复查找不再发送WebDriver命令
+
+缓存按driver记录(每个浏览器会话一份)，driver被回收后自动释放。
+页面跳转时(页面状态机登记到达新页面或状态变为不确定)清空该driver的缓存；
+使用缓存的元素遇到StaleElementReferenceException时移除该条目，由调用方重新查找。
+只应缓存页面内位置固定的元素(菜单、购物车链接、排序下拉框等)，
+元素列表(商品、加购按钮)会随操作增减或重新排序，不做缓存。
+"""
+import threading
+import weakref
+
+
+class ElementCache:
+    """按浏览器会话和定位器缓存元素句柄"""
+
+    def __init__(self):
+        self._entries = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "stale": 0}
+
+    def get(self, driver, locator):
+        """查找缓存的元素，未缓存时返回None"""
+        with self._lock:
+            element = self._entries.get(driver, {}).get(locator)
+            self.stats["hits" if element is not None else "misses"] += 1
+            return element
+
+    def put(self, driver, locator, element):
+        with self._lock:
+            self._entries.setdefault(driver, {})[locator] = element
+
+    def evict(self, driver, element):
+        """移除已失效元素的条目，返回其定位器(元素未缓存时返回None)"""
+        with self._lock:
+            entries = self._entries.get(driver, {})
+            for locator, found in list(entries.items()):
+                if found == element:
+                    del entries[locator]
+                    self.stats["stale"] += 1
+                    return locator
+            return None
+
+    def clear(self, driver):
+        """页面跳转后旧页面的元素全部失效"""
+        with self._lock:
+            self._entries.pop(driver, None)
+
+    def hit_rate(self):
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups * 100 if lookups else 0.0
+
+
+# 全局元素句柄缓存实例
+element_cache = ElementCache()
@@ -31,4 +31,10 @@ class CheckoutException(TestException):
 
 class ProductException(TestException):
     """产品操作相关异常"""
-    pass
\ No newline at end of file
+    pass
+
+class DeadlineException(TestException):
+    """时间预算超限异常"""
+    def __init__(self, message, original_exception=None, step=""):
+        super().__init__(message, original_exception)
+        self.step = step
\ No newline at end of file
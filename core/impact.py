@@ -0,0 +1,398 @@
+"""
+用例影响分析 - 记录每个用例用到的页面对象方法、核心函数和元素定位器，按git diff只选出受影响的用例
+
+记录(--record-impact)：用例执行期间用sys.setprofile记录主线程调用到的 pages/、core/、config/、scenarios/
+和 conftest.py 中的函数，
+以及查找元素时传入的定位器(按值反查为源码中的定位器常量)。
+setup/teardown阶段的调用(创建浏览器、用户切换、登录)取决于执行顺序，记为所有用例共享。
+结果合并写入IMPACT_MAP_PATH，建议在夜间全量运行时记录。
+
+选择(--impact-base REF)：把 git diff REF 的改动行(旧版本的删除行和工作区的新增行)映射到
+函数、类和模块级常量；改动的常量(定位器、配置项)再扩展到引用它的函数。
+用到改动符号的用例和影响记录中没有的新用例被选中；改动涉及共享符号、
+改动了上述目录之外的Python文件(测试、运行脚本等)或没有影响记录时运行全部用例。
+改动的常量、config/、scenarios/ 和 conftest.py 中的符号只在收集和会话钩子中读取时不会出现在影响记录里
+(如只由conftest读取的配置项、场景定义)，若它及引用它的符号都没有被任何用例记录到，同样运行全部用例。
+
+符号格式为 "相对路径::限定名"，如 "pages/page_objects.py::CartPage.remove_product_by_index"；
+改动的符号同时覆盖其内部定义(闭包、方法)，模块级语句的改动覆盖整个文件。
+"""
+import ast
+import json
+import os
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Set
+
+from selenium.webdriver.common.by import By
+
+from config import IMPACT_MAP_PATH
+from core.exceptions import TestException
+from core.logger_config import logger
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 记录和分析的目录和文件
+TRACKED_DIRS = ("pages", "core", "config", "scenarios")
+TRACKED_FILES = ("conftest.py",)
+# 这些文件改动时无法归属到具体用例，运行全部用例
+UNATTRIBUTED_FILES = ("requirements.txt", "pytest.ini", "setup.cfg", "pyproject.toml")
+
+_FIND_FUNCTIONS = ("find_element", "find_elements")
+
+
+def _relative(path, root):
+    relative = os.path.relpath(path, root).replace(os.sep, "/")
+    return None if relative.startswith("../") else relative
+
+
+def _is_tracked(relative):
+    return (relative.split("/", 1)[0] in TRACKED_DIRS and relative.endswith(".py")) or relative in TRACKED_FILES
+
+
+def _needs_record(symbol, constants):
+    """改动的符号是否必须有用例记录到才能归属(常量，或 pages/、core/ 之外在用例执行期间之外也会用到的代码)"""
+    return symbol in constants or symbol.split("/", 1)[0] not in ("pages", "core")
+
+
+def matches(changed, symbol):
+    """symbol是否受改动的符号changed影响(changed以"::"结尾表示整个文件)"""
+    if changed.endswith("::"):
+        return symbol.startswith(changed)
+    return symbol == changed or symbol.startswith(changed + ".")
+
+
+@dataclass
+class SourceIndex:
+    """一个或多个源文件的符号索引"""
+    spans: Dict[str, list] = field(default_factory=dict)        # 相对路径 -> [(起始行, 结束行, 符号)]，外层在前
+    constants: Set[str] = field(default_factory=set)            # 模块级/类级常量符号
+    references: Dict[str, Set[str]] = field(default_factory=dict)  # 名称 -> 引用它的符号
+    locators: Dict[tuple, List[str]] = field(default_factory=dict)  # (by, value) -> 定位器常量符号
+    sources: Dict[str, List[str]] = field(default_factory=dict)     # 相对路径 -> 源码行
+
+    def add_source(self, relative, source):
+        """解析源码，登记其中的函数、类和常量"""
+        self.sources[relative] = source.splitlines()
+        spans = self.spans.setdefault(relative, [])
+        prefix = relative + "::"
+
+        def refer(node, symbol):
+            for child in ast.walk(node):
+                name = child.id if isinstance(child, ast.Name) else (
+                    child.attr if isinstance(child, ast.Attribute) else None)
+                if name:
+                    self.references.setdefault(name, set()).add(symbol)
+
+        def visit(body, scope, module_level):
+            for node in body:
+                start = min([decorator.lineno for decorator in getattr(node, "decorator_list", [])] + [node.lineno])
+                if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                    symbol = prefix + scope + node.name
+                    spans.append((start, node.end_lineno, symbol))
+                    refer(node, symbol)
+                    visit(node.body, scope + node.name + ".<locals>.", False)
+                elif isinstance(node, ast.ClassDef):
+                    spans.append((start, node.end_lineno, prefix + scope + node.name))
+                    visit(node.body, scope + node.name + ".", module_level)
+                elif module_level and isinstance(node, (ast.Assign, ast.AnnAssign)):
+                    targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+                    for target in targets:
+                        if isinstance(target, ast.Name):
+                            symbol = prefix + scope + target.id
+                            spans.append((start, node.end_lineno, symbol))
+                            self.constants.add(symbol)
+                            if node.value is not None:
+                                refer(node.value, symbol)
+                                self._add_locator(node.value, symbol)
+                elif module_level:
+                    refer(node, prefix)
+
+        visit(ast.parse(source).body, "", True)
+
+    def _add_locator(self, value, symbol):
+        """登记形如 (By.ID, "user-name") 的定位器常量"""
+        if not (isinstance(value, ast.Tuple) and len(value.elts) == 2):
+            return
+        by, selector = value.elts
+        if (isinstance(by, ast.Attribute) and isinstance(by.value, ast.Name) and by.value.id == "By"
+                and hasattr(By, by.attr) and isinstance(selector, ast.Constant) and isinstance(selector.value, str)):
+            self.locators.setdefault((getattr(By, by.attr), selector.value), []).append(symbol)
+
+    def symbol_at(self, relative, line):
+        """包含该行的最内层符号，不在任何定义中时为整个文件"""
+        for start, end, symbol in reversed(self.spans.get(relative, [])):
+            if start <= line <= end:
+                return symbol
+        return relative + "::"
+
+    def source_of(self, symbol):
+        """符号的源码文本：没有对应定义(lambda、推导式等)时取最近的外层定义，再找不到时取整个文件"""
+        relative, _, qualname = symbol.partition("::")
+        lines = self.sources.get(relative)
+        if lines is None:
+            return ""
+        spans = {name: (start, end) for start, end, name in self.spans.get(relative, [])}
+        while qualname:
+            span = spans.get(f"{relative}::{qualname}")
+            if span:
+                return "\n".join(lines[span[0] - 1:span[1]])
+            qualname = qualname.rpartition(".")[0]
+        return "\n".join(lines)
+
+    def expand(self, symbols):
+        """把改动的常量扩展到引用它的函数和常量(传递)"""
+        expanded = set(symbols)
+        pending = [symbol for symbol in symbols if symbol in self.constants]
+        while pending:
+            name = pending.pop().rsplit("::", 1)[1].rsplit(".", 1)[-1]
+            for symbol in self.references.get(name, ()):
+                if symbol not in expanded:
+                    expanded.add(symbol)
+                    if symbol in self.constants:
+                        pending.append(symbol)
+        return expanded
+
+    def referenced_constants(self, symbols):
+        """symbols引用的常量(传递，与expand方向相反)，按名称匹配"""
+        by_name = {}
+        for constant in self.constants:
+            by_name.setdefault(constant.rsplit("::", 1)[1].rsplit(".", 1)[-1], []).append(constant)
+        names = {}
+        for name, users in self.references.items():
+            if name in by_name:
+                for user in users:
+                    names.setdefault(user, set()).add(name)
+        found, pending = set(), list(symbols)
+        while pending:
+            for name in names.get(pending.pop(), ()):
+                for constant in by_name[name]:
+                    if constant not in found:
+                        found.add(constant)
+                        pending.append(constant)
+        return found
+
+
+def index_tree(root=PROJECT_ROOT):
+    """索引工作区中 TRACKED_DIRS 下和 TRACKED_FILES 的全部源文件"""
+    paths = [os.path.join(root, filename) for filename in TRACKED_FILES]
+    for directory in TRACKED_DIRS:
+        for dirpath, dirnames, filenames in os.walk(os.path.join(root, directory)):
+            dirnames[:] = [name for name in dirnames if name != "__pycache__"]
+            paths.extend(os.path.join(dirpath, filename) for filename in sorted(filenames) if filename.endswith(".py"))
+    index = SourceIndex()
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        with open(path, encoding="utf-8") as f:
+            source = f.read()
+        try:
+            index.add_source(_relative(path, root), source)
+        except SyntaxError as e:
+            # 没有符号的文件，改动按整个文件处理
+            logger.warning(f"无法解析 {path}: {str(e)}")
+    return index
+
+
+class ImpactRecorder:
+    """记录每个用例调用到的函数和使用的定位器"""
+
+    def __init__(self, root=PROJECT_ROOT):
+        self.root = root
+        self.cases: Dict[str, Set[str]] = {}
+        self.shared: Set[str] = set()
+        self._codes = {}       # 代码对象 -> (符号, 是否读取定位器参数)
+        self._locators = {}
+        self._current = None
+        self._self = _relative(os.path.abspath(__file__), root)
+
+    def start(self):
+        self._locators = index_tree(self.root).locators
+        sys.setprofile(self._profile)
+        return self
+
+    def stop(self):
+        sys.setprofile(None)
+        self._current = None
+
+    def phase(self, nodeid, when):
+        """切换记录目标：call阶段记到用例，setup/teardown阶段记为共享"""
+        self._current = self.cases.setdefault(nodeid, set()) if when == "call" else self.shared
+
+    def pause(self):
+        """暂停记录(不属于被测用例的测试，如tests/下的单元测试)，下次phase时恢复"""
+        self._current = None
+
+    def _classify(self, code):
+        relative = _relative(code.co_filename, self.root)
+        symbol = None
+        if relative and _is_tracked(relative) and relative != self._self:
+            symbol = f"{relative}::{code.co_qualname}"
+        arguments = code.co_varnames[:code.co_argcount]
+        captures = "by" in arguments and "value" in arguments and (symbol or code.co_name in _FIND_FUNCTIONS)
+        return symbol, captures
+
+    def _profile(self, frame, event, arg):
+        if event != "call" or self._current is None:
+            return
+        code = frame.f_code
+        entry = self._codes.get(code)
+        if entry is None:
+            entry = self._codes[code] = self._classify(code)
+        symbol, captures = entry
+        if symbol:
+            self._current.add(symbol)
+        if captures:
+            arguments = frame.f_locals
+            try:
+                self._current.update(self._locators.get((arguments.get("by"), arguments.get("value")), ()))
+            except TypeError:
+                pass
+
+
+def _git(root, *args):
+    try:
+        result = subprocess.run(["git", *args], cwd=root, capture_output=True, text=True, encoding="utf-8")
+    except OSError as e:
+        raise TestException(f"无法执行git: {str(e)}")
+    if result.returncode != 0:
+        raise TestException(f"git {' '.join(args)} 失败: {result.stderr.strip()}")
+    return result.stdout
+
+
+@dataclass
+class ImpactMap:
+    """用例 -> 用到的符号，以及所有用例共享的符号"""
+    cases: Dict[str, Set[str]] = field(default_factory=dict)
+    shared: Set[str] = field(default_factory=set)
+    commit: str = ""
+    recorded_at: str = ""
+
+    @classmethod
+    def load(cls, path=IMPACT_MAP_PATH):
+        """读取影响记录，不存在时返回空记录"""
+        if not os.path.exists(path):
+            return cls()
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(cases={nodeid: set(symbols) for nodeid, symbols in data["cases"].items()},
+                   shared=set(data["shared"]), commit=data.get("commit", ""),
+                   recorded_at=data.get("recorded_at", ""))
+
+    def merge(self, recorder, root=PROJECT_ROOT):
+        """合并一次记录：本次执行的用例覆盖旧记录，共享符号取并集"""
+        self.cases.update({nodeid: set(symbols) for nodeid, symbols in recorder.cases.items()})
+        self.shared |= recorder.shared
+        try:
+            self.commit = _git(root, "rev-parse", "HEAD").strip()
+        except TestException:
+            self.commit = ""
+        self.recorded_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        return self
+
+    def save(self, path=IMPACT_MAP_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"commit": self.commit, "recorded_at": self.recorded_at, "shared": sorted(self.shared),
+                       "cases": {nodeid: sorted(symbols) for nodeid, symbols in sorted(self.cases.items())}},
+                      f, ensure_ascii=False, indent=1)
+        logger.info(f"用例影响记录已写入: {path} ({len(self.cases)} 个用例)")
+        return path
+
+
+@dataclass
+class ChangeSet:
+    """git diff中的改动"""
+    symbols: Set[str] = field(default_factory=set)   # 改动的符号(已扩展到引用改动常量的函数)
+    files: List[str] = field(default_factory=list)
+    unattributed: List[str] = field(default_factory=list)  # 无法归属到具体用例的改动文件和符号
+    # 必须有用例记录到才能归属的改动符号(见_needs_record) -> 它及引用它的符号
+    unrecorded_checks: Dict[str, Set[str]] = field(default_factory=dict)
+
+
+def _hunk_lines(diff):
+    """解析 git diff -U0，返回 {文件: (旧版本改动行, 新版本改动行)}"""
+    changes, current = {}, None
+    for line in diff.splitlines():
+        # 内容行都以"+"/"-"开头，不会与文件头和块头混淆
+        if line.startswith("diff --git "):
+            # diff --git a/path b/path：新增/删除的文件另一侧为/dev/null，取b侧路径
+            current = line.split(" b/", 1)[1]
+            changes.setdefault(current, (set(), set()))
+        elif line.startswith("@@") and current is not None:
+            old, new = line.split("@@")[1].split()
+            for side, spec in ((0, old[1:]), (1, new[1:])):
+                start, _, count = spec.partition(",")
+                count = int(count) if count else 1
+                changes[current][side].update(range(int(start), int(start) + count))
+    return changes
+
+
+def diff_changes(base, root=PROJECT_ROOT):
+    """工作区相对于base的改动"""
+    changes = ChangeSet()
+    for relative in _git(root, "diff", "--name-only", "--relative", "--no-renames", base).split():
+        changes.files.append(relative)
+        if not _is_tracked(relative) and (relative.endswith(".py") or os.path.basename(relative) in UNATTRIBUTED_FILES):
+            changes.unattributed.append(relative)
+
+    tracked = [relative for relative in changes.files if _is_tracked(relative)]
+    if not tracked:
+        return changes
+    diff = _git(root, "diff", "-U0", "--no-color", "--no-renames", "--relative", base, "--", *tracked)
+    index = index_tree(root)
+    old_index = SourceIndex()
+    symbols = set()
+    for relative, (old_lines, new_lines) in _hunk_lines(diff).items():
+        if old_lines:
+            try:
+                old_index.add_source(relative, _git(root, "show", f"{base}:./{relative}"))
+            except TestException:
+                old_lines = set()  # 新增的文件
+            except SyntaxError:
+                symbols.add(relative + "::")
+                old_lines = set()
+        symbols.update(old_index.symbol_at(relative, line) for line in old_lines)
+        if os.path.exists(os.path.join(root, relative)):
+            symbols.update(index.symbol_at(relative, line) for line in new_lines)
+    # 删除的常量只在旧版本中，按名称扩展到工作区中仍引用它的代码
+    index.constants |= old_index.constants
+    changes.symbols = index.expand(symbols)
+    changes.unrecorded_checks = {symbol: index.expand({symbol}) for symbol in symbols
+                                 if _needs_record(symbol, index.constants)}
+    return changes
+
+
+def select_cases(nodeids, impact_map, changes):
+    """
+    按改动选择用例，返回 (选中的nodeid列表, 原因)
+
+    保持nodeids的原有顺序；没有影响记录的用例(新用例)总是选中。
+    unrecorded_checks中没有被任何用例记录到的符号加入changes.unattributed。
+    """
+    nodeids = list(nodeids)
+    if impact_map.cases:
+        recorded = impact_map.shared.union(*impact_map.cases.values())
+        changes.unattributed.extend(
+            symbol for symbol, users in sorted(changes.unrecorded_checks.items())
+            if not any(matches(user, used) for user in users for used in recorded))
+    if changes.unattributed:
+        return nodeids, f"改动无法归属到具体用例: {', '.join(changes.unattributed)}"
+    if not impact_map.cases:
+        return nodeids, "没有用例影响记录"
+    if not changes.symbols:
+        unknown = [nodeid for nodeid in nodeids if nodeid not in impact_map.cases]
+        return unknown, "没有影响用例的改动"
+    if any(matches(changed, symbol) for changed in changes.symbols for symbol in impact_map.shared):
+        return nodeids, "改动涉及所有用例共享的代码(浏览器创建、用户切换、登录)"
+    selected = [nodeid for nodeid in nodeids
+                if nodeid not in impact_map.cases
+                or any(matches(changed, symbol) for changed in changes.symbols for symbol in impact_map.cases[nodeid])]
+    return selected, f"{len(changes.symbols)} 个改动的符号"
+
+
+# 全局用例影响记录器
+impact_recorder = ImpactRecorder()
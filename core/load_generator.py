@@ -0,0 +1,222 @@
+"""
+负载生成模式 - 以可配置的虚拟用户数和爬坡时间并发回放业务流程(如完整结账流程)
+
+每个虚拟用户从浏览器池借用一个浏览器，按场景步骤执行页面对象操作，
+统计吞吐量、每个步骤的延迟分位数以及错误分布。
+"""
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, List, Dict
+
+from config import BASE_URL, USERNAMES, PASSWORD, FIRST_NAME, LAST_NAME, POSTAL_CODE
+from core.browser_pool import BrowserPool
+from core.exceptions import CheckoutException
+from core.logger_config import logger
+from pages.page_objects import BasePage, LoginPage, InventoryPage, CartPage, CheckoutPage
+
+
+def percentile(samples, p):
+    """计算分位数(最近秩法)，samples须已排序"""
+    if not samples:
+        return 0.0
+    index = min(len(samples) - 1, max(0, int(round(p / 100 * (len(samples) - 1)))))
+    return samples[index]
+
+
+@dataclass
+class ScenarioStep:
+    """场景步骤：名称 + 接收(driver, context)的动作"""
+    name: str
+    action: Callable
+
+
+@dataclass
+class Scenario:
+    """负载场景"""
+    name: str
+    steps: List[ScenarioStep]
+
+
+@dataclass
+class LoadReport:
+    """负载测试结果"""
+    scenario: str
+    virtual_users: int
+    ramp_up: float
+    duration: float = 0.0
+    iterations: int = 0
+    failed_iterations: int = 0
+    step_latencies: Dict[str, List[float]] = field(default_factory=dict)
+    errors: Counter = field(default_factory=Counter)
+
+    @property
+    def throughput(self):
+        """每秒完成的场景迭代数"""
+        return (self.iterations - self.failed_iterations) / self.duration if self.duration else 0.0
+
+    def step_summary(self):
+        """每个步骤的延迟统计(毫秒)"""
+        summary = {}
+        for step, latencies in self.step_latencies.items():
+            samples = sorted(latencies)
+            summary[step] = {
+                "count": len(samples),
+                "p50": percentile(samples, 50) * 1000,
+                "p90": percentile(samples, 90) * 1000,
+                "p95": percentile(samples, 95) * 1000,
+                "p99": percentile(samples, 99) * 1000,
+                "max": (samples[-1] * 1000) if samples else 0.0,
+            }
+        return summary
+
+    def to_dict(self):
+        return {
+            "scenario": self.scenario,
+            "virtual_users": self.virtual_users,
+            "ramp_up": self.ramp_up,
+            "duration": self.duration,
+            "iterations": self.iterations,
+            "failed_iterations": self.failed_iterations,
+            "throughput_per_sec": self.throughput,
+            "steps": self.step_summary(),
+            "errors": dict(self.errors),
+        }
+
+    def log_summary(self):
+        """输出负载测试摘要"""
+        logger.info("=" * 80)
+        logger.info(f"负载场景: {self.scenario}  虚拟用户: {self.virtual_users}  爬坡: {self.ramp_up}s")
+        logger.info(f"总迭代: {self.iterations}  失败: {self.failed_iterations}  耗时: {self.duration:.2f}s  "
+                    f"吞吐量: {self.throughput:.2f} 次/秒")
+        for step, stats in self.step_summary().items():
+            logger.info(f"  {step:<20} n={stats['count']:<5} p50={stats['p50']:.0f}ms p90={stats['p90']:.0f}ms "
+                        f"p95={stats['p95']:.0f}ms p99={stats['p99']:.0f}ms max={stats['max']:.0f}ms")
+        for error, count in self.errors.most_common():
+            logger.info(f"  错误 {error}: {count}")
+        logger.info("=" * 80)
+
+
+# ========== 内置场景 ==========
+def _open_and_login(driver, context):
+    driver.delete_all_cookies()
+    BasePage(driver).navigate_to(BASE_URL)
+    login_page = LoginPage(driver)
+    login_page.login(context["username"], PASSWORD)
+    if not login_page.is_login_success():
+        raise CheckoutException(f"用户 {context['username']} 登录失败")
+
+
+def _add_product(driver, context):
+    InventoryPage(driver).add_product_by_index(0)
+
+
+def _go_to_cart(driver, context):
+    InventoryPage(driver).go_to_cart()
+
+
+def _start_checkout(driver, context):
+    CartPage(driver).checkout()
+
+
+def _fill_checkout_info(driver, context):
+    checkout_page = CheckoutPage(driver)
+    checkout_page.fill_checkout_info(FIRST_NAME, LAST_NAME, POSTAL_CODE)
+    checkout_page.continue_checkout()
+
+
+def _finish_checkout(driver, context):
+    CheckoutPage(driver).finish_checkout()
+    if "checkout-complete" not in driver.current_url:
+        raise CheckoutException("结账流程未完成")
+
+
+# 与test_14_complete_checkout_flow相同的步骤
+CHECKOUT_SCENARIO = Scenario("complete_checkout_flow", [
+    ScenarioStep("login", _open_and_login),
+    ScenarioStep("add_to_cart", _add_product),
+    ScenarioStep("go_to_cart", _go_to_cart),
+    ScenarioStep("checkout", _start_checkout),
+    ScenarioStep("fill_checkout_info", _fill_checkout_info),
+    ScenarioStep("finish_checkout", _finish_checkout),
+])
+
+SCENARIOS = {CHECKOUT_SCENARIO.name: CHECKOUT_SCENARIO}
+
+
+class LoadGenerator:
+    """负载生成器"""
+
+    def __init__(self, scenario, virtual_users, ramp_up=0.0, iterations=1, browser_pool=None):
+        self.scenario = scenario
+        self.virtual_users = virtual_users
+        self.ramp_up = ramp_up
+        self.iterations = iterations
+        self.browser_pool = browser_pool or BrowserPool(virtual_users, name="load")
+        self._lock = threading.Lock()
+        self.report = LoadReport(scenario.name, virtual_users, ramp_up)
+
+    def _record_step(self, step, elapsed):
+        with self._lock:
+            self.report.step_latencies.setdefault(step, []).append(elapsed)
+
+    def _record_iteration(self, error_key=None):
+        with self._lock:
+            self.report.iterations += 1
+            if error_key:
+                self.report.failed_iterations += 1
+                self.report.errors[error_key] += 1
+
+    def _run_iteration(self, driver, context):
+        for step in self.scenario.steps:
+            start = time.perf_counter()
+            try:
+                step.action(driver, context)
+            except Exception as e:
+                self._record_step(step.name, time.perf_counter() - start)
+                logger.warning(f"虚拟用户 {context['vu']} 步骤 {step.name} 失败: {str(e)}")
+                return f"{step.name}: {type(e).__name__}"
+            self._record_step(step.name, time.perf_counter() - start)
+        return None
+
+    def _virtual_user(self, vu_index):
+        # 爬坡：虚拟用户按固定间隔依次启动
+        if self.ramp_up and self.virtual_users > 1:
+            time.sleep(self.ramp_up * vu_index / (self.virtual_users - 1))
+        context = {"vu": vu_index, "username": USERNAMES[vu_index % len(USERNAMES)]}
+        driver = None
+        try:
+            for iteration in range(self.iterations):
+                if driver is None:
+                    try:
+                        driver = self.browser_pool.acquire()
+                    except Exception as e:
+                        for _ in range(self.iterations - iteration):
+                            self._record_iteration(f"acquire_browser: {type(e).__name__}")
+                        return
+                error_key = self._run_iteration(driver, context)
+                self._record_iteration(error_key)
+                if error_key is not None:
+                    # 失败后浏览器状态不可信：丢弃该实例，下次迭代借用新浏览器
+                    self.browser_pool.release(driver, discard=True)
+                    driver = None
+        finally:
+            if driver is not None:
+                self.browser_pool.release(driver)
+
+    def run(self):
+        """执行负载测试并返回LoadReport"""
+        logger.info(f"开始负载测试: {self.scenario.name}, 虚拟用户 {self.virtual_users}, "
+                    f"爬坡 {self.ramp_up}s, 每用户迭代 {self.iterations} 次")
+        threads = [
+            threading.Thread(target=self._virtual_user, args=(i,), name=f"vu-{i}", daemon=True)
+            for i in range(self.virtual_users)
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.report.duration = time.perf_counter() - start
+        return self.report
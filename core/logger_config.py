@@ -43,5 +43,13 @@ def setup_logger():
     
     return logger
 
+def set_console_output(level, stream=None):
+    """调整控制台输出的日志级别和输出流(日志文件不受影响)"""
+    for handler in logging.getLogger().handlers:
+        if type(handler) is logging.StreamHandler:
+            handler.setLevel(level)
+            if stream is not None:
+                handler.setStream(stream)
+
 # 创建全局logger实例
 logger = setup_logger()
\ No newline at end of file
@@ -0,0 +1,228 @@
+"""
+运行指标 - 以OpenMetrics文本格式导出用例结果、动作耗时、WebDriver命令数、状态重置、用户切换和浏览器池利用率
+
+指标由conftest钩子、场景引擎、页面对象层和传输层实时更新；
+运行期间可通过本地HTTP端点 (GET /metrics) 抓取，运行结束时写出一份OpenMetrics文本文件。
+"""
+import bisect
+import os
+import threading
+import weakref
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from config import REPORTS_DIR
+from core.dirty_state import dirty_state
+from core.element_cache import element_cache
+from core.logger_config import logger
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# 动作/用例耗时直方图的桶上限(秒)
+DURATION_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        return "+Inf" if value == float("inf") else repr(value)
+    return str(value)
+
+
+class Counter:
+    """只增不减的计数器，可带标签"""
+
+    type = "counter"
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        with self._lock:
+            return self._values.get(labels, 0)
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for labels, value in sorted(values.items()):
+            yield self.name + "_total", list(zip(self.labelnames, labels)), value
+
+
+class Histogram:
+    """耗时分布直方图，可带标签"""
+
+    type = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DURATION_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = {"counts": [0] * len(self.buckets), "count": 0, "sum": 0.0}
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series["counts"][index] += 1
+            series["count"] += 1
+            series["sum"] += value
+
+    def samples(self):
+        with self._lock:
+            series_items = [(labels, dict(series, counts=list(series["counts"])))
+                            for labels, series in sorted(self._series.items())]
+        for labels, series in series_items:
+            base = list(zip(self.labelnames, labels))
+            cumulative = 0
+            for bound, count in zip(self.buckets, series["counts"]):
+                cumulative += count
+                yield self.name + "_bucket", base + [("le", repr(float(bound)))], cumulative
+            yield self.name + "_bucket", base + [("le", "+Inf")], series["count"]
+            yield self.name + "_count", base, series["count"]
+            yield self.name + "_sum", base, series["sum"]
+
+
+class Collected:
+    """抓取时才计算取值的指标(从已有的统计中读取)"""
+
+    def __init__(self, name, metric_type, help_text, labelnames, collect):
+        self.name = name
+        self.type = metric_type
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.collect = collect
+
+    def samples(self):
+        suffix = "_total" if self.type == "counter" else ""
+        for labels, value in sorted(self.collect().items()):
+            yield self.name + suffix, list(zip(self.labelnames, labels)), value
+
+
+class RunMetrics:
+    """一次测试运行的全部指标"""
+
+    def __init__(self):
+        self.tests = Counter("saucedemo_tests", "用例执行结果", ("status",))
+        self.test_duration = Histogram("saucedemo_test_duration_seconds", "用例执行阶段耗时")
+        self.action_duration = Histogram("saucedemo_action_duration_seconds", "场景动作(页面对象操作)耗时",
+                                         ("action",))
+        self.webdriver_commands = Counter("saucedemo_webdriver_commands", "发送的WebDriver命令数", ("command",))
+        self.navigations = Counter("saucedemo_navigations", "页面对象导航的跳转次数", ("kind",))
+        self.user_switches = Counter("saucedemo_user_switches", "用例之间的用户切换次数")
+        self._pools = weakref.WeakSet()
+        self._metrics = [
+            self.tests, self.test_duration, self.action_duration, self.webdriver_commands, self.navigations,
+            self.user_switches,
+            Collected("saucedemo_state_resets", "counter", "用例结束后的应用状态重置", ("outcome",),
+                      lambda: {(outcome,): dirty_state.stats[key] for outcome, key in
+                               (("reset", "resets"), ("skipped", "skipped"), ("leak", "leaks"))}),
+            Collected("saucedemo_element_cache_lookups", "counter", "元素句柄缓存查找", ("result",),
+                      lambda: {("hit",): element_cache.stats["hits"], ("miss",): element_cache.stats["misses"]}),
+            Collected("saucedemo_browser_pool_in_use", "gauge", "浏览器池中借出的浏览器数", ("pool",),
+                      lambda: self._pool_values("in_use")),
+            Collected("saucedemo_browser_pool_size", "gauge", "浏览器池容量", ("pool",),
+                      lambda: self._pool_values("size")),
+        ]
+
+    def track_pool(self, pool):
+        """登记浏览器池，抓取时读取其利用率(池被回收后自动移除)"""
+        self._pools.add(pool)
+
+    def _pool_values(self, field):
+        values = {}
+        for pool in list(self._pools):
+            value = pool.size if field == "size" else pool.stats["in_use"]
+            values[(pool.name,)] = values.get((pool.name,), 0) + value
+        return values
+
+    def render(self):
+        """OpenMetrics文本格式"""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.append(f"# HELP {metric.name} {_escape(metric.help)}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write(self, directory=REPORTS_DIR):
+        """运行结束时写出OpenMetrics文本文件，返回文件路径"""
+        os.makedirs(directory, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filepath = os.path.join(directory, f"metrics_{timestamp}.txt")
+        with open(filepath, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        logger.info(f"📊 运行指标已导出: {filepath}")
+        return filepath
+
+
+class MetricsServer:
+    """本地HTTP指标端点，GET /metrics 返回OpenMetrics文本"""
+
+    def __init__(self, metrics, port=0, host="127.0.0.1"):
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True)
+        self._thread.start()
+        logger.info(f"运行指标端点已启动: {self.url}")
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+# 全局运行指标实例
+run_metrics = RunMetrics()
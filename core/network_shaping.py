@@ -0,0 +1,149 @@
+"""
+网络整形 - 屏蔽第三方统计请求、复用本地静态资源缓存、可选地用1×1占位图替代商品图片
+
+Edge(Chromium)通过CDP命令配置:
+    Network.setBlockedURLs                 屏蔽统计/埋点请求(开启占位图时也屏蔽商品图片)
+    Network.setCacheDisabled(false)        确保浏览器缓存开启
+    Page.addScriptToEvaluateOnNewDocument  页面脚本运行前安装占位图替换逻辑
+静态资源缓存通过 --disk-cache-dir 实现：浏览器不能同时共用一个磁盘缓存目录，因此每个浏览器启动时
+复制一份预热缓存(asset_cache_dir/warm)作为自己的缓存目录，退出后再用它替换预热缓存，
+之后启动的浏览器(浏览器池、失败重跑、替换失效会话)从中读取，JS/CSS/字体/图片只下载一次。
+本地桩驱动实现了同样的CDP命令，可作为替身目标运行页面加载基准测试。
+"""
+import os
+import shutil
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from config import (BASE_URL, PASSWORD, NETWORK_SHAPING, NETWORK_BLOCK_PATTERNS, NETWORK_ASSET_CACHE_DIR,
+                    NETWORK_STUB_IMAGES)
+from core.logger_config import logger
+
+# SauceDemo商品图片 (打包在 /static/media/ 下)
+PRODUCT_IMAGE_PATTERNS = ["*/static/media/*.jpg"]
+
+WARM_CACHE = "warm"
+
+_cache_lock = threading.Lock()
+
+_PLACEHOLDER_PNG = ("data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk"
+                    "YPhfDwAChwGA60e6kgAAAABJRU5ErkJggg==")
+
+_PLACEHOLDER_JS = """
+(function () {
+    var placeholder = '%s';
+    var swap = function (img) {
+        if (img.src && img.src.indexOf('/static/media/') !== -1) { img.src = placeholder; }
+    };
+    new MutationObserver(function (mutations) {
+        mutations.forEach(function (mutation) {
+            if (mutation.type === 'attributes') { swap(mutation.target); return; }
+            mutation.addedNodes.forEach(function (node) {
+                if (node.tagName === 'IMG') { swap(node); }
+                if (node.querySelectorAll) { node.querySelectorAll('img').forEach(swap); }
+            });
+        });
+    }).observe(document, {childList: true, subtree: true, attributes: true, attributeFilter: ['src']});
+})();
+""" % _PLACEHOLDER_PNG
+
+
+def execute_cdp(driver, cmd, params=None):
+    """执行CDP命令 (本地Edge驱动和远程驱动通用)"""
+    return driver.execute("executeCdpCommand", {"cmd": cmd, "params": params or {}})["value"]
+
+
+@dataclass
+class NetworkShaper:
+    """网络整形配置"""
+    block_patterns: List[str] = field(default_factory=lambda: list(NETWORK_BLOCK_PATTERNS))
+    asset_cache_dir: Optional[str] = NETWORK_ASSET_CACHE_DIR
+    stub_images: bool = NETWORK_STUB_IMAGES
+
+    @classmethod
+    def from_config(cls):
+        """按配置创建，未开启网络整形时返回None"""
+        return cls() if NETWORK_SHAPING else None
+
+    def checkout_cache(self):
+        """复制一份预热缓存作为新浏览器独立的磁盘缓存目录，未配置缓存目录时返回None"""
+        if not self.asset_cache_dir:
+            return None
+        root = os.path.abspath(self.asset_cache_dir)
+        os.makedirs(root, exist_ok=True)
+        cache_dir = tempfile.mkdtemp(prefix="browser-", dir=root)
+        warm = os.path.join(root, WARM_CACHE)
+        with _cache_lock:
+            if os.path.isdir(warm):
+                shutil.copytree(warm, cache_dir, dirs_exist_ok=True)
+        return cache_dir
+
+    def browser_arguments(self, cache_dir=None):
+        """启动浏览器时需要追加的参数，cache_dir为checkout_cache返回的目录"""
+        return [f"--disk-cache-dir={cache_dir}"] if cache_dir else []
+
+    def blocked_urls(self):
+        return list(self.block_patterns) + (PRODUCT_IMAGE_PATTERNS if self.stub_images else [])
+
+    def install(self, driver, cache_dir=None):
+        """在已创建的浏览器上启用网络整形，浏览器不支持CDP时返回False"""
+        if cache_dir:
+            driver._asset_cache_dir = cache_dir
+        try:
+            execute_cdp(driver, "Network.enable")
+            execute_cdp(driver, "Network.setCacheDisabled", {"cacheDisabled": False})
+            execute_cdp(driver, "Network.setBlockedURLs", {"urls": self.blocked_urls()})
+            if self.stub_images:
+                execute_cdp(driver, "Page.addScriptToEvaluateOnNewDocument", {"source": _PLACEHOLDER_JS})
+        except Exception as e:
+            logger.warning(f"浏览器不支持CDP，未启用网络整形: {str(e)}")
+            return False
+        logger.info(f"已启用网络整形: 屏蔽 {len(self.blocked_urls())} 类请求, "
+                    f"静态资源缓存 {self.asset_cache_dir or '无'}, 商品图片占位 {self.stub_images}")
+        return True
+
+
+def release_cache(cache_dir, keep=True):
+    """
+    归还浏览器的磁盘缓存目录(浏览器退出后调用)
+
+    keep为True时用该目录替换预热缓存(后退出的浏览器缓存的资源不少于先退出的)，否则直接删除。
+    """
+    if not cache_dir or not os.path.isdir(cache_dir):
+        return
+    if not keep:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        return
+    warm = os.path.join(os.path.dirname(cache_dir), WARM_CACHE)
+    stale = cache_dir + ".stale"
+    with _cache_lock:
+        if os.path.isdir(warm):
+            os.rename(warm, stale)
+        os.rename(cache_dir, warm)
+    shutil.rmtree(stale, ignore_errors=True)
+
+
+def measure_page_loads(factory, browsers=3, pages=("inventory.html", "cart.html", "inventory.html")):
+    """
+    页面加载基准：依次启动browsers个新浏览器，登录后逐个整页加载pages，返回每次加载耗时(秒)
+
+    每次都启动新浏览器是为了体现跨浏览器复用的静态资源缓存(浏览器池、重跑、替换会话都会启动新浏览器)。
+    """
+    from core.webdriver_utils import WebDriverManager
+    from pages.page_objects import LoginPage
+
+    samples = []
+    for _ in range(browsers):
+        driver = factory()
+        try:
+            LoginPage(driver).login("standard_user", PASSWORD)
+            for page in pages:
+                start = time.perf_counter()
+                driver.get(BASE_URL + page)
+                samples.append(time.perf_counter() - start)
+        finally:
+            WebDriverManager.close_driver(driver)
+    return samples
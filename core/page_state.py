@@ -0,0 +1,192 @@
+"""
+页面状态机 - 按driver记录浏览器当前所在的SauceDemo页面，跟随页面对象操作引起的页面跳转
+
+页面以相对BASE_URL的路由标识(""为登录页，与BasePage.ROUTE_ANCHORS一致)。
+页面对象操作成功后登记跳转到的页面，操作失败或结果取决于应用(如登录)时把状态标记为不确定；
+只有状态不确定时才通过current_url向浏览器查询。
+导航按页面跳转图规划代价最小的路径：点击页面上的链接/按钮、应用内路由、整页加载，
+已在目标页面时不发送任何命令。
+"""
+import functools
+import heapq
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from selenium.webdriver.common.by import By
+
+from config import BASE_URL
+from core.element_cache import element_cache
+from core.exceptions import TestException
+
+# SauceDemo页面
+LOGIN = ""
+INVENTORY = "inventory.html"
+INVENTORY_ITEM = "inventory-item.html"
+CART = "cart.html"
+CHECKOUT_STEP_ONE = "checkout-step-one.html"
+CHECKOUT_STEP_TWO = "checkout-step-two.html"
+CHECKOUT_COMPLETE = "checkout-complete.html"
+APP_PAGES = (LOGIN, INVENTORY, INVENTORY_ITEM, CART, CHECKOUT_STEP_ONE, CHECKOUT_STEP_TWO, CHECKOUT_COMPLETE)
+LOGGED_IN_PAGES = APP_PAGES[1:]
+
+# 跳转方式
+CLICK = "click"     # 点击页面上的链接/按钮
+ROUTE = "route"     # 应用内路由(BasePage.route_to)
+LOAD = "load"       # 整页加载(BasePage.navigate_to)
+
+# 各跳转方式的代价(约等于WebDriver命令数，整页加载还要重新下载和执行应用脚本)
+COSTS = {CLICK: 2, ROUTE: 2, LOAD: 5}
+
+_CART_LINK = (By.CLASS_NAME, "shopping_cart_link")
+_BACK_TO_PRODUCTS = (By.ID, "back-to-products")
+
+# 不改变应用状态的点击跳转 (继续结账需要表单信息、完成结账会清空购物车，不用于导航)
+CLICK_TRANSITIONS = [(page, CART, _CART_LINK) for page in LOGGED_IN_PAGES if page != CART] + [
+    (CART, INVENTORY, (By.ID, "continue-shopping")),
+    (CART, CHECKOUT_STEP_ONE, (By.ID, "checkout")),
+    (CHECKOUT_STEP_ONE, CART, (By.ID, "cancel")),
+    (CHECKOUT_STEP_TWO, INVENTORY, (By.ID, "cancel")),
+    (CHECKOUT_COMPLETE, INVENTORY, _BACK_TO_PRODUCTS),
+    (INVENTORY_ITEM, INVENTORY, _BACK_TO_PRODUCTS),
+]
+
+# 商品详情页需要商品id，只能通过点击商品进入
+NAVIGABLE_PAGES = tuple(page for page in APP_PAGES if page != INVENTORY_ITEM)
+
+
+@dataclass(frozen=True)
+class Transition:
+    """页面跳转图中的一条边"""
+    source: Optional[str]
+    target: str
+    kind: str
+    locator: Optional[Tuple[str, str]] = None
+
+    @property
+    def cost(self):
+        return COSTS[self.kind]
+
+
+def _edges(source):
+    """从source出发的所有跳转，source为None表示不在应用中(只能整页加载)"""
+    if source is not None:
+        for start, target, locator in CLICK_TRANSITIONS:
+            if start == source:
+                yield Transition(source, target, CLICK, locator)
+        for target in NAVIGABLE_PAGES:
+            if target != source:
+                yield Transition(source, target, ROUTE)
+    for target in NAVIGABLE_PAGES:
+        if target != source:
+            yield Transition(source, target, LOAD)
+
+
+def shortest_path(source, target):
+    """规划从source到target代价最小的跳转序列，已在目标页面时返回空列表"""
+    if target not in NAVIGABLE_PAGES:
+        raise TestException(f"无法直接导航到页面: {target!r}")
+    if source == target:
+        return []
+    # 代价相同时先展开的边优先(点击优先于路由，路由优先于整页加载)
+    counter = 0
+    queue = [(0, counter, source, [])]
+    settled = set()
+    while queue:
+        cost, _, page, path = heapq.heappop(queue)
+        if page == target:
+            return path
+        if page in settled:
+            continue
+        settled.add(page)
+        for edge in _edges(page):
+            if edge.target not in settled:
+                counter += 1
+                heapq.heappush(queue, (cost + edge.cost, counter, edge.target, path + [edge]))
+    raise TestException(f"页面 {source!r} 无法到达 {target!r}")
+
+
+def page_of(url):
+    """URL对应的页面，不在SauceDemo中时返回None"""
+    if not url or not url.startswith(BASE_URL):
+        return None
+    page = url[len(BASE_URL):].split("?", 1)[0].split("#", 1)[0]
+    if page in ("", "index.html"):
+        return LOGIN
+    return page if page in APP_PAGES else None
+
+
+class PageStateTracker:
+    """按浏览器会话记录当前页面，None表示状态不确定"""
+
+    def __init__(self):
+        self._pages = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self.stats = {"tracked": 0, "queried": 0}
+
+    def arrive(self, driver, page):
+        """登记driver已到达page，旧页面上缓存的元素随之失效"""
+        element_cache.clear(driver)
+        with self._lock:
+            self._pages[driver] = page
+
+    def observe(self, driver, url):
+        """根据已知的URL登记当前页面"""
+        page = page_of(url)
+        if page is None:
+            self.forget(driver)
+        else:
+            self.arrive(driver, page)
+        return page
+
+    def forget(self, driver):
+        """当前页面不确定(操作失败、跳转结果取决于应用等)"""
+        element_cache.clear(driver)
+        with self._lock:
+            self._pages.pop(driver, None)
+
+    def peek(self, driver):
+        """记录中的当前页面(不查询浏览器)，不确定时返回None"""
+        with self._lock:
+            return self._pages.get(driver)
+
+    def current(self, driver):
+        """当前页面：记录确定时直接返回，否则读取current_url，不在SauceDemo中时返回None"""
+        with self._lock:
+            page = self._pages.get(driver)
+            if page is not None:
+                self.stats["tracked"] += 1
+                return page
+            self.stats["queried"] += 1
+        return self.observe(driver, driver.current_url)
+
+
+# 全局页面状态实例
+page_state = PageStateTracker()
+
+
+def transition(target):
+    """
+    声明页面对象方法引起的页面跳转的装饰器
+
+    target为跳转到的页面；为dict时按调用前所在页面查找；为None或查找不到时标记为不确定。
+    方法抛出异常时浏览器可能停在跳转途中，同样标记为不确定。
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            source = page_state.peek(self.driver)
+            try:
+                result = func(self, *args, **kwargs)
+            except Exception:
+                page_state.forget(self.driver)
+                raise
+            arrived = target.get(source) if isinstance(target, dict) else target
+            if arrived is None:
+                page_state.forget(self.driver)
+            else:
+                page_state.arrive(self.driver, arrived)
+            return result
+        return wrapper
+    return decorator
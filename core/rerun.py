@@ -0,0 +1,112 @@
+"""
+失败用例重跑 - 失败的场景用例在浏览器池中的全新浏览器上重跑，区分偶发失败与稳定失败
+
+重跑在后台线程中与后续用例并行执行，不占用主会话的浏览器(其状态可能已被失败用例弄脏)。
+每个失败用例最多重跑max_attempts次，任意一次通过即判定为偶发失败(FLAKY)，
+全部失败判定为稳定失败(CONSISTENT)，结果记录到TestReporter。
+只有通过声明式场景编译的用例可以脱离pytest重跑，其他用例失败时不重跑。
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from config import BASE_URL, PASSWORD, RERUN_MAX_ATTEMPTS, RERUN_POOL_SIZE
+from core.browser_pool import BrowserPool
+from core.dirty_state import dirty_state
+from core.exceptions import TestException
+from core.logger_config import logger
+from reports.test_reporter import test_reporter
+
+FLAKY = "FLAKY"
+CONSISTENT = "CONSISTENT"
+
+
+class RerunManager:
+    """失败用例重跑管理器"""
+
+    def __init__(self, max_attempts=RERUN_MAX_ATTEMPTS, pool_size=RERUN_POOL_SIZE, factory=None, reporter=None):
+        self.max_attempts = max_attempts
+        self.pool_size = pool_size
+        self.factory = factory
+        self.reporter = reporter or test_reporter
+        self._pool = None
+        self._executor = None
+        self._futures = []
+        self._lock = threading.Lock()
+        self.stats = {"submitted": 0, "attempts": 0, FLAKY: 0, CONSISTENT: 0}
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._executor is None:
+                self._pool = BrowserPool(self.pool_size, factory=self.factory, name="rerun")
+                self._executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="rerun")
+
+    def submit(self, result, scenario, username):
+        """提交一个失败用例的重跑任务，立即返回Future"""
+        self._ensure_started()
+        with self._lock:
+            self.stats["submitted"] += 1
+        future = self._executor.submit(self._rerun, result, scenario, username)
+        self._futures.append(future)
+        logger.info(f"用例 {scenario.name} ({username}) 失败，已提交重跑")
+        return future
+
+    def _attempt(self, scenario, username):
+        """在借来的浏览器上从登录开始完整执行一次场景"""
+        from core.scenario_engine import ScenarioRunner
+        from pages.page_objects import BasePage, LoginPage
+        from pages.state_seeding import StateSeeder
+
+        with self._pool.browser() as driver:
+            try:
+                # 借来的浏览器可能被上一次重跑用过，先清掉登录态和购物车
+                page = BasePage(driver)
+                page.navigate_to(BASE_URL)
+                driver.delete_all_cookies()
+                StateSeeder(driver).seed(cart_indexes=[])
+                page.navigate_to(BASE_URL)
+                login_page = LoginPage(driver)
+                login_page.login(username, PASSWORD)
+                if not login_page.is_login_success():
+                    raise TestException(f"重跑时用户 {username} 登录失败")
+                ScenarioRunner(driver, username).run(scenario)
+            finally:
+                dirty_state.clear(driver)
+
+    def _rerun(self, result, scenario, username):
+        passed, attempts, error = False, 0, ""
+        while attempts < self.max_attempts and not passed:
+            attempts += 1
+            try:
+                self._attempt(scenario, username)
+                passed = True
+            except Exception as e:
+                error = str(e)
+                logger.warning(f"用例 {scenario.name} ({username}) 第 {attempts} 次重跑失败: {error}")
+        classification = FLAKY if passed else CONSISTENT
+        with self._lock:
+            self.stats["attempts"] += attempts
+            self.stats[classification] += 1
+        self.reporter.record_rerun(result, classification, attempts, error)
+        return classification
+
+    def wait(self):
+        """等待所有重跑任务完成"""
+        for future in list(self._futures):
+            future.result()
+
+    def close(self):
+        """等待重跑完成并关闭浏览器池，之后再提交会重新创建"""
+        if self._executor is None:
+            return
+        self.wait()
+        self._executor.shutdown()
+        self._pool.close()
+        with self._lock:
+            self._executor = self._pool = None
+            self._futures = []
+        logger.info(f"失败重跑: 提交 {self.stats['submitted']} 个, 共重跑 {self.stats['attempts']} 次, "
+                    f"偶发失败 {self.stats[FLAKY]} 个, 稳定失败 {self.stats[CONSISTENT]} 个")
+
+
+# 全局失败重跑管理器实例
+rerun_manager = RerunManager()
@@ -0,0 +1,300 @@
+"""
+声明式场景引擎 - 场景由步骤(映射到页面对象操作)和期望的后置条件组成，编译为pytest用例执行
+
+场景示例:
+    Scenario(
+        name="test_10_remove_product_from_cart",
+        description="测试从购物车移除商品",
+        given=Given(cart=[0], page="cart.html"),
+        steps=[Step("remove_from_cart", 0)],
+        expect={"cart_items": 0},
+    )
+
+前置条件(Given)统一在引擎中处理：需要预置购物车或深链接时使用StateSeeder，否则只确保停留在商品页。
+每个步骤在时间预算内执行(Step的budget参数，默认SCENARIO_STEP_BUDGET)，场景也可以声明整体预算。
+"""
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import pytest
+
+from config import (USERNAMES, PASSWORD, FIRST_NAME, LAST_NAME, POSTAL_CODE, SCENARIO_PREFIX_SHARING,
+                    SCENARIO_STEP_BUDGET)
+from core.deadlines import time_budget
+from core.exceptions import TestException, DeadlineException
+from core.logger_config import logger
+from core.metrics import run_metrics
+from reports.live_progress import progress_dashboard
+from pages.page_objects import LoginPage, InventoryPage, CartPage, CheckoutPage, ProductDetailPage
+from pages.state_seeding import StateSeeder
+from core.scenario_tree import PrefixPlanner
+
+
+@dataclass
+class Given:
+    """场景前置条件：预置的购物车商品索引和起始页面"""
+    cart: Optional[List[int]] = None
+    page: Optional[str] = None
+
+
+@dataclass(init=False)
+class Step:
+    """场景步骤：动作名称 + 参数 + 该步骤完成后的后置条件 + 时间预算(秒)"""
+    action: str
+    args: tuple = ()
+    expect: Dict = field(default_factory=dict)
+    budget: Optional[float] = SCENARIO_STEP_BUDGET
+
+    def __init__(self, action, *args, expect=None, budget=SCENARIO_STEP_BUDGET):
+        self.action = action
+        self.args = args
+        self.expect = expect or {}
+        self.budget = budget
+
+
+@dataclass
+class Scenario:
+    """声明式测试场景"""
+    name: str
+    description: str
+    steps: List[Step] = field(default_factory=list)
+    expect: Dict = field(default_factory=dict)
+    given: Given = field(default_factory=Given)
+    end_page: str = "inventory"
+    budget: Optional[float] = None  # 整个场景的时间预算(秒)，None表示只受步骤和用例预算约束
+    cacheable: bool = False         # 只读场景：代码和目标版本不变时可回放缓存的通过结果
+
+    @property
+    def start_page(self):
+        """起始页面(用于用例重排的代价模型)"""
+        return self.given.page[:-len(".html")] if self.given.page else "inventory"
+
+
+# ========== 动作 ==========
+# 每个动作接收 (runner, *args)，返回值保存在 runner.context["last"] 中
+def _action_add_product(runner, index):
+    InventoryPage(runner.driver).add_product_by_index(index)
+
+
+def _action_add_all_products(runner):
+    InventoryPage(runner.driver).add_all_products_to_cart()
+
+
+def _action_go_to_cart(runner):
+    InventoryPage(runner.driver).go_to_cart()
+
+
+def _action_open_product(runner, index):
+    InventoryPage(runner.driver).click_product_image(index)
+
+
+def _action_sort(runner, sort_value):
+    keys, expected = InventoryPage(runner.driver).sort_and_verify(sort_value)
+    runner.context["sort"] = {"value": sort_value, "keys": keys, "expected": expected}
+    return keys
+
+
+def _action_logout(runner):
+    InventoryPage(runner.driver).logout()
+
+
+def _action_login(runner, keystrokes=None):
+    login_page = LoginPage(runner.driver)
+    login_page.login(runner.username, PASSWORD, keystrokes=keystrokes)
+
+
+def _action_remove_from_cart(runner, index):
+    CartPage(runner.driver).remove_product_from_cart(index)
+
+
+def _action_continue_shopping(runner):
+    CartPage(runner.driver).continue_shopping()
+
+
+def _action_checkout(runner):
+    CartPage(runner.driver).checkout()
+
+
+def _action_fill_checkout_info(runner, first_name=FIRST_NAME, last_name=LAST_NAME, postal_code=POSTAL_CODE,
+                               keystrokes=None):
+    CheckoutPage(runner.driver).fill_checkout_info(first_name, last_name, postal_code, keystrokes=keystrokes)
+
+
+def _action_continue_checkout(runner):
+    CheckoutPage(runner.driver).continue_checkout()
+
+
+def _action_finish_checkout(runner):
+    CheckoutPage(runner.driver).finish_checkout()
+
+
+def _action_cancel_checkout(runner):
+    CheckoutPage(runner.driver).cancel_checkout()
+
+
+def _action_back_to_products(runner):
+    ProductDetailPage(runner.driver).back_to_products()
+
+
+ACTIONS = {
+    "add_product": _action_add_product,
+    "add_all_products": _action_add_all_products,
+    "go_to_cart": _action_go_to_cart,
+    "open_product": _action_open_product,
+    "sort": _action_sort,
+    "logout": _action_logout,
+    "login": _action_login,
+    "remove_from_cart": _action_remove_from_cart,
+    "continue_shopping": _action_continue_shopping,
+    "checkout": _action_checkout,
+    "fill_checkout_info": _action_fill_checkout_info,
+    "continue_checkout": _action_continue_checkout,
+    "finish_checkout": _action_finish_checkout,
+    "cancel_checkout": _action_cancel_checkout,
+    "back_to_products": _action_back_to_products,
+}
+
+
+# ========== 后置条件 ==========
+# 每个检查接收 (runner, 期望值)，不满足时抛出AssertionError
+def _check_url_contains(runner, expected):
+    url = runner.driver.current_url
+    for part in ([expected] if isinstance(expected, str) else expected):
+        assert part in url, f"当前页面不正确，期望URL包含{part}，实际{url}"
+
+
+def _check_url_not_contains(runner, expected):
+    url = runner.driver.current_url
+    for part in ([expected] if isinstance(expected, str) else expected):
+        assert part not in url, f"当前页面不正确，期望URL不包含{part}，实际{url}"
+
+
+def _check_cart_count(runner, expected):
+    inventory_page = InventoryPage(runner.driver)
+    if expected == "all":
+        expected = len(inventory_page.get_product_order()["products"])
+    cart_count = inventory_page.get_cart_count()
+    assert cart_count == expected, f"购物车数量不正确，期望{expected}，实际{cart_count}"
+
+
+def _check_cart_items(runner, expected):
+    cart_items = CartPage(runner.driver).get_cart_items()
+    assert len(cart_items) == expected, f"购物车商品数量不正确，期望{expected}，实际{len(cart_items)}"
+
+
+def _check_sorted(runner, expected):
+    sort = runner.context.get("sort")
+    assert sort is not None, "场景中没有执行排序步骤"
+    assert (sort["keys"] == sort["expected"]) == expected, \
+        f"排序{sort['value']}不正确: 当前{sort['keys']}, 期望{sort['expected']}"
+
+
+def _check_product_info(runner, index):
+    product_info = InventoryPage(runner.driver).get_product_details(index)
+    assert product_info is not None, "无法获取商品信息"
+    assert product_info["name"] != "", "商品名称为空"
+    assert product_info["desc"] != "", "商品描述为空"
+    assert "$" in product_info["price"], "商品价格格式不正确"
+
+
+CHECKS = {
+    "url_contains": _check_url_contains,
+    "url_not_contains": _check_url_not_contains,
+    "cart_count": _check_cart_count,
+    "cart_items": _check_cart_items,
+    "sorted": _check_sorted,
+    "product_info": _check_product_info,
+}
+
+
+class ScenarioRunner:
+    """在一个已登录的浏览器中执行场景，提供planner时共享前缀从检查点恢复"""
+
+    def __init__(self, driver, username=None, planner=None):
+        self.driver = driver
+        self.username = username
+        self.planner = planner
+        self.context = {}
+
+    def prepare(self, given):
+        """建立前置条件：预置状态并深链接，或确保停留在商品页"""
+        # 预置购物车后需要重新加载页面才能让应用读取新状态，未指定页面时加载商品页
+        page = given.page or ("inventory.html" if given.cart is not None else None)
+        if page is not None:
+            StateSeeder(self.driver).seed(given.cart, page=page)
+        else:
+            InventoryPage(self.driver).go_to("inventory.html")
+
+    def run_step(self, step):
+        """执行单个步骤并校验其后置条件"""
+        action = ACTIONS.get(step.action)
+        if action is None:
+            raise TestException(f"未知的场景动作: {step.action}")
+        with time_budget(step.budget, f"步骤 {step.action}"), progress_dashboard.action(step.action):
+            start = time.perf_counter()
+            self.context["last"] = action(self, *step.args)
+            run_metrics.action_duration.observe(time.perf_counter() - start, step.action)
+            self.verify(step.expect)
+
+    def verify(self, expect):
+        """校验后置条件"""
+        for name, expected in expect.items():
+            check = CHECKS.get(name)
+            if check is None:
+                raise TestException(f"未知的后置条件: {name}")
+            check(self, expected)
+
+    def run(self, scenario):
+        """执行完整场景"""
+        logger.info(f"用户 {self.username} 开始执行场景: {scenario.name}")
+        self.context = {}
+        with time_budget(scenario.budget, f"场景 {scenario.name}"):
+            start = self.planner.resume(self, scenario) if self.planner else None
+            if start is None:
+                self.prepare(scenario.given)
+                start = 0
+            for index, step in enumerate(scenario.steps[start:], start):
+                self.run_step(step)
+                if self.planner:
+                    self.planner.after_step(self, scenario, index + 1)
+            self.verify(scenario.expect)
+        logger.info(f"用户 {self.username} 场景执行成功: {scenario.name}")
+
+
+def _build_test(scenario, planner):
+    """把场景编译为按用户参数化的测试方法"""
+
+    def test(self, user_session, user_count):
+        try:
+            ScenarioRunner(user_session['driver'], user_session['username'], planner).run(scenario)
+        except DeadlineException:
+            # 超时原样抛出，报告中记为TIMEOUT并保留超时的步骤
+            raise
+        except TestException as e:
+            pytest.fail(f"测试执行失败: {str(e)}")
+        except Exception as e:
+            logger.error(f"测试意外失败: {str(e)}")
+            pytest.fail(f"测试意外失败: {str(e)}")
+
+    test.__name__ = test.__qualname__ = scenario.name
+    test.__doc__ = scenario.description
+    test.scenario = scenario  # 失败重跑时脱离pytest重新执行场景
+    test = pytest.mark.parametrize("user_count", range(len(USERNAMES)))(test)
+    if scenario.cacheable:
+        test = pytest.mark.result_cache(test)
+    if scenario.start_page != "inventory" or scenario.end_page != "inventory":
+        test = pytest.mark.navigation(start=scenario.start_page, end=scenario.end_page)(test)
+    return test
+
+
+def compile_scenarios(cls, scenarios, share_prefixes=SCENARIO_PREFIX_SHARING):
+    """将场景编译为测试类上的测试方法，方法名即场景名；share_prefixes时共享前缀只执行一次"""
+    planner = PrefixPlanner(scenarios) if share_prefixes else None
+    for scenario in scenarios:
+        if not scenario.name.startswith("test_"):
+            raise TestException(f"场景名必须以test_开头: {scenario.name}")
+        setattr(cls, scenario.name, _build_test(scenario, planner))
+    # 替换失效的浏览器时conftest通过它丢弃检查点
+    cls.scenario_planner = planner
+    return cls
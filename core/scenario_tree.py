@@ -0,0 +1,175 @@
+"""
+场景前缀树 - 把场景按共同前缀(前置条件 + 前几个步骤)合并，共享前缀只执行一次
+
+在共享前缀的末尾为浏览器状态建立检查点(cookie、localStorage、sessionStorage、URL)，
+后续分支场景直接恢复检查点再执行各自剩余的步骤。
+只保存在React组件内存中的状态(结账表单输入、排序选项)无法通过检查点恢复，
+因此包含这类动作的前缀不会建立检查点；恢复检查点需要整页加载，
+按重排代价表估算前缀的执行耗时不超过一次恢复时也不建立检查点。
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from config import BASE_URL, ORDERING_COSTS
+from core.dirty_state import dirty_state, CART
+from core.logger_config import logger
+from core.page_state import page_state
+
+# 状态只保存在页面内存中的动作，检查点无法恢复其效果
+VOLATILE_ACTIONS = frozenset(("fill_checkout_info", "sort"))
+
+# 检查点至少要覆盖前置条件之外的一个步骤才有意义(仅前置条件时直接预置更便宜)
+MIN_CHECKPOINT_DEPTH = 2
+
+# 跳转到其他页面的动作按导航代价估算，其余动作按一次页面操作估算
+NAVIGATION_ACTIONS = frozenset(("go_to_cart", "open_product", "continue_shopping", "checkout", "continue_checkout",
+                                "finish_checkout", "cancel_checkout", "back_to_products", "login", "logout"))
+
+_CAPTURE_STATE_JS = """/* captureState */
+var dump = function (storage) {
+    var out = {};
+    for (var i = 0; i < storage.length; i++) { var key = storage.key(i); out[key] = storage.getItem(key); }
+    return out;
+};
+return {url: window.location.href, localStorage: dump(window.localStorage), sessionStorage: dump(window.sessionStorage)};
+"""
+
+_RESTORE_STATE_JS = """/* restoreState */
+var state = arguments[0];
+window.localStorage.clear();
+window.sessionStorage.clear();
+Object.keys(state.localStorage).forEach(function (key) { window.localStorage.setItem(key, state.localStorage[key]); });
+Object.keys(state.sessionStorage).forEach(function (key) { window.sessionStorage.setItem(key, state.sessionStorage[key]); });
+"""
+
+
+def prefix_key(scenario):
+    """场景的前缀序列：第0项为前置条件，其后每项对应一个步骤"""
+    given = scenario.given
+    key = [("given", tuple(given.cart) if given.cart is not None else None, given.page)]
+    for step in scenario.steps:
+        key.append((step.action, repr(step.args), repr(sorted(step.expect.items()))))
+    return tuple(key)
+
+
+def prefix_cost(key):
+    """按重排代价表估算执行前缀(前置条件 + 步骤)的耗时(秒)"""
+    cost = 0.0
+    for item in key:
+        if item[0] == "given":
+            # 预置状态(一次脚本调用) + 深链接加载页面；未指定前置条件时停留在商品页
+            if item[1] is not None or item[2] is not None:
+                cost += ORDERING_COSTS["step"] + ORDERING_COSTS["navigation"]
+        elif item[0] in NAVIGATION_ACTIONS:
+            cost += ORDERING_COSTS["navigation"]
+        else:
+            cost += ORDERING_COSTS["step"]
+    return cost
+
+
+@dataclass
+class Checkpoint:
+    """浏览器状态检查点"""
+    url: str
+    cookies: List[Dict] = field(default_factory=list)
+    local_storage: Dict[str, str] = field(default_factory=dict)
+    session_storage: Dict[str, str] = field(default_factory=dict)
+    context: Dict = field(default_factory=dict)
+
+    @classmethod
+    def capture(cls, driver, context=None):
+        """一次脚本调用读取存储和URL，cookie通过WebDriver接口读取"""
+        state = driver.execute_script(_CAPTURE_STATE_JS)
+        cookies = [{"name": c["name"], "value": c["value"], "path": c.get("path", "/")}
+                   for c in driver.get_cookies()]
+        return cls(state["url"], cookies, state["localStorage"], state["sessionStorage"], dict(context or {}))
+
+    def restore(self, driver):
+        """恢复cookie和存储后重新加载检查点所在页面"""
+        if page_state.current(driver) is None:
+            driver.get(BASE_URL)
+        driver.delete_all_cookies()
+        for cookie in self.cookies:
+            driver.add_cookie(cookie)
+        driver.execute_script(_RESTORE_STATE_JS, {
+            "localStorage": self.local_storage, "sessionStorage": self.session_storage,
+        })
+        driver.get(self.url)
+        page_state.observe(driver, self.url)
+
+
+class PrefixPlanner:
+    """场景前缀树执行计划：决定每个场景在哪一步建立/恢复检查点"""
+
+    def __init__(self, scenarios, min_depth=MIN_CHECKPOINT_DEPTH):
+        self.min_depth = min_depth
+        self._prefix_counts = {}
+        for scenario in scenarios:
+            key = prefix_key(scenario)
+            for depth in range(1, len(key) + 1):
+                self._prefix_counts[key[:depth]] = self._prefix_counts.get(key[:depth], 0) + 1
+        self._depths = {scenario.name: self._checkpoint_depth(scenario) for scenario in scenarios}
+        self._checkpoints = {}
+        self.stats = {"checkpoints": 0, "restores": 0, "steps_skipped": 0}
+
+    def _checkpoint_depth(self, scenario):
+        """最深的、被至少两个场景共享、可恢复且执行比恢复更贵的前缀长度，0表示不建立检查点"""
+        key = prefix_key(scenario)
+        # 整个场景也可以是其他场景的前缀，此时在最后一步之后建立检查点
+        for depth in range(len(key), self.min_depth - 1, -1):
+            prefix = key[:depth]
+            if self._prefix_counts.get(prefix, 0) < 2 or any(item[0] in VOLATILE_ACTIONS for item in prefix):
+                continue
+            # 更短的前缀代价只会更低
+            return depth if prefix_cost(prefix) > ORDERING_COSTS["checkpoint_restore"] else 0
+        return 0
+
+    def shared_steps(self, scenario):
+        """可由检查点跳过的步骤数"""
+        depth = self._depths.get(scenario.name, 0)
+        return depth - 1 if depth else 0
+
+    def _checkpoint_id(self, runner, scenario):
+        depth = self._depths.get(scenario.name, 0)
+        return (runner.username, prefix_key(scenario)[:depth])
+
+    def resume(self, runner, scenario):
+        """存在可用检查点时恢复并返回已完成的步骤数，否则返回None"""
+        if not self.shared_steps(scenario):
+            return None
+        checkpoint = self._checkpoints.get(self._checkpoint_id(runner, scenario))
+        if checkpoint is None:
+            return None
+        try:
+            checkpoint.restore(runner.driver)
+        except Exception as e:
+            logger.warning(f"恢复检查点失败，重新执行前缀: {str(e)}")
+            self._checkpoints.pop(self._checkpoint_id(runner, scenario), None)
+            return None
+        if checkpoint.local_storage:
+            dirty_state.mark(runner.driver, CART)
+        runner.context.update(checkpoint.context)
+        steps = self.shared_steps(scenario)
+        self.stats["restores"] += 1
+        self.stats["steps_skipped"] += steps
+        logger.info(f"场景 {scenario.name} 从检查点恢复，跳过 {steps} 个共享步骤")
+        return steps
+
+    def after_step(self, runner, scenario, steps_done):
+        """执行到共享前缀末尾时建立检查点"""
+        if steps_done != self.shared_steps(scenario) or steps_done == 0:
+            return
+        checkpoint_id = self._checkpoint_id(runner, scenario)
+        if checkpoint_id in self._checkpoints:
+            return
+        try:
+            self._checkpoints[checkpoint_id] = Checkpoint.capture(runner.driver, runner.context)
+            self.stats["checkpoints"] += 1
+            logger.debug(f"场景 {scenario.name} 在第 {steps_done} 步建立检查点")
+        except Exception as e:
+            logger.warning(f"建立检查点失败: {str(e)}")
+
+    def invalidate(self, username=None):
+        """丢弃检查点(如会话失效)，username为None时全部丢弃"""
+        for checkpoint_id in [cid for cid in self._checkpoints if username is None or cid[0] == username]:
+            del self._checkpoints[checkpoint_id]
@@ -0,0 +1,91 @@
+"""
+会话健康检查 - 用例之间探测共享浏览器是否存活，失效时替换浏览器并重新登录当前用户
+
+探测命令在独立线程中执行并设置截止时间：浏览器崩溃时命令立即报错，浏览器卡死时命令超过截止时间未返回，
+两种情况都判定为会话失效。失效的浏览器在后台关闭，不阻塞后续用例。
+"""
+import threading
+import time
+
+from config import PASSWORD, SESSION_PING_DEADLINE
+from core.dirty_state import dirty_state
+from core.exceptions import ElementException, LoginException
+from core.logger_config import logger
+from core.webdriver_utils import WebDriverManager
+
+
+class SessionHealthMonitor:
+    """共享浏览器会话的健康检查与替换"""
+
+    def __init__(self, ping_deadline=SESSION_PING_DEADLINE, factory=None):
+        self.ping_deadline = ping_deadline
+        self.factory = factory or WebDriverManager.create_driver
+        self.last_error = ""
+        self.stats = {"pings": 0, "dead": 0, "hung": 0, "replaced": 0}
+
+    def ping(self, driver, deadline=None):
+        """在截止时间内读取当前URL，返回会话是否健康"""
+        deadline = self.ping_deadline if deadline is None else deadline
+        outcome = {}
+
+        def probe():
+            try:
+                outcome["url"] = driver.current_url
+            except Exception as e:
+                outcome["error"] = e
+
+        self.stats["pings"] += 1
+        thread = threading.Thread(target=probe, name="session-ping", daemon=True)
+        thread.start()
+        thread.join(deadline)
+        if thread.is_alive():
+            self.stats["hung"] += 1
+            self.last_error = f"浏览器在 {deadline}s 内未响应"
+        elif "error" in outcome:
+            self.stats["dead"] += 1
+            self.last_error = f"浏览器会话已失效: {str(outcome['error'])}"
+        else:
+            return True
+        logger.error(f"会话健康检查失败: {self.last_error}")
+        return False
+
+    def _abandon(self, driver):
+        """后台关闭失效的浏览器；卡死时直接结束驱动进程"""
+        def close():
+            closer = threading.Thread(target=WebDriverManager.close_driver, args=(driver,), daemon=True)
+            closer.start()
+            closer.join(self.ping_deadline)
+            process = getattr(getattr(driver, "service", None), "process", None)
+            if closer.is_alive() and process is not None:
+                logger.warning("关闭卡死的浏览器超时，结束驱动进程")
+                process.kill()
+
+        dirty_state.clear(driver)
+        threading.Thread(target=close, name="session-abandon", daemon=True).start()
+
+    def replace(self, driver, username=None):
+        """替换失效的浏览器，username不为None时重新登录该用户"""
+        from pages.page_objects import LoginPage
+
+        start = time.perf_counter()
+        self._abandon(driver)
+        try:
+            new_driver = self.factory()
+        except Exception as e:
+            raise ElementException(f"替换失效浏览器失败: {str(e)}", e)
+        if username is not None:
+            try:
+                login_page = LoginPage(new_driver)
+                login_page.login(username, PASSWORD)
+                if not login_page.is_login_success():
+                    raise LoginException(f"替换浏览器后用户 {username} 重新登录失败")
+            except Exception:
+                WebDriverManager.close_driver(new_driver)
+                raise
+        self.stats["replaced"] += 1
+        logger.warning(f"已替换失效的浏览器并重新登录用户 {username}，耗时 {time.perf_counter() - start:.2f}s")
+        return new_driver
+
+
+# 全局会话健康检查实例
+session_health = SessionHealthMonitor()
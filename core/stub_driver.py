@@ -0,0 +1,1193 @@
+"""
+本地桩驱动 - 模拟msedgedriver + SauceDemo页面的W3C WebDriver服务
+
+不依赖真实浏览器，按W3C协议响应会话、导航、元素查找、点击、输入、Cookie和脚本执行等命令，
+页面结构与SauceDemo保持一致，现有页面对象可以不加修改地在其上运行。
+用于验证传输层、异步客户端、负载模式等基础设施，也可作为本地替身目标(stand-in target)。
+页面对象注入的脚本由SCRIPT_HANDLERS按Python实现模拟，原始脚本在test_page_scripts.py中由Node.js执行核对。
+"""
+import base64
+import fnmatch
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+
+# SauceDemo商品数据 (默认按名称A-Z排列)
+PRODUCTS = [
+    {"id": 4, "name": "Sauce Labs Backpack", "price": 29.99,
+     "desc": "carry.allTheThings() with the sleek, streamlined Sly Pack that melds uncompromising style with unequaled laptop and tablet protection."},
+    {"id": 0, "name": "Sauce Labs Bike Light", "price": 9.99,
+     "desc": "A red light isn't the desired state in testing but it sure helps when riding your bike at night."},
+    {"id": 1, "name": "Sauce Labs Bolt T-Shirt", "price": 15.99,
+     "desc": "Get your testing superhero on with the Sauce Labs bolt T-shirt."},
+    {"id": 5, "name": "Sauce Labs Fleece Jacket", "price": 49.99,
+     "desc": "It's not every day that you come across a midweight quarter-zip fleece jacket capable of handling everything."},
+    {"id": 2, "name": "Sauce Labs Onesie", "price": 7.99,
+     "desc": "Rib snap infant onesie for the junior automation engineer in development."},
+    {"id": 3, "name": "Test.allTheThings() T-Shirt (Red)", "price": 15.99,
+     "desc": "This classic Sauce Labs t-shirt is perfect to wear when cozying up to your keyboard to automate a few tests."},
+]
+PRODUCTS_BY_ID = {p["id"]: p for p in PRODUCTS}
+
+VALID_USERS = {
+    "standard_user", "problem_user", "performance_glitch_user",
+    "locked_out_user", "error_user", "visual_user",
+}
+VALID_PASSWORD = "secret_sauce"
+
+# 需要登录才能访问的页面
+PROTECTED_PAGES = {
+    "inventory.html", "cart.html", "checkout-step-one.html",
+    "checkout-step-two.html", "checkout-complete.html", "inventory-item.html",
+}
+
+SESSION_COOKIE = "session-username"
+CART_STORAGE_KEY = "cart-contents"
+
+# 整页加载时请求的资源，用于在替身目标上模拟网络整形(屏蔽、缓存、占位图)的效果
+STATIC_ASSETS = ["static/js/main.018d2d1e.js", "static/css/main.a8f1a2f4.css", "static/media/DMSans-Regular.woff2"]
+ANALYTICS_URLS = ["https://www.google-analytics.com/analytics.js",
+                  "https://events.backtrace.io/api/unique-events/submit"]
+# 磁盘缓存目录中记录已缓存资源的文件(代替浏览器真实的缓存文件)
+DISK_CACHE_INDEX = "stub_cache.json"
+
+# 1x1透明PNG，截图命令返回
+_BLANK_PNG = base64.b64encode(bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c6360000002000001e221bc330000000049454e44ae426082"
+)).decode("ascii")
+
+
+class StubError(Exception):
+    """桩驱动内部错误，按W3C错误码返回给客户端"""
+
+    def __init__(self, error, message="", status=404):
+        super().__init__(message or error)
+        self.error = error
+        self.message = message or error
+        self.status = status
+
+
+def _slug(name):
+    """生成SauceDemo风格的按钮ID后缀"""
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+
+class Node:
+    """桩页面中的DOM节点"""
+
+    __slots__ = ("key", "tag", "attrs", "text", "children", "action", "parent")
+
+    def __init__(self, key, tag, attrs=None, text="", children=None, action=None):
+        self.key = key
+        self.tag = tag
+        self.attrs = attrs or {}
+        self.text = text
+        self.children = children or []
+        self.action = action
+        self.parent = None
+        for child in self.children:
+            child.parent = self
+
+    @property
+    def classes(self):
+        return self.attrs.get("class", "").split()
+
+    def iter_descendants(self):
+        """深度优先遍历所有后代节点"""
+        for child in self.children:
+            yield child
+            yield from child.iter_descendants()
+
+    def inner_text(self):
+        """获取节点及后代的可见文本"""
+        parts = [self.text] if self.text else []
+        parts.extend(child.inner_text() for child in self.children)
+        return "\n".join(part for part in parts if part)
+
+
+# ========== 选择器匹配 ==========
+_COMPOUND_RE = re.compile(
+    r"([\w-]+|\*)|#([\w-]+)|\.([\w-]+)"
+    r"|\[\s*([\w-]+)\s*(?:([\^$*]?=)\s*(?:\"([^\"]*)\"|'([^']*)'|([^\]\s]+)))?\s*\]"
+)
+_XPATH_RE = re.compile(
+    r"^(\.)?//(\*|[\w-]+)(?:\[contains\(\s*text\(\)\s*,\s*(?:'([^']*)'|\"([^\"]*)\")\s*\)\])?$"
+)
+
+
+def _split_descendants(selector):
+    """按空白拆分后代选择器，忽略方括号内的空白"""
+    parts, depth, current = [], 0, ""
+    for char in selector.strip():
+        if char == "[":
+            depth += 1
+        elif char == "]":
+            depth -= 1
+        if char.isspace() and depth == 0:
+            if current:
+                parts.append(current)
+            current = ""
+        else:
+            current += char
+    if current:
+        parts.append(current)
+    return parts
+
+
+def _parse_compound(compound):
+    """解析复合选择器为条件列表"""
+    conditions, pos = [], 0
+    while pos < len(compound):
+        match = _COMPOUND_RE.match(compound, pos)
+        if not match or match.end() == pos:
+            raise StubError("invalid selector", f"不支持的选择器: {compound}", 400)
+        tag, id_, cls, attr, op, v1, v2, v3 = match.groups()
+        if tag:
+            conditions.append(("tag", tag))
+        elif id_:
+            conditions.append(("attr", "id", "=", id_))
+        elif cls:
+            conditions.append(("class", cls))
+        else:
+            value = next((v for v in (v1, v2, v3) if v is not None), None)
+            conditions.append(("attr", attr, op, value))
+        pos = match.end()
+    return conditions
+
+
+def _match_compound(node, conditions):
+    for condition in conditions:
+        kind = condition[0]
+        if kind == "tag":
+            if condition[1] != "*" and node.tag != condition[1]:
+                return False
+        elif kind == "class":
+            if condition[1] not in node.classes:
+                return False
+        else:
+            _, attr, op, value = condition
+            actual = node.attrs.get(attr)
+            if actual is None:
+                return False
+            if op == "=" and actual != value:
+                return False
+            if op == "^=" and not actual.startswith(value):
+                return False
+            if op == "$=" and not actual.endswith(value):
+                return False
+            if op == "*=" and value not in actual:
+                return False
+    return True
+
+
+def css_select(scope, selector):
+    """在scope的后代中按CSS选择器查找节点"""
+    results = []
+    for single in selector.split(","):
+        chain = [_parse_compound(part) for part in _split_descendants(single)]
+        if not chain:
+            continue
+        for node in scope.iter_descendants():
+            if not _match_compound(node, chain[-1]) or node in results:
+                continue
+            # 后代组合器：自右向左贪心匹配祖先(与浏览器一样可以越过scope)
+            remaining = chain[:-1]
+            ancestor = node.parent
+            while remaining and ancestor is not None:
+                if _match_compound(ancestor, remaining[-1]):
+                    remaining = remaining[:-1]
+                ancestor = ancestor.parent
+            if not remaining:
+                results.append(node)
+    return results
+
+
+def xpath_select(scope, expression):
+    """在scope的后代中按简单XPath(//tag[contains(text(),'x')])查找节点"""
+    match = _XPATH_RE.match(expression.strip())
+    if not match:
+        raise StubError("invalid selector", f"不支持的XPath: {expression}", 400)
+    _, tag, text1, text2 = match.groups()
+    text = text1 if text1 is not None else text2
+    return [
+        node for node in scope.iter_descendants()
+        if (tag == "*" or node.tag == tag) and (text is None or text in node.text)
+    ]
+
+
+# ========== 会话与页面模型 ==========
+class StubSession:
+    """单个浏览器会话的状态"""
+
+    def __init__(self, session_id, server):
+        self.session_id = session_id
+        self.server = server
+        self.lock = threading.RLock()
+        self.base_url = server.base_url
+        self.page = "login"
+        self.query = {}
+        self.url = self.base_url
+        self.history = []
+        self.cookies = {}
+        self.local_storage = {}
+        self.session_storage = {}
+        self.inputs = {}
+        self.error = ""
+        self.sort = "az"
+        self.menu_open = False
+        self.render_gen = 0
+        self.page_loads = 0
+        self.route_changes = 0
+        self._root = None
+        # 网络层：CDP屏蔽规则、HTTP缓存(指定了磁盘缓存目录时从中读取，会话结束时写回)、资源请求计数
+        self.blocked_urls = []
+        self.cache_disabled = False
+        self.cache_dir = None
+        self.http_cache = set()
+        self.init_scripts = []
+        self.network = {"fetched": 0, "cached": 0, "blocked": 0}
+
+    # ----- 状态访问 -----
+    @property
+    def username(self):
+        return self.cookies.get(SESSION_COOKIE, {}).get("value")
+
+    @property
+    def cart(self):
+        try:
+            return json.loads(self.local_storage.get(CART_STORAGE_KEY, "[]"))
+        except ValueError:
+            return []
+
+    def set_cart(self, ids):
+        if ids:
+            self.local_storage[CART_STORAGE_KEY] = json.dumps(list(ids))
+        else:
+            self.local_storage.pop(CART_STORAGE_KEY, None)
+        self.invalidate()
+
+    def invalidate(self, stale=False):
+        """标记DOM需要重新渲染；stale=True时旧元素引用全部失效"""
+        self._root = None
+        if stale:
+            self.render_gen += 1
+
+    # ----- 导航 -----
+    def load(self, url):
+        """整页加载(driver.get)"""
+        self.page_loads += 1
+        self._route(url, full_load=True)
+        fetched = self._fetch_resources()
+        if self.server.resource_latency:
+            time.sleep(fetched * self.server.resource_latency)
+
+    def _page_resources(self):
+        urls = [self.base_url + asset for asset in STATIC_ASSETS] + list(ANALYTICS_URLS)
+        if self.page == "inventory":
+            products = PRODUCTS
+        elif self.page == "inventory-item":
+            products = [PRODUCTS_BY_ID[int(self.query["id"])]] if self.query.get("id", "").isdigit() else []
+        else:
+            products = []
+        return urls + [f"{self.base_url}static/media/{_slug(p['name'])}-1200x1500.jpg" for p in products]
+
+    def _fetch_resources(self):
+        """按屏蔽规则和缓存加载页面资源，返回实际经网络下载的资源数"""
+        fetched = 0
+        for url in self._page_resources():
+            if any(fnmatch.fnmatchcase(url, pattern) for pattern in self.blocked_urls):
+                self.network["blocked"] += 1
+            elif url in self.http_cache and not self.cache_disabled:
+                self.network["cached"] += 1
+            else:
+                fetched += 1
+                self.network["fetched"] += 1
+                if url.startswith(self.base_url + "static/"):
+                    self.http_cache.add(url)
+        return fetched
+
+    def route(self, path):
+        """应用内路由跳转(点击链接/按钮)"""
+        self.route_changes += 1
+        self._route(self.base_url + path, full_load=False)
+
+    def _route(self, url, full_load):
+        parsed = urlparse(url)
+        page = parsed.path.rsplit("/", 1)[-1] or "index.html"
+        if full_load:
+            self.menu_open = False
+            self.inputs = {}
+            self.error = ""
+        previous = self.page
+        self.history.append(self.url)
+        if page in PROTECTED_PAGES and not self.username:
+            self.page, self.query, self.url = "login", {}, self.base_url
+            self.error = f"Epic sadface: You can only access '/{page}' when you are logged in."
+        elif page == "index.html":
+            self.page, self.query, self.url = "login", {}, self.base_url
+        else:
+            self.page = page[:-len(".html")] if page.endswith(".html") else page
+            self.query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+            self.url = self.base_url + page + (f"?{parsed.query}" if parsed.query else "")
+            if not full_load:
+                self.error = ""
+        # 排序选项和表单输入是页面组件状态，重新加载或切换到其他页面(组件重新挂载)后恢复默认
+        if full_load or self.page != previous:
+            self.sort = "az"
+            self.inputs = {}
+        self.invalidate(stale=True)
+
+    # ----- 渲染 -----
+    @property
+    def root(self):
+        if self._root is None:
+            self._root = Node("root", "html", children=[Node("body", "body", children=self._render_page())])
+        return self._root
+
+    def _render_page(self):
+        renderer = getattr(self, f"_render_{self.page.replace('-', '_')}", None)
+        if renderer is None:
+            return [Node("not-found", "h1", text="404")]
+        return renderer()
+
+    def _input(self, element_id, data_test=None, **attrs):
+        return Node(f"input:{element_id}", "input",
+                    dict(id=element_id, name=element_id, value=self.inputs.get(element_id, ""),
+                         **{"data-test": data_test or element_id}, **attrs))
+
+    def _error_node(self):
+        if not self.error:
+            return []
+        return [Node("error", "h3", {"data-test": "error"}, text=self.error)]
+
+    def _header(self):
+        badge = []
+        if self.cart:
+            badge = [Node("cart-badge", "span", {"class": "shopping_cart_badge", "data-test": "shopping-cart-badge"},
+                          text=str(len(self.cart)))]
+        menu = [
+            Node("menu-btn", "button", {"id": "react-burger-menu-btn"}, text="Open Menu",
+                 action=lambda: self._set_menu(True)),
+            Node("menu", "nav", {"class": "bm-item-list"}, children=[
+                Node("menu-inventory", "a", {"id": "inventory_sidebar_link", "class": "bm-item menu-item"},
+                     text="All Items", action=lambda: self.route("inventory.html")),
+                Node("menu-logout", "a", {"id": "logout_sidebar_link", "class": "bm-item menu-item"},
+                     text="Logout", action=self._logout),
+                Node("menu-reset", "a", {"id": "reset_sidebar_link", "class": "bm-item menu-item"},
+                     text="Reset App State", action=lambda: self.set_cart([])),
+            ]),
+            Node("menu-close", "button", {"id": "react-burger-cross-btn"}, text="Close Menu",
+                 action=lambda: self._set_menu(False)),
+        ]
+        return [
+            Node("header", "div", {"class": "primary_header"}, children=menu + [
+                Node("cart-link", "a", {"class": "shopping_cart_link", "data-test": "shopping-cart-link"},
+                     children=badge, action=lambda: self.route("cart.html")),
+            ])
+        ]
+
+    def _cart_toggle_button(self, product, key_prefix):
+        in_cart = product["id"] in self.cart
+        prefix = "remove" if in_cart else "add-to-cart"
+        return Node(f"{key_prefix}:{product['id']}:toggle", "button",
+                    {"id": f"{prefix}-{_slug(product['name'])}", "class": "btn btn_inventory"},
+                    text="Remove" if in_cart else "Add to cart",
+                    action=lambda pid=product["id"]: self._toggle_cart(pid))
+
+    def _sorted_products(self):
+        key, reverse = {
+            "az": (lambda p: p["name"], False),
+            "za": (lambda p: p["name"], True),
+            "lohi": (lambda p: p["price"], False),
+            "hilo": (lambda p: p["price"], True),
+        }.get(self.sort, (lambda p: p["name"], False))
+        return sorted(PRODUCTS, key=key, reverse=reverse)
+
+    def _render_login(self):
+        return [
+            Node("login-box", "div", {"class": "login-box"}, children=[
+                self._input("user-name", data_test="username"),
+                self._input("password", type="password"),
+                Node("login-button", "input", {"id": "login-button", "type": "submit", "value": "Login"},
+                     action=self._submit_login),
+            ] + self._error_node())
+        ]
+
+    def _render_inventory(self):
+        options = [
+            Node(f"sort-option:{value}", "option", {"value": value}, text=label,
+                 action=lambda v=value: self._set_sort(v))
+            for value, label in (("az", "Name (A to Z)"), ("za", "Name (Z to A)"),
+                                 ("lohi", "Price (low to high)"), ("hilo", "Price (high to low)"))
+        ]
+        items = []
+        for product in self._sorted_products():
+            pid = product["id"]
+            items.append(Node(f"product:{pid}", "div", {"class": "inventory_item"}, children=[
+                Node(f"product:{pid}:img", "div", {"class": "inventory_item_img"}, children=[
+                    Node(f"product:{pid}:img-link", "a", {"id": f"item_{pid}_img_link"},
+                         action=lambda p=pid: self.route(f"inventory-item.html?id={p}"),
+                         children=[Node(f"product:{pid}:img-src", "img", {"class": "inventory_item_img"})]),
+                ]),
+                Node(f"product:{pid}:name", "div", {"class": "inventory_item_name"}, text=product["name"],
+                     action=lambda p=pid: self.route(f"inventory-item.html?id={p}")),
+                Node(f"product:{pid}:desc", "div", {"class": "inventory_item_desc"}, text=product["desc"]),
+                Node(f"product:{pid}:price", "div", {"class": "inventory_item_price"}, text=f"${product['price']:.2f}"),
+                self._cart_toggle_button(product, "product"),
+            ]))
+        return self._header() + [
+            Node("sort", "select", {"class": "product_sort_container", "data-test": "product-sort-container"},
+                 children=options),
+            Node("inventory-container", "div", {"class": "inventory_container"}, children=[
+                Node("inventory-list", "div", {"class": "inventory_list"}, children=items),
+            ]),
+        ]
+
+    def _cart_item_nodes(self, removable):
+        nodes = []
+        for pid in self.cart:
+            product = PRODUCTS_BY_ID.get(pid)
+            if product is None:
+                continue
+            children = [
+                Node(f"cart:{pid}:qty", "div", {"class": "cart_quantity"}, text="1"),
+                Node(f"cart:{pid}:name", "div", {"class": "inventory_item_name"}, text=product["name"]),
+                Node(f"cart:{pid}:price", "div", {"class": "inventory_item_price"}, text=f"${product['price']:.2f}"),
+            ]
+            if removable:
+                children.append(self._cart_toggle_button(product, "cart"))
+            nodes.append(Node(f"cart:{pid}", "div", {"class": "cart_item"}, children=children))
+        return nodes
+
+    def _render_cart(self):
+        return self._header() + [
+            Node("cart-list", "div", {"class": "cart_list"}, children=self._cart_item_nodes(removable=True)),
+            Node("continue-shopping", "button", {"id": "continue-shopping"}, text="Continue Shopping",
+                 action=lambda: self.route("inventory.html")),
+            Node("checkout", "button", {"id": "checkout"}, text="Checkout",
+                 action=lambda: self.route("checkout-step-one.html")),
+        ]
+
+    def _render_checkout_step_one(self):
+        return self._header() + [
+            self._input("first-name", data_test="firstName"),
+            self._input("last-name", data_test="lastName"),
+            self._input("postal-code", data_test="postalCode"),
+            Node("continue", "input", {"id": "continue", "type": "submit", "value": "Continue"},
+                 action=self._submit_checkout_info),
+            Node("cancel", "button", {"id": "cancel"}, text="Cancel", action=lambda: self.route("cart.html")),
+        ] + self._error_node()
+
+    def _render_checkout_step_two(self):
+        total = sum(PRODUCTS_BY_ID[pid]["price"] for pid in self.cart if pid in PRODUCTS_BY_ID)
+        return self._header() + [
+            Node("summary-list", "div", {"class": "cart_list"}, children=self._cart_item_nodes(removable=False)),
+            Node("summary-subtotal", "div", {"class": "summary_subtotal_label"}, text=f"Item total: ${total:.2f}"),
+            Node("finish", "button", {"id": "finish"}, text="Finish", action=self._finish_checkout),
+            Node("cancel", "button", {"id": "cancel"}, text="Cancel", action=lambda: self.route("inventory.html")),
+        ]
+
+    def _render_checkout_complete(self):
+        return self._header() + [
+            Node("complete-header", "h2", {"class": "complete-header"}, text="Thank you for your order!"),
+            Node("back-to-products", "button", {"id": "back-to-products"}, text="Back Home",
+                 action=lambda: self.route("inventory.html")),
+        ]
+
+    def _render_inventory_item(self):
+        try:
+            product = PRODUCTS_BY_ID[int(self.query.get("id", -1))]
+        except (ValueError, KeyError):
+            return self._header() + [Node("item-not-found", "div", {"class": "inventory_details_name"},
+                                          text="ITEM NOT FOUND")]
+        return self._header() + [
+            Node("back-to-products", "button", {"id": "back-to-products"}, text="Back to products",
+                 action=lambda: self.route("inventory.html")),
+            Node("details-name", "div", {"class": "inventory_details_name"}, text=product["name"]),
+            Node("details-desc", "div", {"class": "inventory_details_desc"}, text=product["desc"]),
+            Node("details-price", "div", {"class": "inventory_details_price"}, text=f"${product['price']:.2f}"),
+            self._cart_toggle_button(product, "details"),
+        ]
+
+    # ----- 交互动作 -----
+    def _set_menu(self, is_open):
+        self.menu_open = is_open
+
+    def _set_sort(self, value):
+        self.sort = value
+        self.invalidate()
+
+    def _toggle_cart(self, pid):
+        cart = self.cart
+        if pid in cart:
+            cart.remove(pid)
+        else:
+            cart.append(pid)
+        self.set_cart(cart)
+
+    def _submit_login(self):
+        username = self.inputs.get("user-name", "")
+        password = self.inputs.get("password", "")
+        if not username:
+            self.error = "Epic sadface: Username is required"
+        elif not password:
+            self.error = "Epic sadface: Password is required"
+        elif username not in VALID_USERS or password != VALID_PASSWORD:
+            self.error = "Epic sadface: Username and password do not match any user in this service"
+        elif username == "locked_out_user":
+            self.error = "Epic sadface: Sorry, this user has been locked out."
+        else:
+            self.cookies[SESSION_COOKIE] = {"name": SESSION_COOKIE, "value": username, "path": "/"}
+            self.inputs = {}
+            self.route("inventory.html")
+            return
+        self.invalidate()
+
+    def _submit_checkout_info(self):
+        for field, label in (("first-name", "First Name"), ("last-name", "Last Name"), ("postal-code", "Postal Code")):
+            if not self.inputs.get(field):
+                self.error = f"Error: {label} is required"
+                self.invalidate()
+                return
+        self.route("checkout-step-two.html")
+
+    def _finish_checkout(self):
+        self.set_cart([])
+        self.route("checkout-complete.html")
+
+    def _logout(self):
+        self.cookies.pop(SESSION_COOKIE, None)
+        self.menu_open = False
+        self.route("index.html")
+
+    # ----- 元素引用 -----
+    def reference(self, node):
+        return {ELEMENT_KEY: f"{self.render_gen}.{node.key}"}
+
+    def resolve(self, element_id):
+        """根据元素引用找到当前DOM中的节点"""
+        gen, _, key = element_id.partition(".")
+        if gen != str(self.render_gen):
+            raise StubError("stale element reference", f"元素已失效: {element_id}")
+        for node in self.root.iter_descendants():
+            if node.key == key:
+                return node
+        raise StubError("stale element reference", f"元素已从DOM移除: {element_id}")
+
+    def is_displayed(self, node):
+        while node is not None:
+            if node.key == "menu" and not self.menu_open:
+                return False
+            node = node.parent
+        return True
+
+    def find(self, scope, using, value):
+        if using == "css selector":
+            return css_select(scope, value)
+        if using == "xpath":
+            return xpath_select(scope, value)
+        if using == "tag name":
+            return [node for node in scope.iter_descendants() if node.tag == value]
+        if using in ("link text", "partial link text"):
+            return [node for node in scope.iter_descendants()
+                    if node.tag == "a" and (node.text == value if using == "link text" else value in node.text)]
+        raise StubError("invalid argument", f"不支持的定位策略: {using}", 400)
+
+    def click(self, node):
+        if not self.is_displayed(node):
+            raise StubError("element not interactable", "元素不可见", 400)
+        if node.action is not None:
+            node.action()
+
+    def send_keys(self, node, text):
+        element_id = node.attrs.get("id")
+        if node.tag != "input" or element_id is None:
+            raise StubError("element not interactable", "元素不可输入", 400)
+        self.inputs[element_id] = self.inputs.get(element_id, "") + text
+        self.invalidate()
+
+    def clear(self, node):
+        element_id = node.attrs.get("id")
+        if element_id is not None:
+            self.inputs[element_id] = ""
+            self.invalidate()
+
+    def property_of(self, node, name):
+        if name == "value":
+            if node.tag == "input":
+                return self.inputs.get(node.attrs.get("id"), node.attrs.get("value", ""))
+            if node.tag == "select" and node.key == "sort":
+                return self.sort
+        if name in ("innerText", "textContent"):
+            return node.inner_text()
+        if name == "tagName":
+            return node.tag.upper()
+        if name == "selected":
+            return self.is_selected(node)
+        if name == "className":
+            return node.attrs.get("class", "")
+        return node.attrs.get(name)
+
+    def is_selected(self, node):
+        return node.tag == "option" and node.attrs.get("value") == self.sort
+
+    # ----- 脚本执行 -----
+    def execute_script(self, script, args):
+        match = re.match(r"\s*/\*\s*([\w:.-]+)\s*\*/", script)
+        name = match.group(1) if match else None
+        handler = SCRIPT_HANDLERS.get(name)
+        if handler is None:
+            raise StubError("javascript error", f"桩驱动不支持该脚本: {script[:60]!r}", 500)
+        return handler(self, *[self.unwrap(arg) for arg in args])
+
+    def unwrap(self, value):
+        if isinstance(value, dict):
+            if ELEMENT_KEY in value:
+                return self.resolve(value[ELEMENT_KEY])
+            return {k: self.unwrap(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self.unwrap(v) for v in value]
+        return value
+
+    def wrap(self, value):
+        if isinstance(value, Node):
+            return self.reference(value)
+        if isinstance(value, dict):
+            return {k: self.wrap(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [self.wrap(v) for v in value]
+        return value
+
+    def page_source(self):
+        def render(node, depth=0):
+            attrs = "".join(f' {k}="{v}"' for k, v in node.attrs.items())
+            inner = "".join(render(child, depth + 1) for child in node.children)
+            return f"<{node.tag}{attrs}>{node.text}{inner}</{node.tag}>"
+        return "<!DOCTYPE html>" + render(self.root)
+
+
+def _seed_state(session, state, *args):
+    """对应pages.state_seeding中的seedState脚本"""
+    for name, value in (state.get("cookies") or {}).items():
+        session.cookies[name] = {"name": name, "value": value, "path": "/"}
+    for key, value in (state.get("localStorage") or {}).items():
+        if value is None:
+            session.local_storage.pop(key, None)
+        else:
+            session.local_storage[key] = value
+    session.invalidate()
+
+
+def _audit_state(session, *args):
+    """对应InventoryPage.audit_app_state中的auditState脚本"""
+    return {
+        "cart": session.local_storage.get(CART_STORAGE_KEY),
+        "sort": session.sort if session.page == "inventory" else None,
+        "url": session.url,
+    }
+
+
+def _product_order(session, *args):
+    """对应InventoryPage.get_product_order中的productOrder脚本"""
+    if session.page != "inventory":
+        return {"sort": None, "products": []}
+    return {
+        "sort": session.sort,
+        "products": [{"name": p["name"], "price": p["price"]} for p in session._sorted_products()],
+    }
+
+
+def _capture_state(session, *args):
+    """对应core.scenario_tree中的captureState脚本"""
+    return {"url": session.url, "localStorage": dict(session.local_storage),
+            "sessionStorage": dict(session.session_storage)}
+
+
+def _restore_state(session, state, *args):
+    """对应core.scenario_tree中的restoreState脚本"""
+    session.local_storage = dict(state.get("localStorage") or {})
+    session.session_storage = dict(state.get("sessionStorage") or {})
+    session.invalidate()
+
+
+def _fill_form(session, fields, submit, *args):
+    """对应core.webdriver_utils.ElementOperations.fill_form中的fillForm脚本"""
+    result = {"values": {}, "missing": [], "submitted": False}
+    for field in fields:
+        nodes = css_select(session.root, field["selector"])
+        if not nodes or nodes[0].tag != "input":
+            result["missing"].append(field["selector"])
+            continue
+        session.inputs[nodes[0].attrs["id"]] = field["value"]
+        result["values"][field["selector"]] = session.property_of(nodes[0], "value")
+    session.invalidate()
+    if submit and all(result["values"].get(f["selector"]) == f["value"] for f in fields):
+        buttons = css_select(session.root, submit)
+        if buttons:
+            session.click(buttons[0])
+            result["submitted"] = True
+        else:
+            result["missing"].append(submit)
+    return result
+
+
+def _route_to(session, url, base, *args):
+    """对应pages.page_objects.BasePage.route_to中的routeTo脚本"""
+    if not session.url.startswith(base):
+        return False
+    session.route(url[len(base):])
+    return True
+
+
+# 脚本处理器：以脚本开头的 /* 名称 */ 注释识别，与Selenium内置原子脚本的约定一致
+SCRIPT_HANDLERS = {
+    "seedState": _seed_state,
+    "auditState": _audit_state,
+    "productOrder": _product_order,
+    "captureState": _capture_state,
+    "restoreState": _restore_state,
+    "routeTo": _route_to,
+    "fillForm": _fill_form,
+    "isDisplayed": lambda session, node, *args: session.is_displayed(node),
+    "getAttribute": lambda session, node, name, *args: session.property_of(node, name),
+}
+
+
+# ========== HTTP服务 ==========
+_ROUTES = []
+
+
+def _route(method, pattern):
+    def decorator(func):
+        _ROUTES.append((method, re.compile(f"^{pattern}$"), func))
+        return func
+    return decorator
+
+
+class _StubRequestHandler(BaseHTTPRequestHandler):
+    """W3C WebDriver请求处理器 (HTTP/1.1，支持keep-alive)"""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "StubEdgeDriver/1.0"
+    # 响应头和响应体分两次写出，不关闭Nagle算法时会与客户端的延迟ACK叠加，每个请求多等约40ms
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        with self.server.stub.stats_lock:
+            self.server.stub.stats["connections"] += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _dispatch(self, method):
+        stub = self.server.stub
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        try:
+            payload = json.loads(raw) if raw.strip() else {}
+        except ValueError:
+            payload = {}
+        path = urlparse(self.path).path.rstrip("/") or "/"
+        with stub.stats_lock:
+            stub.stats["requests"] += 1
+        if stub.latency:
+            time.sleep(stub.latency)
+        for route_method, pattern, func in _ROUTES:
+            match = pattern.match(path)
+            if route_method == method and match:
+                with stub.stats_lock:
+                    stub.stats["commands"][func.__name__] = stub.stats["commands"].get(func.__name__, 0) + 1
+                try:
+                    status, value = 200, func(stub, payload, **match.groupdict())
+                except StubError as e:
+                    status, value = e.status, {"error": e.error, "message": e.message, "stacktrace": ""}
+                break
+        else:
+            status, value = 404, {"error": "unknown command", "message": f"{method} {path}", "stacktrace": ""}
+        body = json.dumps({"value": value}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # 客户端已中止请求(如时间预算用完)
+            self.close_connection = True
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+
+class StubDriverServer:
+    """本地桩驱动服务器
+
+    用法:
+        with StubDriverServer() as server:
+            driver = webdriver.Remote(command_executor=server.url, options=Options())
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, base_url="https://www.saucedemo.com/",
+                 latency=0.0, page_load_latency=0.0, resource_latency=0.0):
+        self.host = host
+        self.port = port
+        self.base_url = base_url
+        self.latency = latency
+        self.page_load_latency = page_load_latency
+        self.resource_latency = resource_latency
+        self.sessions = {}
+        self.stats_lock = threading.Lock()
+        self.stats = {"connections": 0, "requests": 0, "commands": {}}
+        self._httpd = None
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def start(self):
+        self._httpd = ThreadingHTTPServer((self.host, self.port), _StubRequestHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.stub = self
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="stub-driver", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def reset_stats(self):
+        with self.stats_lock:
+            self.stats = {"connections": 0, "requests": 0, "commands": {}}
+
+    def session(self, session_id):
+        try:
+            return self.sessions[session_id]
+        except KeyError:
+            raise StubError("invalid session id", f"会话不存在: {session_id}")
+
+
+# ========== 命令实现 ==========
+@_route("GET", "/status")
+def status(stub, payload):
+    return {"ready": True, "message": "stub driver ready"}
+
+
+@_route("POST", "/session")
+def new_session(stub, payload):
+    session_id = uuid.uuid4().hex
+    session = StubSession(session_id, stub)
+    always_match = (payload.get("capabilities") or {}).get("alwaysMatch") or {}
+    for arg in (always_match.get("ms:edgeOptions") or {}).get("args", []):
+        if arg.startswith("--disk-cache-dir="):
+            session.cache_dir = arg.split("=", 1)[1]
+            index = os.path.join(session.cache_dir, DISK_CACHE_INDEX)
+            if os.path.exists(index):
+                with open(index, encoding="utf-8") as f:
+                    session.http_cache = set(json.load(f))
+    stub.sessions[session_id] = session
+    return {"sessionId": session_id, "capabilities": {
+        "browserName": "MicrosoftEdge", "browserVersion": "stub", "platformName": "any",
+        "pageLoadStrategy": "normal", "timeouts": {"implicit": 0, "pageLoad": 300000, "script": 30000},
+    }}
+
+
+@_route("DELETE", "/session/(?P<sid>[^/]+)")
+def delete_session(stub, payload, sid):
+    session = stub.sessions.pop(sid, None)
+    if session and session.cache_dir:
+        with open(os.path.join(session.cache_dir, DISK_CACHE_INDEX), "w", encoding="utf-8") as f:
+            json.dump(sorted(session.http_cache), f)
+    return None
+
+
+def _session_command(func):
+    """在会话锁内执行命令"""
+    def wrapper(stub, payload, sid, **kwargs):
+        session = stub.session(sid)
+        with session.lock:
+            return func(session, payload, **kwargs)
+    wrapper.__name__ = func.__name__
+    return wrapper
+
+
+@_route("POST", "/session/(?P<sid>[^/]+)/timeouts")
+@_session_command
+def set_timeouts(session, payload):
+    return None
+
+
+@_route("POST", "/session/(?P<sid>[^/]+)/url")
+@_session_command
+def navigate(session, payload):
+    if session.server.page_load_latency:
+        time.sleep(session.server.page_load_latency)
+    session.load(payload.get("url", session.base_url))
+    return None
+
+
+@_route("GET", "/session/(?P<sid>[^/]+)/url")
+@_session_command
+def current_url(session, payload):
+    return session.url
+
+
+@_route("POST", "/session/(?P<sid>[^/]+)/back")
+@_session_command
+def back(session, payload):
+    if session.history:
+        previous = session.history.pop()
+        session.load(previous)
+        session.history.pop()
+    return None
+
+
+@_route("POST", "/session/(?P<sid>[^/]+)/refresh")
+@_session_command
+def refresh(session, payload):
+    session.load(session.url)
+    session.history.pop()
+    return None
+
+
+@_route("GET", "/session/(?P<sid>[^/]+)/title")
+@_session_command
+def title(session, payload):
+    return "Swag Labs"
+
+
+@_route("GET", "/session/(?P<sid>[^/]+)/source")
+@_session_command
+def page_source(session, payload):
+    return session.page_source()
+
+
+@_route("GET", "/session/(?P<sid>[^/]+)/screenshot")
+@_session_command
+def screenshot(session, payload):
+    return _BLANK_PNG
+
+
+@_route("GET", "/session/(?P<sid>[^/]+)/window")
+@_session_command
+def window_handle(session, payload):
+    return "stub-window"
+
+
+@_route("GET", "/session/(?P<sid>[^/]+)/window/rect")
+@_session_command
+def window_rect(session, payload):
+    return {"x": 0, "y": 0, "width": 1200, "height": 800}
+
+
+@_route("POST", "/session/(?P<sid>[^/]+)/window/(?:rect|maximize)")
+@_session_command
+def set_window_rect(session, payload):
+    return {"x": 0, "y": 0, "width": payload.get("width", 1200), "height": payload.get("height", 800)}
+
+
+@_route("POST", "/session/(?P<sid>[^/]+)/element")
+@_session_command
+def find_element(session, payload):
+    nodes = session.find(session.root, payload["using"], payload["value"])
+    if not nodes:
+        raise StubError("no such element", f"Unable to locate element: {payload['value']}")
+    return session.reference(nodes[0])
+
+
+@_route("POST", "/session/(?P<sid>[^/]+)/elements")
+@_session_command
+def find_elements(session, payload):
+    return [session.reference(node) for node in session.find(session.root, payload["using"], payload["value"])]
+
+
+@_route("POST", "/session/(?P<sid>[^/]+)/element/(?P<eid>[^/]+)/element")
+@_session_command
+def find_child_element(session, payload, eid):
+    nodes = session.find(session.resolve(eid), payload["using"], payload["value"])
+    if not nodes:
+        raise StubError("no such element", f"Unable to locate element: {payload['value']}")
+    return session.reference(nodes[0])
+
+
+@_route("POST", "/session/(?P<sid>[^/]+)/element/(?P<eid>[^/]+)/elements")
+@_session_command
+def find_child_elements(session, payload, eid):
+    return [session.reference(node) for node in session.find(session.resolve(eid), payload["using"], payload["value"])]
+
+
+@_route("POST", "/session/(?P<sid>[^/]+)/element/(?P<eid>[^/]+)/click")
+@_session_command
+def element_click(session, payload, eid):
+    session.click(session.resolve(eid))
+    return None
+
+
+@_route("POST", "/session/(?P<sid>[^/]+)/element/(?P<eid>[^/]+)/clear")
+@_session_command
+def element_clear(session, payload, eid):
+    session.clear(session.resolve(eid))
+    return None
+
+
+@_route("POST", "/session/(?P<sid>[^/]+)/element/(?P<eid>[^/]+)/value")
+@_session_command
+def element_send_keys(session, payload, eid):
+    text = payload.get("text") or "".join(payload.get("value", []))
+    session.send_keys(session.resolve(eid), text)
+    return None
+
+
+@_route("GET", "/session/(?P<sid>[^/]+)/element/(?P<eid>[^/]+)/text")
+@_session_command
+def element_text(session, payload, eid):
+    node = session.resolve(eid)
+    return node.inner_text() if session.is_displayed(node) else ""
+
+
+@_route("GET", "/session/(?P<sid>[^/]+)/element/(?P<eid>[^/]+)/name")
+@_session_command
+def element_tag_name(session, payload, eid):
+    return session.resolve(eid).tag
+
+
+@_route("GET", "/session/(?P<sid>[^/]+)/element/(?P<eid>[^/]+)/attribute/(?P<name>[^/]+)")
+@_session_command
+def element_attribute(session, payload, eid, name):
+    return session.resolve(eid).attrs.get(name)
+
+
+@_route("GET", "/session/(?P<sid>[^/]+)/element/(?P<eid>[^/]+)/property/(?P<name>[^/]+)")
+@_session_command
+def element_property(session, payload, eid, name):
+    return session.property_of(session.resolve(eid), name)
+
+
+@_route("GET", "/session/(?P<sid>[^/]+)/element/(?P<eid>[^/]+)/selected")
+@_session_command
+def element_selected(session, payload, eid):
+    return session.is_selected(session.resolve(eid))
+
+
+@_route("GET", "/session/(?P<sid>[^/]+)/element/(?P<eid>[^/]+)/enabled")
+@_session_command
+def element_enabled(session, payload, eid):
+    session.resolve(eid)
+    return True
+
+
+@_route("GET", "/session/(?P<sid>[^/]+)/element/(?P<eid>[^/]+)/displayed")
+@_session_command
+def element_displayed(session, payload, eid):
+    return session.is_displayed(session.resolve(eid))
+
+
+@_route("GET", "/session/(?P<sid>[^/]+)/element/(?P<eid>[^/]+)/rect")
+@_session_command
+def element_rect(session, payload, eid):
+    session.resolve(eid)
+    return {"x": 0, "y": 0, "width": 100, "height": 20}
+
+
+@_route("POST", "/session/(?P<sid>[^/]+)/execute/(?:sync|async)")
+@_session_command
+def execute_script(session, payload):
+    return session.wrap(session.execute_script(payload.get("script", ""), payload.get("args", [])))
+
+
+@_route("GET", "/session/(?P<sid>[^/]+)/cookie")
+@_session_command
+def get_cookies(session, payload):
+    return list(session.cookies.values())
+
+
+@_route("GET", "/session/(?P<sid>[^/]+)/cookie/(?P<name>[^/]+)")
+@_session_command
+def get_cookie(session, payload, name):
+    if name not in session.cookies:
+        raise StubError("no such cookie", name)
+    return session.cookies[name]
+
+
+@_route("POST", "/session/(?P<sid>[^/]+)/cookie")
+@_session_command
+def add_cookie(session, payload):
+    cookie = dict(payload.get("cookie", {}))
+    session.cookies[cookie["name"]] = cookie
+    session.invalidate()
+    return None
+
+
+@_route("DELETE", "/session/(?P<sid>[^/]+)/cookie")
+@_session_command
+def delete_cookies(session, payload):
+    session.cookies.clear()
+    session.invalidate()
+    return None
+
+
+@_route("DELETE", "/session/(?P<sid>[^/]+)/cookie/(?P<name>[^/]+)")
+@_session_command
+def delete_cookie(session, payload, name):
+    session.cookies.pop(name, None)
+    session.invalidate()
+    return None
+
+
+def _cdp_set_blocked_urls(session, params):
+    session.blocked_urls = list(params.get("urls", []))
+    return {}
+
+
+def _cdp_set_cache_disabled(session, params):
+    session.cache_disabled = bool(params.get("cacheDisabled"))
+    return {}
+
+
+def _cdp_add_init_script(session, params):
+    session.init_scripts.append(params.get("source", ""))
+    return {"identifier": str(len(session.init_scripts))}
+
+
+# 支持的CDP命令 (网络整形用到的子集)
+CDP_HANDLERS = {
+    "Network.enable": lambda session, params: {},
+    "Network.setBlockedURLs": _cdp_set_blocked_urls,
+    "Network.setCacheDisabled": _cdp_set_cache_disabled,
+    "Page.addScriptToEvaluateOnNewDocument": _cdp_add_init_script,
+}
+
+
+@_route("POST", "/session/(?P<sid>[^/]+)/ms/cdp/execute")
+@_session_command
+def execute_cdp(session, payload):
+    handler = CDP_HANDLERS.get(payload.get("cmd"))
+    if handler is None:
+        raise StubError("unknown command", f"不支持的CDP命令: {payload.get('cmd')}", status=500)
+    return handler(session, payload.get("params") or {})
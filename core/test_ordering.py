@@ -0,0 +1,137 @@
+"""
+测试执行顺序优化 - 在收集阶段按代价模型重排参数化用例
+
+代价模型:
+    用户切换  相邻两个用例使用不同用户时需要登出+登录
+    页面导航  上一个用例结束的页面与下一个用例起始页面不同
+    状态重置  每个用例结束后重置应用状态(与顺序无关，只计入估算总代价)
+
+用例可通过标记声明约束和页面信息:
+    @pytest.mark.depends_on("test_xx")          必须在test_xx的所有用例之后执行
+    @pytest.mark.isolated                       需要全新的用户会话(执行前强制重新登录)
+    @pytest.mark.navigation(start=..., end=...) 起始/结束页面，默认均为inventory
+"""
+from dataclasses import dataclass, field
+from typing import List, Optional, Set
+
+from config import USERNAMES, ORDERING_COSTS
+
+DEFAULT_PAGE = "inventory"
+
+
+@dataclass
+class CaseProfile:
+    """单个用例的代价相关属性"""
+    item: object
+    index: int
+    function: str
+    user: Optional[str]
+    start_page: str = DEFAULT_PAGE
+    end_page: str = DEFAULT_PAGE
+    isolated: bool = False
+    depends_on: Set[str] = field(default_factory=set)
+
+
+def get_case_user_index(item):
+    """从参数化参数user_count获取用例使用的用户索引，非参数化用例返回None"""
+    callspec = getattr(item, "callspec", None)
+    if callspec is None or "user_count" not in callspec.params:
+        return None
+    return callspec.params["user_count"] % len(USERNAMES)
+
+
+def profile_item(item, index):
+    """根据参数和标记生成用例画像"""
+    user_index = get_case_user_index(item)
+    profile = CaseProfile(
+        item=item,
+        index=index,
+        function=getattr(item, "originalname", None) or item.name.split("[")[0],
+        user=USERNAMES[user_index] if user_index is not None else None,
+        isolated=item.get_closest_marker("isolated") is not None,
+    )
+    navigation = item.get_closest_marker("navigation")
+    if navigation:
+        profile.start_page = navigation.kwargs.get("start", DEFAULT_PAGE)
+        profile.end_page = navigation.kwargs.get("end", DEFAULT_PAGE)
+    for marker in item.iter_markers("depends_on"):
+        profile.depends_on.update(marker.args)
+    return profile
+
+
+def is_user_switch(previous_user, case):
+    """执行case前是否需要切换用户(首次登录不算切换)"""
+    if case.user is None:
+        return False
+    if case.isolated and previous_user is not None:
+        return True
+    return previous_user is not None and previous_user != case.user
+
+
+def transition_cost(previous, previous_user, case):
+    """从previous用例过渡到case的代价"""
+    cost = 0.0
+    if is_user_switch(previous_user, case):
+        cost += ORDERING_COSTS["user_switch"]
+    elif previous is not None and case.user is not None and previous.end_page != case.start_page:
+        cost += ORDERING_COSTS["navigation"]
+    return cost
+
+
+def estimate(profiles: List[CaseProfile]):
+    """估算给定顺序的用户切换次数和总代价"""
+    switches, cost = 0, 0.0
+    previous, previous_user = None, None
+    for case in profiles:
+        if is_user_switch(previous_user, case):
+            switches += 1
+        cost += transition_cost(previous, previous_user, case)
+        if case.user is not None:
+            cost += ORDERING_COSTS["reset"]
+            previous, previous_user = case, case.user
+    return {"user_switches": switches, "cost": cost}
+
+
+def plan_order(items):
+    """
+    计算低代价的执行顺序
+
+    只重排使用登录用户的用例，其他用例(如单元测试)保持原位置。
+    贪心选择：每一步在依赖已满足的用例中选过渡代价最小者，代价相同时保持原始顺序。
+    返回 (重排后的items, 统计信息)
+    """
+    profiles = [profile_item(item, index) for index, item in enumerate(items)]
+    user_cases = [case for case in profiles if case.user is not None]
+    remaining_by_function = {}
+    for case in user_cases:
+        remaining_by_function[case.function] = remaining_by_function.get(case.function, 0) + 1
+
+    pending = list(user_cases)
+    ordered = []
+    previous, previous_user = None, None
+    while pending:
+        ready = [case for case in pending
+                 if not any(remaining_by_function.get(dep, 0) for dep in case.depends_on - {case.function})]
+        if not ready:
+            # 依赖无法满足(如循环依赖)时，剩余用例保持原始顺序
+            ordered.extend(pending)
+            break
+        best = min(ready, key=lambda case: (transition_cost(previous, previous_user, case), case.index))
+        pending.remove(best)
+        ordered.append(best)
+        remaining_by_function[best.function] -= 1
+        previous, previous_user = best, best.user
+
+    # 重排后的用户用例依次填回原来用户用例所占的位置
+    slots = iter(ordered)
+    ordered = [next(slots) if case.user is not None else case for case in profiles]
+
+    original = estimate(profiles)
+    planned = estimate(ordered)
+    stats = {
+        "original_switches": original["user_switches"],
+        "planned_switches": planned["user_switches"],
+        "original_cost": original["cost"],
+        "planned_cost": planned["cost"],
+    }
+    return [case.item for case in ordered], stats
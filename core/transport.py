@@ -0,0 +1,198 @@
+"""
+WebDriver HTTP传输层 - 每个驱动一个调优过的keep-alive连接池，并统计连接复用和请求延迟
+
+Selenium默认的urllib3连接池maxsize=1且不阻塞：并发请求时会临时新建连接，用完即丢弃，
+造成连接抖动和TIME_WAIT堆积。这里改为固定大小的阻塞连接池，并开启TCP keep-alive。
+当前线程声明了时间预算(core.deadlines)时，每条命令的HTTP超时缩短为剩余预算。
+"""
+import json
+import re
+import socket
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import urllib3
+from urllib3.connection import HTTPConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from selenium.webdriver.chromium.remote_connection import ChromiumRemoteConnection
+from selenium.webdriver.remote.client_config import ClientConfig
+
+from config import DRIVER_POOL_MAXSIZE, DRIVER_REQUEST_TIMEOUT, ARTIFACT_RECENT_COMMANDS
+from core import deadlines
+from core.metrics import run_metrics
+
+
+class TransportStats:
+    """传输层计数器 (线程安全)"""
+
+    # 保留的最近请求延迟样本数，用于计算分位数
+    MAX_SAMPLES = 2048
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.connections_opened = 0
+            self.total_latency = 0.0
+            self.max_latency = 0.0
+            self.commands = {}
+            self._samples = []
+            self.recent = deque(maxlen=ARTIFACT_RECENT_COMMANDS)
+
+    def record_connection(self):
+        with self._lock:
+            self.connections_opened += 1
+
+    def record_request(self, command, elapsed, params=None, error=None):
+        with self._lock:
+            self.recent.append({
+                "time": datetime.now().strftime("%H:%M:%S.%f")[:-3],
+                "command": command,
+                "params": _describe_params(command, params),
+                "elapsed_ms": round(elapsed * 1000, 1),
+                "error": error,
+            })
+            self.requests += 1
+            self.total_latency += elapsed
+            self.max_latency = max(self.max_latency, elapsed)
+            self.commands[command] = self.commands.get(command, 0) + 1
+            self._samples.append(elapsed)
+            if len(self._samples) > self.MAX_SAMPLES:
+                del self._samples[:len(self._samples) - self.MAX_SAMPLES]
+
+    def recent_commands(self):
+        """最近的驱动命令(最早的在前)"""
+        with self._lock:
+            return list(self.recent)
+
+    def snapshot(self):
+        """获取当前统计快照"""
+        with self._lock:
+            samples = sorted(self._samples)
+            reused = max(self.requests - self.connections_opened, 0)
+
+            def percentile(p):
+                if not samples:
+                    return 0.0
+                return samples[min(len(samples) - 1, int(round(p / 100 * (len(samples) - 1))))]
+
+            return {
+                "requests": self.requests,
+                "connections_opened": self.connections_opened,
+                "connections_reused": reused,
+                "reuse_rate": (reused / self.requests * 100) if self.requests else 0.0,
+                "avg_latency_ms": (self.total_latency / self.requests * 1000) if self.requests else 0.0,
+                "p50_latency_ms": percentile(50) * 1000,
+                "p95_latency_ms": percentile(95) * 1000,
+                "max_latency_ms": self.max_latency * 1000,
+                "commands": dict(self.commands),
+            }
+
+
+# 最近的命令会写入失败附件和HTML报告，输入框内容(如密码)不记录
+_REDACTED = "***"
+_VALUE_PARAMS = {"sendKeysToElement": ("text", "value")}
+_SCRIPT_COMMANDS = ("w3cExecuteScript", "w3cExecuteScriptAsync")
+# 参数中携带表单值的注入脚本(按脚本开头的 /* 名称 */ 识别)
+_FORM_VALUE_SCRIPTS = frozenset(("fillForm",))
+
+
+def _redact(command, params):
+    """去掉sessionId，隐藏输入命令的文本和表单脚本的参数"""
+    params = {k: v for k, v in params.items() if k != "sessionId"}
+    for key in _VALUE_PARAMS.get(command, ()):
+        if key in params:
+            params[key] = _REDACTED
+    if command in _SCRIPT_COMMANDS and "args" in params:
+        match = re.match(r"\s*/\*\s*([\w:.-]+)\s*\*/", str(params.get("script", "")))
+        if match and match.group(1) in _FORM_VALUE_SCRIPTS:
+            params["args"] = _REDACTED
+    return params
+
+
+def _describe_params(command, params, limit=200):
+    """命令参数摘要(隐藏输入内容，截断过长内容)"""
+    if not params:
+        return ""
+    summary = json.dumps(_redact(command, params), ensure_ascii=False, default=str)
+    return summary if len(summary) <= limit else summary[:limit] + "..."
+
+
+def _counting_pool_class(base, stats):
+    """生成会在新建连接时计数的连接池类"""
+    def _new_conn(self):
+        stats.record_connection()
+        return base._new_conn(self)
+
+    return type(f"Counting{base.__name__}", (base,), {"_new_conn": _new_conn})
+
+
+class DeadlineClientConfig(ClientConfig):
+    """请求超时不超过当前线程剩余时间预算的客户端配置"""
+
+    @property
+    def timeout(self):
+        left = deadlines.remaining()
+        if left is None:
+            return self._timeout
+        return max(min(self._timeout, left), 0.001)
+
+    @timeout.setter
+    def timeout(self, value):
+        self._timeout = value
+
+
+class PooledRemoteConnection(ChromiumRemoteConnection):
+    """带连接复用计数和延迟统计的驱动连接"""
+
+    def __init__(self, remote_server_addr, vendor_prefix="ms", browser_name="MicrosoftEdge",
+                 pool_maxsize=DRIVER_POOL_MAXSIZE, timeout=DRIVER_REQUEST_TIMEOUT):
+        self.stats = TransportStats()
+        self.pool_maxsize = pool_maxsize
+        self.request_timeout = timeout
+        client_config = DeadlineClientConfig(remote_server_addr=remote_server_addr, keep_alive=True, timeout=timeout)
+        super().__init__(
+            remote_server_addr=remote_server_addr,
+            vendor_prefix=vendor_prefix,
+            browser_name=browser_name,
+            ignore_proxy=True,
+            client_config=client_config,
+        )
+
+    def _get_connection_manager(self):
+        manager = urllib3.PoolManager(
+            num_pools=2,
+            maxsize=self.pool_maxsize,
+            block=True,  # 连接用完时等待归还，而不是临时新建再丢弃
+            timeout=self.request_timeout,
+            retries=urllib3.Retry(total=1, connect=1, read=0, redirect=0, status=0),
+            socket_options=HTTPConnection.default_socket_options + [
+                (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+            ],
+        )
+        manager.pool_classes_by_scheme = {
+            "http": _counting_pool_class(HTTPConnectionPool, self.stats),
+            "https": _counting_pool_class(HTTPSConnectionPool, self.stats),
+        }
+        return manager
+
+    def execute(self, command, params):
+        deadlines.check()
+        start = time.perf_counter()
+        error = None
+        try:
+            response = super().execute(command, params)
+            if isinstance(response, dict) and isinstance(response.get("value"), dict):
+                error = response["value"].get("error")
+            return response
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            self.stats.record_request(command, time.perf_counter() - start, params, error)
+            run_metrics.webdriver_commands.inc(command)
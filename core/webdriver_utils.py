@@ -1,31 +1,39 @@
 """
 WebDriver工具类
 """
+import threading
 import time
 from selenium import webdriver
 from selenium.webdriver.edge.service import Service
 from selenium.webdriver.edge.options import Options
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support.wait import POLL_FREQUENCY
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
+from selenium.common.exceptions import (TimeoutException, NoSuchElementException, WebDriverException,
+                                        StaleElementReferenceException)
 
 from config import EDGE_DRIVER_PATH, BROWSER_OPTIONS, DEFAULT_WAIT_TIME, IMPLICIT_WAIT_TIME, PAGE_LOAD_TIMEOUT
 from core.logger_config import logger
 from core.exceptions import ElementException
+from core.element_cache import element_cache
+from core.transport import PooledRemoteConnection
+from core.network_shaping import NetworkShaper, release_cache
 
 class WebDriverManager:
     """WebDriver管理器"""
     
     @staticmethod
-    def create_driver():
-        """创建WebDriver实例"""
+    def create_driver(shaping=None):
+        """创建WebDriver实例，shaping为网络整形配置(None按NETWORK_SHAPING配置，False不整形)"""
+        cache_dir = None
         try:
             logger.info("开始创建WebDriver实例")
+            shaping = NetworkShaper.from_config() if shaping is None else shaping
+            cache_dir = shaping.checkout_cache() if shaping else None
             
             # 配置Edge选项
             options = Options()
-            for option in BROWSER_OPTIONS:
+            for option in BROWSER_OPTIONS + (shaping.browser_arguments(cache_dir) if shaping else []):
                 options.add_argument(option)
             
             # 创建Service
@@ -34,36 +42,188 @@ class WebDriverManager:
             # 创建WebDriver
             driver = webdriver.Edge(service=service, options=options) if EDGE_DRIVER_PATH else webdriver.Edge(options=options)
             
+            # 替换为带连接池和计数的传输层
+            WebDriverManager._install_transport(driver, driver.service.service_url)
+            
             # 设置超时
             driver.implicitly_wait(IMPLICIT_WAIT_TIME)
             driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+            if shaping:
+                shaping.install(driver, cache_dir)
             
             logger.info("WebDriver创建成功")
             return driver
             
         except Exception as e:
+            release_cache(cache_dir, keep=False)
             logger.error(f"创建WebDriver失败: {str(e)}")
             raise ElementException(f"创建WebDriver失败: {str(e)}", e)
     
+    @staticmethod
+    def create_remote_driver(server_url, shaping=None):
+        """连接已运行的驱动服务器(如本地桩驱动)创建WebDriver实例"""
+        cache_dir = None
+        try:
+            logger.info(f"开始创建远程WebDriver实例: {server_url}")
+            shaping = NetworkShaper.from_config() if shaping is None else shaping
+            cache_dir = shaping.checkout_cache() if shaping else None
+            
+            options = Options()
+            for option in BROWSER_OPTIONS + (shaping.browser_arguments(cache_dir) if shaping else []):
+                options.add_argument(option)
+            
+            driver = webdriver.Remote(command_executor=PooledRemoteConnection(server_url), options=options)
+            driver.implicitly_wait(IMPLICIT_WAIT_TIME)
+            driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+            if shaping:
+                shaping.install(driver, cache_dir)
+            
+            logger.info("远程WebDriver创建成功")
+            return driver
+            
+        except Exception as e:
+            release_cache(cache_dir, keep=False)
+            logger.error(f"创建远程WebDriver失败: {str(e)}")
+            raise ElementException(f"创建远程WebDriver失败: {str(e)}", e)
+    
+    @staticmethod
+    def _install_transport(driver, server_url):
+        """用PooledRemoteConnection替换driver默认的命令执行器"""
+        old_executor = driver.command_executor
+        driver.command_executor = PooledRemoteConnection(server_url)
+        try:
+            old_executor.close()
+        except Exception as e:
+            logger.debug(f"关闭原命令执行器失败: {str(e)}")
+    
+    @staticmethod
+    def get_transport_stats(driver):
+        """获取driver传输层统计: 请求数、新建/复用连接数、延迟"""
+        stats = getattr(driver.command_executor, "stats", None)
+        return stats.snapshot() if stats else {}
+    
+    @staticmethod
+    def get_recent_commands(driver):
+        """获取driver最近执行的命令(用于失败附件)"""
+        stats = getattr(driver.command_executor, "stats", None)
+        return stats.recent_commands() if stats else []
+    
     @staticmethod
     def close_driver(driver):
         """关闭WebDriver"""
         try:
             if driver:
+                stats = WebDriverManager.get_transport_stats(driver)
+                if stats:
+                    logger.info(f"WebDriver传输层统计: 请求 {stats['requests']} 次, "
+                                f"新建连接 {stats['connections_opened']} 个, 复用率 {stats['reuse_rate']:.1f}%, "
+                                f"平均延迟 {stats['avg_latency_ms']:.1f}ms")
                 driver.quit()
                 logger.info("WebDriver已关闭")
+                # 浏览器已退出，其磁盘缓存成为后续浏览器的预热缓存
+                release_cache(getattr(driver, "_asset_cache_dir", None))
         except Exception as e:
             logger.warning(f"关闭WebDriver时出现异常: {str(e)}")
+            release_cache(getattr(driver, "_asset_cache_dir", None), keep=False)
+
+def driver_flyweights(driver):
+    """
+    按driver缓存的轻量对象(页面对象、等待对象)
+    
+    保存在driver自身上：这些对象都引用driver，若放在以driver为键的弱引用字典中，driver将永远无法被回收。
+    """
+    flyweights = getattr(driver, "_flyweights", None)
+    if flyweights is None:
+        flyweights = driver._flyweights = {}
+    return flyweights
+
+
+class Wait:
+    """轻量等待对象 - 与WebDriverWait.until语义一致(忽略NoSuchElementException)，按driver和超时复用"""
+    
+    __slots__ = ("driver", "timeout", "poll_frequency")
+    stats = {"created": 0, "reused": 0}
+    _stats_lock = threading.Lock()  # 失败重跑等后台线程也会创建等待对象
+    
+    def __init__(self, driver, timeout, poll_frequency=POLL_FREQUENCY):
+        self.driver = driver
+        self.timeout = timeout
+        self.poll_frequency = poll_frequency
+    
+    @classmethod
+    def of(cls, driver, timeout, poll_frequency=POLL_FREQUENCY):
+        """取得driver上复用的等待对象"""
+        flyweights = driver_flyweights(driver)
+        key = (cls, timeout, poll_frequency)
+        wait = flyweights.get(key)
+        created = wait is None
+        if created:
+            wait = flyweights[key] = cls(driver, timeout, poll_frequency)
+        with cls._stats_lock:
+            cls.stats["created" if created else "reused"] += 1
+        return wait
+    
+    def until(self, method, message=""):
+        end_time = time.monotonic() + self.timeout
+        while True:
+            try:
+                value = method(self.driver)
+                if value:
+                    return value
+            except NoSuchElementException:
+                pass
+            if time.monotonic() > end_time:
+                raise TimeoutException(message)
+            time.sleep(self.poll_frequency)
+
 
 class ElementOperations:
-    """元素操作类"""
+    """元素操作类 - 无状态，所有页面对象共用shared_element_ops一个实例"""
+    
+    __slots__ = ()
     
-    def safe_find_element(self, driver, by, value, timeout=DEFAULT_WAIT_TIME):
-        """安全查找元素"""
+    # 一次脚本调用填写多个React受控输入框：通过原生value setter赋值并派发input/change事件，
+    # 让React的onChange更新组件状态；赋值后读回每个字段，全部一致时才点击提交按钮
+    _FILL_FORM_JS = """/* fillForm */
+var fields = arguments[0], submit = arguments[1];
+var setter = Object.getOwnPropertyDescriptor(window.HTMLInputElement.prototype, 'value').set;
+var result = {values: {}, missing: [], submitted: false};
+fields.forEach(function (field) {
+    var input = document.querySelector(field.selector);
+    if (!input) { result.missing.push(field.selector); return; }
+    setter.call(input, field.value);
+    input.dispatchEvent(new Event('input', {bubbles: true}));
+    input.dispatchEvent(new Event('change', {bubbles: true}));
+    result.values[field.selector] = input.value;
+});
+var mismatched = fields.some(function (field) { return result.values[field.selector] !== field.value; });
+if (submit && !mismatched) {
+    var button = document.querySelector(submit);
+    if (button) { button.click(); result.submitted = true; } else { result.missing.push(submit); }
+}
+return result;
+"""
+    
+    @staticmethod
+    def _css_selector(by, value):
+        """把ID/CSS定位器转换为CSS选择器"""
+        if by == By.ID:
+            return f"#{value}"
+        if by == By.CSS_SELECTOR:
+            return value
+        raise ElementException(f"脚本填写表单只支持ID或CSS定位器: {by}={value}")
+    
+    def safe_find_element(self, driver, by, value, timeout=DEFAULT_WAIT_TIME, cached=False):
+        """安全查找元素 - cached为True时在同一页面内复用已找到的元素(只用于位置固定的元素)"""
+        if cached:
+            element = element_cache.get(driver, (by, value))
+            if element is not None:
+                return element
         try:
-            wait = WebDriverWait(driver, timeout)
-            element = wait.until(EC.presence_of_element_located((by, value)))
-            logger.debug(f"成功找到元素: {by}={value}")
+            element = Wait.of(driver, timeout).until(EC.presence_of_element_located((by, value)))
+            logger.debug("成功找到元素: %s=%s", by, value)
+            if cached:
+                element_cache.put(driver, (by, value), element)
             return element
         except TimeoutException:
             logger.error(f"查找元素超时: {by}={value}")
@@ -75,9 +235,8 @@ class ElementOperations:
     def safe_find_elements(self, driver, by, value, timeout=DEFAULT_WAIT_TIME):
         """安全查找多个元素"""
         try:
-            wait = WebDriverWait(driver, timeout)
-            elements = wait.until(EC.presence_of_all_elements_located((by, value)))
-            logger.debug(f"成功找到 {len(elements)} 个元素: {by}={value}")
+            elements = Wait.of(driver, timeout).until(EC.presence_of_all_elements_located((by, value)))
+            logger.debug("成功找到 %d 个元素: %s=%s", len(elements), by, value)
             return elements
         except TimeoutException:
             logger.warning(f"查找元素超时: {by}={value}")
@@ -87,33 +246,84 @@ class ElementOperations:
             return []
     
     def safe_click(self, driver, element, timeout=DEFAULT_WAIT_TIME):
-        """安全点击元素"""
+        """安全点击元素 - 缓存的元素已失效时重新查找后再点击一次"""
         try:
-            wait = WebDriverWait(driver, timeout)
-            wait.until(EC.element_to_be_clickable(element))
-            element.click()
+            try:
+                self._click(driver, element, timeout)
+            except StaleElementReferenceException:
+                locator = element_cache.evict(driver, element)
+                if locator is None:
+                    raise
+                logger.debug("缓存的元素已失效，重新查找: %s=%s", *locator)
+                self._click(driver, self.safe_find_element(driver, *locator, timeout=timeout, cached=True), timeout)
             logger.debug("元素点击成功")
             time.sleep(0.1)  # 短暂等待
         except Exception as e:
             logger.error(f"点击元素失败: {str(e)}")
             raise ElementException(f"点击元素失败: {str(e)}", e)
     
+    @staticmethod
+    def _click(driver, element, timeout):
+        Wait.of(driver, timeout).until(EC.element_to_be_clickable(element))
+        element.click()
+    
     def safe_send_keys(self, element, text):
         """安全输入文本"""
         try:
             element.clear()
             element.send_keys(text)
-            logger.debug(f"文本输入成功: {text}")
+            logger.debug("文本输入成功: %s", text)
         except Exception as e:
             logger.error(f"输入文本失败: {str(e)}")
             raise ElementException(f"输入文本失败: {str(e)}", e)
     
+    def fill_form(self, driver, fields, submit=None):
+        """
+        一次脚本调用填写表单并可选地提交，读回的值与期望不一致时抛出ElementException(此时不提交)
+        
+        参数:
+            fields (list): [(定位器, 值), ...]，定位器为 (By.ID, ...) 或 (By.CSS_SELECTOR, ...)
+            submit (tuple): 提交按钮的定位器，None表示只填写不提交
+        返回:
+            dict: 每个字段读回的值，按定位器的值索引
+        """
+        payload = [{"selector": self._css_selector(*locator), "value": str(value)} for locator, value in fields]
+        try:
+            result = driver.execute_script(self._FILL_FORM_JS, payload,
+                                           self._css_selector(*submit) if submit else None)
+        except Exception as e:
+            logger.error(f"脚本填写表单失败: {str(e)}")
+            raise ElementException(f"脚本填写表单失败: {str(e)}", e)
+        
+        if result["missing"]:
+            raise ElementException(f"表单中找不到元素: {', '.join(result['missing'])}")
+        values, mismatched = {}, []
+        for (locator, _), field in zip(fields, payload):
+            value = values[locator[1]] = result["values"][field["selector"]]
+            if value != field["value"]:
+                mismatched.append(f"{locator[1]}={value!r}")
+        if mismatched:
+            logger.error(f"表单字段读回不一致: {', '.join(mismatched)}")
+            raise ElementException(f"表单字段读回不一致: {', '.join(mismatched)}")
+        logger.debug("脚本填写表单成功: %s%s", ", ".join(values), " (已提交)" if result["submitted"] else "")
+        return values
+    
     def safe_get_text(self, element):
         """安全获取元素文本"""
         try:
             text = element.text
-            logger.debug(f"获取文本成功: {text}")
+            logger.debug("获取文本成功: %s", text)
             return text
         except Exception as e:
             logger.error(f"获取文本失败: {str(e)}")
             raise ElementException(f"获取文本失败: {str(e)}", e)
+
+
+# 全局共用的元素操作实例
+shared_element_ops = ElementOperations()
+
+
+def release_flyweights(driver):
+    """丢弃driver上缓存的页面对象和等待对象"""
+    driver_flyweights(driver).clear()
+
@@ -1 +1,3 @@
-from .page_objects import *
\ No newline at end of file
+from .page_objects import *
+from .async_page_objects import AsyncBasePage, AsyncLoginPage
+from .state_seeding import StateSeeder
\ No newline at end of file
@@ -0,0 +1,83 @@
+"""
+异步页面对象模型 - 与page_objects中的同步页面对象对应，供单事件循环并发驱动多个浏览器使用
+"""
+import asyncio
+
+from core.async_webdriver import AsyncElementOperations
+from core.exceptions import LoginException
+from core.logger_config import logger
+from config import BASE_URL
+from pages.page_objects import LoginPage
+
+
+class AsyncBasePage:
+    """异步页面基类"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.element_ops = AsyncElementOperations()
+
+    async def navigate_to(self, url):
+        """导航到指定URL"""
+        try:
+            await self.driver.get(url)
+            logger.info(f"导航到: {url}")
+        except Exception as e:
+            logger.error(f"导航失败: {str(e)}")
+            raise
+
+
+class AsyncLoginPage(AsyncBasePage):
+    """异步登录页面"""
+
+    # 页面元素定位器与同步版本共用
+    USERNAME_INPUT = LoginPage.USERNAME_INPUT
+    PASSWORD_INPUT = LoginPage.PASSWORD_INPUT
+    LOGIN_BUTTON = LoginPage.LOGIN_BUTTON
+    ERROR_MESSAGE = LoginPage.ERROR_MESSAGE
+
+    async def open(self):
+        """打开登录页 (构造函数不能await，导航逻辑放在这里)"""
+        current_url = await self.driver.current_url()
+        # 只有当前页面不是登录页时才导航
+        if "saucedemo.com" not in current_url or "inventory" in current_url:
+            await self.navigate_to(BASE_URL)
+        return self
+
+    async def login(self, username, password):
+        """登录功能"""
+        try:
+            logger.info(f"开始登录用户: {username}")
+
+            username_field, password_field, login_button = await asyncio.gather(
+                self.element_ops.safe_find_element(self.driver, *self.USERNAME_INPUT),
+                self.element_ops.safe_find_element(self.driver, *self.PASSWORD_INPUT),
+                self.element_ops.safe_find_element(self.driver, *self.LOGIN_BUTTON),
+            )
+
+            await self.element_ops.safe_send_keys(username_field, username)
+            await self.element_ops.safe_send_keys(password_field, password)
+            await self.element_ops.safe_click(self.driver, login_button)
+
+            await asyncio.sleep(1)  # 等待页面跳转
+            logger.info(f"用户 {username} 登录操作完成")
+
+        except Exception as e:
+            logger.error(f"登录失败: {str(e)}")
+            raise LoginException(f"登录失败: {str(e)}", e)
+
+    async def is_login_success(self):
+        """检查登录是否成功"""
+        try:
+            return "inventory" in await self.driver.current_url()
+        except Exception as e:
+            logger.error(f"检查登录状态失败: {str(e)}")
+            return False
+
+    async def get_error_message(self):
+        """获取错误消息"""
+        try:
+            error_element = await self.element_ops.safe_find_element(self.driver, *self.ERROR_MESSAGE)
+            return await error_element.text()
+        except Exception:
+            return ""
@@ -1,30 +1,129 @@
 """
 页面对象模型
 """
+import threading
 import time
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import Select
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
 
-from core.webdriver_utils import ElementOperations
+from core.webdriver_utils import Wait, driver_flyweights, shared_element_ops
+from core.deadlines import budgeted
+from core.dirty_state import dirty_state, STATE_KINDS, CART, CHECKOUT, SORT
+from core.page_state import page_state, shortest_path, transition, CLICK, ROUTE
 from core.exceptions import LoginException, ProductException, CartException, CheckoutException
 from core.logger_config import logger
-from config import BASE_URL
+from core.metrics import run_metrics
+from config import BASE_URL, SORT_OPTIONS, PAGE_ACTION_BUDGET, FORM_KEYSTROKES
 
 class BasePage:
     """页面基类"""
     
+    # 各路由渲染完成的标志元素
+    ROUTE_ANCHORS = {
+        "": (By.ID, "login-button"),
+        "inventory.html": (By.CLASS_NAME, "inventory_list"),
+        "inventory-item.html": (By.CLASS_NAME, "inventory_details_name"),
+        "cart.html": (By.CLASS_NAME, "cart_list"),
+        "checkout-step-one.html": (By.ID, "first-name"),
+        "checkout-step-two.html": (By.CLASS_NAME, "summary_subtotal_label"),
+        "checkout-complete.html": (By.CLASS_NAME, "complete-header"),
+    }
+    
+    # 一次脚本调用通过应用自身的路由切换页面：pushState后触发popstate，React Router随之渲染新路由
+    _ROUTE_TO_JS = """/* routeTo */
+var url = arguments[0], base = arguments[1];
+if (window.location.href.indexOf(base) !== 0 || !document.getElementById('root')) { return false; }
+window.history.pushState({}, '', url);
+window.dispatchEvent(new PopStateEvent('popstate', {state: {}}));
+return true;
+"""
+    
+    # 享元统计：同一driver上的同类页面对象只创建一次
+    flyweight_stats = {"created": 0, "reused": 0}
+    _flyweight_lock = threading.Lock()  # 失败重跑等后台线程也会构造页面对象
+    
+    def __new__(cls, driver, *args, **kwargs):
+        """同一driver上的同类页面对象复用同一个实例，__init__仍在每次构造时执行"""
+        flyweights = driver_flyweights(driver)
+        page = flyweights.get(cls)
+        created = page is None
+        if created:
+            page = flyweights[cls] = super().__new__(cls)
+        with BasePage._flyweight_lock:
+            BasePage.flyweight_stats["created" if created else "reused"] += 1
+        return page
+    
     def __init__(self, driver):
         self.driver = driver
-        self.element_ops = ElementOperations()
+        self.element_ops = shared_element_ops
     
     def navigate_to(self, url):
         """导航到指定URL"""
         try:
             self.driver.get(url)
+            page_state.observe(self.driver, url)
             logger.info(f"导航到: {url}")
         except Exception as e:
+            page_state.forget(self.driver)
             logger.error(f"导航失败: {str(e)}")
             raise
+    
+    def route_to(self, page, timeout=2):
+        """
+        应用内切换到指定路由(不重新加载页面)，等待该路由的标志元素渲染完成
+        
+        SPA尚未加载(如处于其他源)或路由后标志元素未出现时，退回driver.get整页加载。
+        
+        参数:
+            page (str): 相对BASE_URL的路由，如 "cart.html"、"inventory-item.html?id=4"，""为登录页
+        """
+        url = BASE_URL + page
+        try:
+            routed = self.driver.execute_script(self._ROUTE_TO_JS, url, BASE_URL)
+        except Exception as e:
+            logger.debug(f"应用内路由失败: {str(e)}")
+            routed = False
+        if not routed:
+            self.navigate_to(url)
+            return
+        anchor = self.ROUTE_ANCHORS.get(page.split("?", 1)[0])
+        if anchor is None:
+            page_state.forget(self.driver)
+            return
+        try:
+            Wait.of(self.driver, timeout, poll_frequency=0.05).until(EC.presence_of_element_located(anchor))
+            page_state.observe(self.driver, url)
+            logger.debug("应用内路由到: %s", url)
+        except TimeoutException:
+            logger.warning(f"应用内路由后未渲染 {page}，改为整页加载")
+            self.navigate_to(url)
+    
+    def go_to(self, page):
+        """
+        按页面跳转图的最短路径切换到指定页面，已在该页面时不发送任何命令
+        
+        参数:
+            page (str): 目标页面路由，如 "inventory.html"，""为登录页
+        """
+        path = shortest_path(page_state.current(self.driver), page)
+        for edge in path:
+            run_metrics.navigations.inc(edge.kind)
+            if edge.kind == CLICK:
+                try:
+                    element = self.element_ops.safe_find_element(self.driver, *edge.locator, cached=True)
+                    self.element_ops.safe_click(self.driver, element)
+                except Exception:
+                    page_state.forget(self.driver)
+                    raise
+                page_state.arrive(self.driver, edge.target)
+            elif edge.kind == ROUTE:
+                self.route_to(edge.target)
+            else:
+                self.navigate_to(BASE_URL + edge.target)
+        if path:
+            logger.debug("导航到 %s: %s", page or "登录页", " -> ".join(edge.kind for edge in path))
 
 class LoginPage(BasePage):
     """登录页面"""
@@ -38,21 +137,28 @@ class LoginPage(BasePage):
     def __init__(self, driver):
         super().__init__(driver)
         # 只有当前页面不是登录页时才导航
-        if "saucedemo.com" not in self.driver.current_url or "inventory" in self.driver.current_url:
-            self.navigate_to(BASE_URL)
+        self.go_to("")
     
-    def login(self, username, password):
-        """登录功能"""
+    @budgeted(PAGE_ACTION_BUDGET)
+    @transition(None)  # 登录成功进入商品页，失败停留在登录页
+    def login(self, username, password, keystrokes=None):
+        """登录功能 - keystrokes为True时模拟真实键盘输入，默认按FORM_KEYSTROKES配置"""
         try:
             logger.info(f"开始登录用户: {username}")
             
-            username_field = self.element_ops.safe_find_element(self.driver, *self.USERNAME_INPUT)
-            password_field = self.element_ops.safe_find_element(self.driver, *self.PASSWORD_INPUT)
-            login_button = self.element_ops.safe_find_element(self.driver, *self.LOGIN_BUTTON)
-            
-            self.element_ops.safe_send_keys(username_field, username)
-            self.element_ops.safe_send_keys(password_field, password)
-            self.element_ops.safe_click(self.driver, login_button)
+            keystrokes = FORM_KEYSTROKES if keystrokes is None else keystrokes
+            if keystrokes:
+                username_field = self.element_ops.safe_find_element(self.driver, *self.USERNAME_INPUT)
+                password_field = self.element_ops.safe_find_element(self.driver, *self.PASSWORD_INPUT)
+                login_button = self.element_ops.safe_find_element(self.driver, *self.LOGIN_BUTTON)
+                
+                self.element_ops.safe_send_keys(username_field, username)
+                self.element_ops.safe_send_keys(password_field, password)
+                self.element_ops.safe_click(self.driver, login_button)
+            else:
+                self.element_ops.fill_form(self.driver, [(self.USERNAME_INPUT, username),
+                                                         (self.PASSWORD_INPUT, password)],
+                                           submit=self.LOGIN_BUTTON)
             
             time.sleep(1)  # 等待页面跳转
             logger.info(f"用户 {username} 登录操作完成")
@@ -64,7 +170,9 @@ class LoginPage(BasePage):
     def is_login_success(self):
         """检查登录是否成功"""
         try:
-            return "inventory" in self.driver.current_url
+            url = self.driver.current_url
+            page_state.observe(self.driver, url)
+            return "inventory" in url
         except Exception as e:
             logger.error(f"检查登录状态失败: {str(e)}")
             return False
@@ -95,99 +203,188 @@ class InventoryPage(BasePage):
     CART_LINK = (By.CLASS_NAME, "shopping_cart_link")
     PRODUCT_IMAGE_LINK = (By.CSS_SELECTOR, ".inventory_item_img a")
     
-    # def reset_app_state(self):
-    #     """🔥 新增：重置应用状态功能"""
-    #     try:
-    #         logger.info("开始重置应用状态")
-            
-    #         # 检查当前是否在inventory页面，如果不在则先导航过去
-    #         if "inventory" not in self.driver.current_url:
-    #             self.driver.get(BASE_URL + "inventory.html")
-    #             time.sleep(0.2)
-            
-    #         # 1. 点击菜单按钮打开侧边栏
-    #         menu_button = self.element_ops.safe_find_element(self.driver, *self.MENU_BUTTON)
-    #         self.element_ops.safe_click(self.driver, menu_button)
-            
-    #         time.sleep(0.2)  # 等待菜单打开
-            
-    #         # 2. 点击Reset App State链接
-    #         reset_link = self.element_ops.safe_find_element(self.driver, *self.RESET_APP_STATE_LINK)
-    #         self.element_ops.safe_click(self.driver, reset_link)
-            
-    #         time.sleep(0.2)  # 等待重置完成
-            
-    #         # 3. 关闭菜单（点击X按钮）
-    #         try:
-    #             close_button = self.element_ops.safe_find_element(self.driver, *self.MENU_CLOSE_BUTTON, timeout=3)
-    #             self.element_ops.safe_click(self.driver, close_button)
-    #             time.sleep(0.3)
-    #         except Exception as e:
-    #             logger.warning(f"关闭菜单失败，尝试点击页面其他区域: {str(e)}")
-    #             # 如果关闭按钮点击失败，尝试点击页面其他区域来关闭菜单
-    #             try:
-    #                 self.driver.find_element(By.CLASS_NAME, "inventory_container").click()
-    #                 time.sleep(0.3)
-    #             except:
-    #                 pass
-            
-    #         logger.info("应用状态重置完成")
-            
-    #     except Exception as e:
-    #         logger.error(f"重置应用状态失败: {str(e)}")
-    #         # 重置失败不应该导致测试失败，只记录警告
-    #         logger.warning("应用状态重置失败，继续执行后续操作")
+    # 排序选项 -> (排序键, 是否降序)
+    SORT_KEYS = {"az": ("name", False), "za": ("name", True), "lohi": ("price", False), "hilo": ("price", True)}
+    
+    # 一次脚本调用读取当前排序选项和所有商品的名称、价格
+    _PRODUCT_ORDER_JS = """/* productOrder */
+var select = document.querySelector("select[data-test='product-sort-container']");
+var items = document.querySelectorAll('.inventory_item');
+return {
+    sort: select ? select.value : null,
+    products: Array.prototype.map.call(items, function (item) {
+        return {
+            name: item.querySelector('.inventory_item_name').textContent,
+            price: parseFloat(item.querySelector('.inventory_item_price').textContent.replace('$', ''))
+        };
+    })
+};
+"""
+    
+    # 审计脚本：一次调用读取购物车存储、排序选项和当前URL
+    _AUDIT_STATE_JS = """/* auditState */
+var sort = document.querySelector("select[data-test='product-sort-container']");
+return {cart: window.localStorage.getItem('cart-contents'), sort: sort ? sort.value : null, url: window.location.href};
+"""
+    
+    @budgeted(PAGE_ACTION_BUDGET)
+    def reset_app_state(self, changed=None):
+        """🔥 重置应用状态 - changed为被改动过的状态集合，None表示全部重置，空集合直接跳过"""
+        changed = set(STATE_KINDS if changed is None else changed)
+        if not changed:
+            logger.debug("应用状态未被改动，跳过重置")
+            return
+        try:
+            logger.info(f"开始重置应用状态: {', '.join(sorted(changed))}")
+            
+            # 排序和结账信息只保存在React组件状态中，组件重新挂载即恢复默认：
+            # 不在商品页时应用内路由回商品页即可；已在商品页且改过排序时同一路由不会重新挂载，需要整页加载
+            on_inventory = page_state.current(self.driver) == "inventory.html"
+            if SORT in changed and on_inventory:
+                self.navigate_to(BASE_URL + "inventory.html")
+            elif not on_inventory:
+                self.go_to("inventory.html")
+            
+            if CART in changed:
+                # 1. 点击菜单按钮打开侧边栏
+                menu_button = self.element_ops.safe_find_element(self.driver, *self.MENU_BUTTON, cached=True)
+                self.element_ops.safe_click(self.driver, menu_button)
+                time.sleep(0.1)  # 等待菜单打开
+                
+                # 2. 点击Reset App State链接
+                reset_link = self.element_ops.safe_find_element(self.driver, *self.RESET_APP_STATE_LINK, cached=True)
+                self.element_ops.safe_click(self.driver, reset_link)
+                
+                # 3. 关闭菜单（点击X按钮）
+                try:
+                    close_button = self.element_ops.safe_find_element(self.driver, *self.MENU_CLOSE_BUTTON,
+                                                                      timeout=3, cached=True)
+                    self.element_ops.safe_click(self.driver, close_button)
+                except Exception as e:
+                    logger.warning(f"关闭菜单失败: {str(e)}")
+            
+            dirty_state.clear(self.driver)
+            logger.info("应用状态重置完成")
+            
+        except Exception as e:
+            logger.error(f"重置应用状态失败: {str(e)}")
+            # 重置失败不应该导致测试失败，只记录警告
+            logger.warning("应用状态重置失败，继续执行后续操作")
+    
+    def audit_app_state(self):
+        """审计应用状态是否干净，返回检测到的残留状态集合(一次脚本调用)"""
+        try:
+            state = self.driver.execute_script(self._AUDIT_STATE_JS) or {}
+        except Exception as e:
+            logger.warning(f"应用状态审计失败: {str(e)}")
+            return set()
+        leaks = set()
+        if state.get("cart") not in (None, "", "[]"):
+            leaks.add(CART)
+        if state.get("sort") not in (None, "az"):
+            leaks.add(SORT)
+        if "checkout" in (state.get("url") or ""):
+            leaks.add(CHECKOUT)
+        return leaks
     
+    @budgeted(PAGE_ACTION_BUDGET)
+    @transition("")
     def logout(self):
         """登出功能"""
         try:
             logger.info("开始登出操作")
             
-            # 检查当前是否在inventory页面，如果不在则先导航过去
-            if "inventory" not in self.driver.current_url:
-                self.driver.get(BASE_URL + "inventory.html")
-                time.sleep(0.1)
+            # 不在inventory页面时先导航过去
+            self.go_to("inventory.html")
             
-            menu_button = self.element_ops.safe_find_element(self.driver, *self.MENU_BUTTON)
+            menu_button = self.element_ops.safe_find_element(self.driver, *self.MENU_BUTTON, cached=True)
             self.element_ops.safe_click(self.driver, menu_button)
             
             time.sleep(0.1)  # 等待菜单打开
             logger.info("开始重置应用状态")
-            reset_link = self.element_ops.safe_find_element(self.driver, *self.RESET_APP_STATE_LINK)
+            reset_link = self.element_ops.safe_find_element(self.driver, *self.RESET_APP_STATE_LINK, cached=True)
             self.element_ops.safe_click(self.driver, reset_link)
             logger.info("应用状态重置完成")
             time.sleep(0.1)  # 等待重置完成
-            logout_link = self.element_ops.safe_find_element(self.driver, *self.LOGOUT_LINK)
+            logout_link = self.element_ops.safe_find_element(self.driver, *self.LOGOUT_LINK, cached=True)
             self.element_ops.safe_click(self.driver, logout_link)
             
             time.sleep(0.2)  # 等待页面跳转
+            dirty_state.clear(self.driver)
             logger.info("登出操作完成")
             
         except Exception as e:
             logger.error(f"登出失败: {str(e)}")
             raise LoginException(f"登出失败: {str(e)}", e)
     
-    def sort_products(self, sort_value):
-        """排序商品"""
+    def get_product_order(self):
+        """读取当前排序选项和商品顺序 {"sort": 选项值, "products": [{"name", "price"}, ...]}"""
+        try:
+            return self.driver.execute_script(self._PRODUCT_ORDER_JS)
+        except Exception as e:
+            logger.error(f"读取商品顺序失败: {str(e)}")
+            raise ProductException(f"读取商品顺序失败: {str(e)}", e)
+    
+    def _sort_keys(self, products, sort_value):
+        """按排序选项取出每个商品的排序键，并给出期望的顺序"""
+        key, reverse = self.SORT_KEYS[sort_value]
+        keys = [product[key] for product in products]
+        return keys, sorted(keys, reverse=reverse)
+    
+    def sort_products(self, sort_value, timeout=2):
+        """排序商品 - 等待列表顺序生效后返回排序后的商品列表"""
         try:
             logger.info(f"开始商品排序: {sort_value}")
+            if sort_value not in SORT_OPTIONS:
+                raise ProductException(f"不支持的排序选项: {sort_value}")
+            
+            before = self.get_product_order()["products"]
+            before_fingerprint = [product["name"] for product in before]
+            keys, expected = self._sort_keys(before, sort_value)
+            already_sorted = keys == expected
             
-            sort_dropdown = self.element_ops.safe_find_element(self.driver, *self.SORT_DROPDOWN)
+            sort_dropdown = self.element_ops.safe_find_element(self.driver, *self.SORT_DROPDOWN, cached=True)
             select = Select(sort_dropdown)
+            dirty_state.mark(self.driver, SORT)
             select.select_by_value(sort_value)
             
-            time.sleep(0.2)  # 等待排序生效
+            # 排序生效的信号：选项已切换，且商品顺序指纹发生变化(原本就有序时不会变化)
+            def order_applied(driver):
+                state = driver.execute_script(self._PRODUCT_ORDER_JS)
+                if state["sort"] != sort_value:
+                    return False
+                fingerprint = [product["name"] for product in state["products"]]
+                return state["products"] if already_sorted or fingerprint != before_fingerprint else False
+            
+            try:
+                products = Wait.of(self.driver, timeout, poll_frequency=0.05).until(order_applied)
+            except TimeoutException:
+                logger.warning(f"等待排序生效超时: {sort_value}")
+                products = self.get_product_order()["products"]
+            
             logger.info(f"商品排序完成: {sort_value}")
+            return products
             
+        except ProductException:
+            raise
         except Exception as e:
             logger.error(f"商品排序失败: {str(e)}")
             raise ProductException(f"商品排序失败: {str(e)}", e)
     
+    def sort_and_verify(self, sort_value, timeout=2):
+        """应用排序并校验顺序，返回 (实际排序键, 期望排序键)，两者相等即排序正确"""
+        products = self.sort_products(sort_value, timeout)
+        if not products:
+            raise ProductException("无法获取任何商品信息")
+        keys, expected = self._sort_keys(products, sort_value)
+        logger.debug("排序 %s 结果: %s", sort_value, keys)
+        return keys, expected
+    
     def get_all_products(self):
         """获取所有商品元素"""
         try:
             products = self.element_ops.safe_find_elements(self.driver, *self.PRODUCTS)
-            logger.debug(f"找到 {len(products)} 个商品")
+            logger.debug("找到 %d 个商品", len(products))
             return products
         except Exception as e:
             logger.error(f"获取商品列表失败: {str(e)}")
@@ -202,6 +399,7 @@ class InventoryPage(BasePage):
             if index < len(products):
                 product = products[index]
                 add_button = product.find_element(By.XPATH, ".//button[contains(text(),'Add to cart')]")
+                dirty_state.mark(self.driver, CART)
                 self.element_ops.safe_click(self.driver, add_button)
                 
                 time.sleep(0.3)  # 等待添加完成
@@ -219,6 +417,7 @@ class InventoryPage(BasePage):
             logger.info("开始添加所有商品到购物车")
             
             add_buttons = self.element_ops.safe_find_elements(self.driver, *self.ADD_TO_CART_BUTTON)
+            dirty_state.mark(self.driver, CART)
             for i, button in enumerate(add_buttons):
                 try:
                     self.element_ops.safe_click(self.driver, button)
@@ -238,7 +437,7 @@ class InventoryPage(BasePage):
             try:
                 cart_badge = self.element_ops.safe_find_element(self.driver, *self.CART_BADGE, timeout=2)
                 count = int(cart_badge.text)
-                logger.debug(f"购物车数量: {count}")
+                logger.debug("购物车数量: %s", count)
                 return count
             except:
                 # 如果没有找到购物车徽章，说明购物车为空
@@ -248,12 +447,13 @@ class InventoryPage(BasePage):
             logger.error(f"获取购物车数量失败: {str(e)}")
             return 0
     
+    @transition("cart.html")
     def go_to_cart(self):
         """进入购物车"""
         try:
             logger.info("进入购物车")
             
-            cart_link = self.element_ops.safe_find_element(self.driver, *self.CART_LINK)
+            cart_link = self.element_ops.safe_find_element(self.driver, *self.CART_LINK, cached=True)
             self.element_ops.safe_click(self.driver, cart_link)
             
             time.sleep(0.2)  # 等待页面跳转
@@ -279,7 +479,7 @@ class InventoryPage(BasePage):
                     "price": price
                 }
                 
-                logger.debug(f"获取商品详情: {product_info}")
+                logger.debug("获取商品详情: %s", product_info)
                 return product_info
             else:
                 raise ProductException(f"商品索引 {index} 超出范围")
@@ -288,6 +488,7 @@ class InventoryPage(BasePage):
             logger.error(f"获取商品详情失败: {str(e)}")
             raise ProductException(f"获取商品详情失败: {str(e)}", e)
     
+    @transition("inventory-item.html")
     def click_product_image(self, index):
         """点击商品图片进入详情页"""
         try:
@@ -319,7 +520,7 @@ class CartPage(BasePage):
         """获取购物车商品"""
         try:
             items = self.element_ops.safe_find_elements(self.driver, *self.CART_ITEMS)
-            logger.debug(f"购物车中有 {len(items)} 个商品")
+            logger.debug("购物车中有 %d 个商品", len(items))
             return items
         except Exception as e:
             logger.error(f"获取购物车商品失败: {str(e)}")
@@ -332,6 +533,7 @@ class CartPage(BasePage):
             
             remove_buttons = self.element_ops.safe_find_elements(self.driver, *self.REMOVE_BUTTON)
             if index < len(remove_buttons):
+                dirty_state.mark(self.driver, CART)
                 self.element_ops.safe_click(self.driver, remove_buttons[index])
                 time.sleep(0.3)  # 等待移除完成
                 logger.info(f"第 {index} 个商品已从购物车移除")
@@ -342,6 +544,7 @@ class CartPage(BasePage):
             logger.error(f"从购物车移除商品失败: {str(e)}")
             raise CartException(f"从购物车移除商品失败: {str(e)}", e)
     
+    @transition("inventory.html")
     def continue_shopping(self):
         """继续购物"""
         try:
@@ -357,6 +560,7 @@ class CartPage(BasePage):
             logger.error(f"继续购物失败: {str(e)}")
             raise CartException(f"继续购物失败: {str(e)}", e)
     
+    @transition("checkout-step-one.html")
     def checkout(self):
         """开始结账"""
         try:
@@ -383,18 +587,25 @@ class CheckoutPage(BasePage):
     FINISH_BUTTON = (By.ID, "finish")
     CANCEL_BUTTON = (By.ID, "cancel")
     
-    def fill_checkout_info(self, first_name, last_name, postal_code):
-        """填写结账信息"""
+    def fill_checkout_info(self, first_name, last_name, postal_code, keystrokes=None):
+        """填写结账信息 - keystrokes为True时模拟真实键盘输入，默认按FORM_KEYSTROKES配置"""
         try:
             logger.info("填写结账信息")
             
-            first_name_field = self.element_ops.safe_find_element(self.driver, *self.FIRST_NAME_INPUT)
-            last_name_field = self.element_ops.safe_find_element(self.driver, *self.LAST_NAME_INPUT)
-            postal_code_field = self.element_ops.safe_find_element(self.driver, *self.POSTAL_CODE_INPUT)
-            
-            self.element_ops.safe_send_keys(first_name_field, first_name)
-            self.element_ops.safe_send_keys(last_name_field, last_name)
-            self.element_ops.safe_send_keys(postal_code_field, postal_code)
+            dirty_state.mark(self.driver, CHECKOUT)
+            keystrokes = FORM_KEYSTROKES if keystrokes is None else keystrokes
+            if keystrokes:
+                first_name_field = self.element_ops.safe_find_element(self.driver, *self.FIRST_NAME_INPUT)
+                last_name_field = self.element_ops.safe_find_element(self.driver, *self.LAST_NAME_INPUT)
+                postal_code_field = self.element_ops.safe_find_element(self.driver, *self.POSTAL_CODE_INPUT)
+                
+                self.element_ops.safe_send_keys(first_name_field, first_name)
+                self.element_ops.safe_send_keys(last_name_field, last_name)
+                self.element_ops.safe_send_keys(postal_code_field, postal_code)
+            else:
+                self.element_ops.fill_form(self.driver, [(self.FIRST_NAME_INPUT, first_name),
+                                                         (self.LAST_NAME_INPUT, last_name),
+                                                         (self.POSTAL_CODE_INPUT, postal_code)])
             
             logger.info("结账信息填写完成")
             
@@ -402,6 +613,7 @@ class CheckoutPage(BasePage):
             logger.error(f"填写结账信息失败: {str(e)}")
             raise CheckoutException(f"填写结账信息失败: {str(e)}", e)
     
+    @transition(None)  # 表单信息不完整时停留在结账第一步
     def continue_checkout(self):
         """继续结账"""
         try:
@@ -417,12 +629,14 @@ class CheckoutPage(BasePage):
             logger.error(f"继续结账失败: {str(e)}")
             raise CheckoutException(f"继续结账失败: {str(e)}", e)
     
+    @transition("checkout-complete.html")
     def finish_checkout(self):
         """完成结账"""
         try:
             logger.info("完成结账")
             
             finish_button = self.element_ops.safe_find_element(self.driver, *self.FINISH_BUTTON)
+            dirty_state.mark(self.driver, CART, CHECKOUT)
             self.element_ops.safe_click(self.driver, finish_button)
             
             time.sleep(0.2)  # 等待页面跳转
@@ -432,6 +646,7 @@ class CheckoutPage(BasePage):
             logger.error(f"完成结账失败: {str(e)}")
             raise CheckoutException(f"完成结账失败: {str(e)}", e)
     
+    @transition({"checkout-step-one.html": "cart.html", "checkout-step-two.html": "inventory.html"})
     def cancel_checkout(self):
         """取消结账"""
         try:
@@ -453,6 +668,7 @@ class ProductDetailPage(BasePage):
     # 页面元素定位器
     BACK_TO_PRODUCTS_BUTTON = (By.ID, "back-to-products")
     
+    @transition("inventory.html")
     def back_to_products(self):
         """返回商品列表"""
         try:
@@ -0,0 +1,92 @@
+"""
+状态预置 - 直接写入SauceDemo的存储并深链接到目标页面，跳过与被测步骤无关的UI前置操作
+
+SauceDemo的登录态保存在cookie "session-username"中，购物车保存在localStorage "cart-contents"中
+(商品id的JSON数组)。结账表单信息只存在于React组件状态，应用不做持久化，
+而 checkout-step-two.html 可以直接访问，因此深链接到结账第二步时不需要预置表单信息。
+"""
+import json
+from core.dirty_state import dirty_state, CART
+from core.exceptions import CheckoutException
+from core.logger_config import logger
+from core.page_state import page_state
+from config import BASE_URL
+from pages.page_objects import BasePage
+
+SESSION_COOKIE = "session-username"
+CART_STORAGE_KEY = "cart-contents"
+
+# 商品列表默认(名称A-Z)排序下，每个索引对应的商品id，与InventoryPage.add_product_by_index的索引一致
+INVENTORY_ITEM_IDS = [4, 0, 1, 5, 2, 3]
+
+# 可深链接的页面
+SEEDABLE_PAGES = ("inventory.html", "cart.html", "checkout-step-one.html", "checkout-step-two.html")
+
+# 一次脚本调用同时写入cookie和localStorage
+_SEED_STATE_JS = """/* seedState */
+var state = arguments[0];
+Object.keys(state.cookies || {}).forEach(function (name) {
+    document.cookie = name + '=' + encodeURIComponent(state.cookies[name]) + '; path=/';
+});
+Object.keys(state.localStorage || {}).forEach(function (key) {
+    var value = state.localStorage[key];
+    if (value === null) { window.localStorage.removeItem(key); }
+    else { window.localStorage.setItem(key, value); }
+});
+"""
+
+
+class StateSeeder(BasePage):
+    """应用状态预置器"""
+
+    def _ensure_on_app_origin(self):
+        """cookie和localStorage按源隔离，写入前需要处于SauceDemo的源下"""
+        if page_state.current(self.driver) is None:
+            self.navigate_to(BASE_URL)
+
+    def seed(self, cart_indexes=None, username=None, page=None):
+        """
+        预置应用状态并可选地深链接到目标页面
+
+        参数:
+            cart_indexes (list): 购物车中的商品索引(默认排序下的位置)，空列表表示清空购物车，None表示不修改
+            username (str): 预置登录用户，None表示沿用当前登录态
+            page (str): 深链接目标页面，如 "checkout-step-one.html"，None表示不跳转
+        """
+        try:
+            if page is not None and page not in SEEDABLE_PAGES:
+                raise CheckoutException(f"不支持深链接的页面: {page}")
+
+            state = {"cookies": {}, "localStorage": {}}
+            if username is not None:
+                state["cookies"][SESSION_COOKIE] = username
+            if cart_indexes is not None:
+                item_ids = [INVENTORY_ITEM_IDS[index] for index in cart_indexes]
+                state["localStorage"][CART_STORAGE_KEY] = json.dumps(item_ids) if item_ids else None
+
+            self._ensure_on_app_origin()
+            self.driver.execute_script(_SEED_STATE_JS, state)
+            if cart_indexes:
+                dirty_state.mark(self.driver, CART)
+            logger.info(f"已预置应用状态: 用户={username}, 购物车={cart_indexes}")
+
+            if page is not None:
+                self.navigate_to(BASE_URL + page)
+
+        except CheckoutException:
+            raise
+        except Exception as e:
+            logger.error(f"预置应用状态失败: {str(e)}")
+            raise CheckoutException(f"预置应用状态失败: {str(e)}", e)
+
+    def open_cart(self, cart_indexes, username=None):
+        """预置购物车并直接打开购物车页"""
+        self.seed(cart_indexes, username, "cart.html")
+
+    def open_checkout_step_one(self, cart_indexes, username=None):
+        """预置购物车并直接打开结账信息填写页"""
+        self.seed(cart_indexes, username, "checkout-step-one.html")
+
+    def open_checkout_step_two(self, cart_indexes, username=None):
+        """预置购物车并直接打开结账确认页"""
+        self.seed(cart_indexes, username, "checkout-step-two.html")
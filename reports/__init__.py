@@ -1 +1,2 @@
-from .test_reporter import TestReporter, TestResult, test_reporter
\ No newline at end of file
+from .test_reporter import TestReporter, TestResult, test_reporter
+from .result_store import ResultStore
\ No newline at end of file
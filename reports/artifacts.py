@@ -0,0 +1,190 @@
+"""
+失败附件采集 - 用例失败时采集截图、页面源码、控制台日志、cookie和最近的驱动命令
+
+采集只在失败时进行：在测试线程中只向浏览器取回原始数据，
+解码、哈希和写盘交给后台线程，不阻塞下一个用例。
+相同的截图只写一份(按内容哈希去重)，单次运行的附件总大小有上限。
+"""
+import base64
+import hashlib
+import json
+import os
+import queue
+import re
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict
+
+from config import ARTIFACTS_DIR, ARTIFACT_MAX_BYTES, ARTIFACT_PAGE_SOURCE_MAX_BYTES
+from core.logger_config import logger
+from core.webdriver_utils import WebDriverManager
+
+
+@dataclass
+class ArtifactRecord:
+    """一个失败用例的附件位置(由后台线程写盘后填充)"""
+    directory: str
+    files: Dict[str, str] = field(default_factory=dict)
+    written: threading.Event = field(default_factory=threading.Event, repr=False)
+    screenshot_base64: str = field(default="", repr=False)
+
+    @property
+    def screenshot(self):
+        return self.files.get("screenshot", "")
+
+    def wait(self, timeout=None):
+        """等待后台线程处理完该用例的附件，返回是否已处理完(files只包含实际写入的文件)"""
+        return self.written.wait(timeout)
+
+    def html_extras(self, extras):
+        """pytest-html附件(extras为pytest_html.extras)：截图直接内嵌，其余文件链接附件目录，都不需要等待写盘"""
+        items = [extras.url(os.path.abspath(self.directory), name="失败附件")]
+        if self.screenshot_base64:
+            items.append(extras.png(self.screenshot_base64, name="失败截图"))
+        return items
+
+
+def _safe_name(text):
+    return re.sub(r"[^\w.-]+", "_", text).strip("_")[:120]
+
+
+class ArtifactCollector:
+    """失败附件采集器"""
+
+    def __init__(self, base_dir=ARTIFACTS_DIR, max_bytes=ARTIFACT_MAX_BYTES,
+                 page_source_max_bytes=ARTIFACT_PAGE_SOURCE_MAX_BYTES):
+        self.base_dir = base_dir
+        self.run_dir = os.path.join(base_dir, datetime.now().strftime("%Y%m%d_%H%M%S"))
+        self.max_bytes = max_bytes
+        self.page_source_max_bytes = page_source_max_bytes
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._screenshots = {}  # 截图内容哈希 -> 文件路径
+        self._directories = set()
+        self.stats = {"captured": 0, "bytes_written": 0, "deduplicated": 0, "skipped_over_cap": 0}
+
+    # ========== 测试线程：取回原始数据 ==========
+    def capture(self, driver, test_id, error_message=""):
+        """采集失败现场，返回ArtifactRecord(文件在后台写入)"""
+        record = ArtifactRecord(self._directory_for(test_id))
+        payload = {"test_id": test_id, "error": error_message, "captured_at": datetime.now().isoformat()}
+        for key, getter in (
+            ("url", lambda: driver.current_url),
+            ("screenshot", driver.get_screenshot_as_base64),
+            ("page_source", lambda: driver.page_source),
+            ("cookies", driver.get_cookies),
+            ("console", lambda: driver.get_log("browser")),
+            ("commands", lambda: WebDriverManager.get_recent_commands(driver)),
+        ):
+            try:
+                payload[key] = getter()
+            except Exception as e:
+                logger.debug(f"采集{key}失败: {str(e)}")
+                payload[key] = None
+        record.screenshot_base64 = payload["screenshot"] or ""
+        self._ensure_writer()
+        self._queue.put((record, payload))
+        with self._lock:
+            self.stats["captured"] += 1
+        logger.info(f"已采集失败附件: {test_id} -> {record.directory}")
+        return record
+
+    def _directory_for(self, test_id):
+        """同一用例多次失败(如重跑)时使用不同的目录"""
+        base = os.path.join(self.run_dir, _safe_name(test_id))
+        with self._lock:
+            directory, attempt = base, 1
+            while directory in self._directories:
+                attempt += 1
+                directory = f"{base}_{attempt}"
+            self._directories.add(directory)
+        return directory
+
+    # ========== 后台线程：编码与写盘 ==========
+    def _ensure_writer(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._writer_loop, name="artifact-writer", daemon=True)
+                self._thread.start()
+
+    def _writer_loop(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                self._write(*job)
+            except Exception as e:
+                logger.warning(f"写入失败附件出错: {str(e)}")
+            finally:
+                if job is not None:
+                    job[0].written.set()
+                self._queue.task_done()
+
+    def _reserve(self, size):
+        """在总大小上限内预留空间"""
+        with self._lock:
+            if self.stats["bytes_written"] + size > self.max_bytes:
+                self.stats["skipped_over_cap"] += 1
+                return False
+            self.stats["bytes_written"] += size
+            return True
+
+    def _write_file(self, record, kind, filename, data):
+        if not self._reserve(len(data)):
+            logger.warning(f"附件总大小超出上限，跳过: {record.directory}/{filename}")
+            return
+        path = os.path.join(record.directory, filename)
+        with open(path, "wb") as f:
+            f.write(data)
+        record.files[kind] = path
+
+    def _write(self, record, payload):
+        os.makedirs(record.directory, exist_ok=True)
+
+        screenshot = payload.pop("screenshot", None)
+        if screenshot:
+            data = base64.b64decode(screenshot)
+            digest = hashlib.sha256(data).hexdigest()
+            with self._lock:
+                existing = self._screenshots.get(digest)
+                if existing:
+                    self.stats["deduplicated"] += 1
+            if existing:
+                record.files["screenshot"] = existing
+            else:
+                self._write_file(record, "screenshot", "screenshot.png", data)
+                if "screenshot" in record.files:
+                    with self._lock:
+                        self._screenshots[digest] = record.files["screenshot"]
+
+        page_source = payload.pop("page_source", None)
+        if page_source:
+            data = page_source.encode("utf-8")
+            if len(data) > self.page_source_max_bytes:
+                data = data[:self.page_source_max_bytes] + b"\n<!-- truncated -->"
+            self._write_file(record, "page_source", "page_source.html", data)
+
+        payload["files"] = dict(record.files)
+        data = json.dumps(payload, ensure_ascii=False, indent=2, default=str).encode("utf-8")
+        self._write_file(record, "details", "details.json", data)
+
+    def flush(self):
+        """等待所有附件写完"""
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self):
+        """写完剩余附件并停止后台线程"""
+        self.flush()
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        logger.info(f"失败附件: 采集 {self.stats['captured']} 个, 写入 {self.stats['bytes_written']} 字节, "
+                    f"截图去重 {self.stats['deduplicated']} 次, 超出上限跳过 {self.stats['skipped_over_cap']} 个")
+
+
+# 全局附件采集器实例
+artifact_collector = ArtifactCollector()
@@ -0,0 +1,339 @@
+"""
+实时进度面板 - 在控制台用几行紧凑的视图代替逐条用例输出和INFO日志
+
+显示总进度、按用户和按测试功能的进度、最近一分钟的吞吐(用例/分)、按历史耗时估算的剩余时间、
+当前耗时最长的进行中用例/场景动作，以及失败数。
+面板作为pytest插件只依赖用例报告钩子(logstart/logreport/logfinish)，
+使用pytest-xdist并行时在主进程中汇总所有worker的报告。
+刷新频率有上限(PROGRESS_REFRESH_INTERVAL)，钩子中只更新计数，不额外访问浏览器。
+"""
+import re
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import pytest
+
+from config import USERNAMES, RESULTS_DB_PATH, PROGRESS_REFRESH_INTERVAL, PROGRESS_HISTORY_DAYS
+from core.logger_config import logger
+from core.test_ordering import get_case_user_index
+from reports.result_store import ResultStore
+
+# 吞吐统计窗口(秒)
+THROUGHPUT_WINDOW = 60
+# 输出不是终端(CI日志)时不重绘，按此间隔(秒)追加一行摘要
+PLAIN_REFRESH_INTERVAL = 10
+BAR_WIDTH = 20
+FUNCTIONS_PER_LINE = 6
+
+
+def case_of_item(item):
+    """用例对应的(测试功能, 用户)：用户由参数化参数user_count决定，非参数化用例为"-" """
+    user_index = get_case_user_index(item)
+    function = getattr(item, "originalname", None) or item.name.split("[")[0]
+    return function, USERNAMES[user_index] if user_index is not None else "-"
+
+
+def case_of(nodeid):
+    """
+    只有nodeid时(pytest-xdist主进程不收集用例)对应的(测试功能, 用户)
+
+    按默认参数化id把"[N]"当作user_count解析，其他id格式的用户为"-"。
+    """
+    name = nodeid.rsplit("::", 1)[-1]
+    function, _, param = name.partition("[")
+    param = param.rstrip("]")
+    user = USERNAMES[int(param) % len(USERNAMES)] if param.isdigit() else "-"
+    return function, user
+
+
+def _short_function(function):
+    match = re.match(r"test_(\d+)_", function)
+    return match.group(1) if match else function
+
+
+def _clock(seconds):
+    if seconds is None:
+        return "--:--"
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes:02d}:{seconds:02d}"
+
+
+def _bar(done, total):
+    filled = int(BAR_WIDTH * done / total) if total else 0
+    return "█" * filled + "░" * (BAR_WIDTH - filled)
+
+
+class _ConsoleAbove:
+    """控制台日志的输出流：日志写在面板上方，不打乱面板"""
+
+    def __init__(self, dashboard):
+        self._dashboard = dashboard
+
+    def write(self, text):
+        self._dashboard.write_above(text)
+
+    def flush(self):
+        pass
+
+
+class ProgressDashboard:
+    """实时进度面板(pytest插件)"""
+
+    def __init__(self, stream=None, interval=PROGRESS_REFRESH_INTERVAL, clock=time.monotonic):
+        self.stream = stream
+        self.interval = interval
+        self.clock = clock
+        self.history = {}          # (测试功能, 用户) -> 历史平均耗时(秒)
+        self._function_history = {}
+        self.workers = 1
+        self._workers = set()
+        self._lock = threading.Lock()
+        self._cases = {}           # nodeid -> (测试功能, 用户)
+        self._done = {}            # nodeid -> 本次耗时(秒)
+        self._failed = set()
+        self._running = {}         # nodeid -> 开始时间
+        self._actions = {}         # 线程id -> (动作名, 开始时间)
+        self._completions = deque()
+        self._started = None
+        self._last_render = None
+        self._lines_drawn = 0
+        self._ticker = None
+        self._stop = threading.Event()
+        self._output_lock = threading.Lock()
+        self.console = _ConsoleAbove(self)
+        self.stats = {"renders": 0}
+
+    # ========== 生命周期 ==========
+    def start(self, db_path=RESULTS_DB_PATH, days=PROGRESS_HISTORY_DAYS):
+        """读取历史耗时并启动定时刷新线程"""
+        if self.stream is None:
+            # pytest加载conftest期间stdout被捕获，启动时才取实际的控制台
+            self.stream = sys.stdout
+        if db_path:
+            try:
+                with ResultStore(db_path) as store:
+                    self.set_history(store.average_durations(days))
+            except Exception as e:
+                logger.warning(f"读取历史耗时失败，剩余时间按本次运行的速度估算: {str(e)}")
+        self._started = self.clock()
+        self._stop.clear()
+        self._ticker = threading.Thread(target=self._tick, name="progress-dashboard", daemon=True)
+        self._ticker.start()
+        return self
+
+    def stop(self):
+        """停止刷新线程并输出最终状态"""
+        self._stop.set()
+        if self._ticker is not None:
+            self._ticker.join()
+            self._ticker = None
+        self.refresh(force=True)
+
+    def set_history(self, history):
+        """登记历史平均耗时，并按测试功能汇总(新用户没有历史时使用)"""
+        self.history = dict(history)
+        by_function = {}
+        for (function, _), seconds in self.history.items():
+            by_function.setdefault(function, []).append(seconds)
+        self._function_history = {function: sum(values) / len(values) for function, values in by_function.items()}
+
+    def _tick(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.debug("进度面板刷新失败: %s", e)
+
+    # ========== 数据来源 ==========
+    def set_cases(self, cases):
+        """登记本次运行的全部用例：nodeid -> (测试功能, 用户)"""
+        with self._lock:
+            self._cases = dict(cases)
+
+    def case_started(self, nodeid):
+        with self._lock:
+            self._running[nodeid] = self.clock()
+
+    def case_finished(self, nodeid):
+        with self._lock:
+            self._running.pop(nodeid, None)
+
+    def record(self, report):
+        """汇总一个阶段的报告：call阶段或失败/跳过的setup阶段结束时用例完成"""
+        with self._lock:
+            if report.failed:
+                self._failed.add(report.nodeid)
+            completed = report.when == "call" or (report.when == "setup" and not report.passed)
+            if completed and report.nodeid not in self._done:
+                self._done[report.nodeid] = report.duration
+                self._completions.append(self.clock())
+
+    @contextmanager
+    def action(self, name):
+        """登记当前线程正在执行的场景动作"""
+        key = threading.get_ident()
+        with self._lock:
+            self._actions[key] = (name, self.clock())
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._actions.pop(key, None)
+
+    # ========== 估算 ==========
+    def _expected(self, function, user, observed):
+        """用例的预计耗时：历史同用户 > 历史同功能 > 本次运行已完成用例的平均耗时"""
+        expected = self.history.get((function, user))
+        if expected is None:
+            expected = self._function_history.get(function, observed)
+        return expected
+
+    def throughput(self, now):
+        """最近THROUGHPUT_WINDOW秒的吞吐(用例/分)"""
+        while self._completions and now - self._completions[0] > THROUGHPUT_WINDOW:
+            self._completions.popleft()
+        window = min(THROUGHPUT_WINDOW, now - self._started) if self._started is not None else 0
+        return len(self._completions) / window * 60 if window > 0 else 0.0
+
+    def eta(self, now):
+        """
+        预计剩余时间(秒)，无法估算时返回None
+
+        剩余用例的预计耗时之和(进行中的用例扣除已执行的时间)，
+        再按已完成用例的实际墙钟时间/预计耗时校正，并行worker和机器快慢都体现在这个比例中。
+        """
+        observed = sum(self._done.values()) / len(self._done) if self._done else None
+        remaining = 0.0
+        for nodeid, (function, user) in self._cases.items():
+            if nodeid in self._done:
+                continue
+            expected = self._expected(function, user, observed)
+            if expected is None:
+                return None
+            if nodeid in self._running:
+                expected = max(expected - (now - self._running[nodeid]), 0.0)
+            remaining += expected
+        done_expected = sum(self._expected(function, user, observed) or 0.0
+                            for nodeid, (function, user) in self._cases.items() if nodeid in self._done)
+        if done_expected > 0 and self._started is not None:
+            return remaining * (now - self._started) / done_expected
+        return remaining / max(self.workers, 1)
+
+    # ========== 渲染 ==========
+    def render(self):
+        """面板文本行"""
+        with self._lock:
+            now = self.clock()
+            total, done, failed = len(self._cases), len(self._done), len(self._failed)
+            elapsed = now - self._started if self._started is not None else 0.0
+            percent = done / total * 100 if total else 0.0
+            lines = [f"进度 {done}/{total} ({percent:.1f}%)  失败 {failed}  "
+                     f"吞吐 {self.throughput(now):.1f} 用例/分  已用 {_clock(elapsed)}  预计剩余 {_clock(self.eta(now))}"]
+
+            users, functions = {}, {}
+            for nodeid, (function, user) in self._cases.items():
+                for groups, key in ((users, user), (functions, function)):
+                    counts = groups.setdefault(key, [0, 0, 0])
+                    counts[0] += 1
+                    counts[1] += nodeid in self._done
+                    counts[2] += nodeid in self._failed
+            width = max((len(user) for user in users), default=0)
+            for user, (user_total, user_done, user_failed) in sorted(users.items()):
+                lines.append(f"  {user:<{width}}  {_bar(user_done, user_total)} {user_done}/{user_total}"
+                             + (f"  失败 {user_failed}" if user_failed else ""))
+
+            cells = []
+            for function, (function_total, function_done, function_failed) in sorted(functions.items()):
+                mark = "✗" if function_failed else ("✓" if function_done == function_total else " ")
+                cells.append(f"{_short_function(function)} {function_done}/{function_total}{mark}")
+            for start in range(0, len(cells), FUNCTIONS_PER_LINE):
+                lines.append("  " + "  ".join(cells[start:start + FUNCTIONS_PER_LINE]))
+
+            if self._running:
+                nodeid, since = min(self._running.items(), key=lambda item: item[1])
+                slowest = f"最慢进行中: {nodeid.rsplit('::', 1)[-1]} {now - since:.1f}s"
+                if self._actions:
+                    name, action_since = min(self._actions.values(), key=lambda item: item[1])
+                    slowest += f"  动作 {name} {now - action_since:.1f}s"
+                lines.append(slowest)
+        return lines
+
+    def _clear(self):
+        """光标回到上次面板的第一行并清除到屏幕末尾；首次绘制时另起一行"""
+        if self._lines_drawn:
+            return f"\x1b[{self._lines_drawn}F\x1b[J"
+        return "" if self.stats["renders"] else "\n"
+
+    def refresh(self, force=False):
+        """距上次刷新超过刷新间隔时重绘面板，返回是否重绘"""
+        interactive = self.stream.isatty()
+        interval = self.interval if interactive else max(self.interval, PLAIN_REFRESH_INTERVAL)
+        with self._output_lock:
+            now = self.clock()
+            if not force and self._last_render is not None and now - self._last_render < interval:
+                return False
+            self._last_render = now
+            lines = self.render()
+            if interactive:
+                self.stream.write(self._clear() + "\n".join(lines) + "\n")
+                self._lines_drawn = len(lines)
+            else:
+                self.stream.write(lines[0] + "\n")
+            self.stream.flush()
+            self.stats["renders"] += 1
+            return True
+
+    def write_above(self, text):
+        """在面板上方输出文本(控制台日志)，面板随后在其下方重绘"""
+        with self._output_lock:
+            # 面板停止后不再重绘，日志直接输出在最终面板下方
+            interactive = self.stream.isatty() and self._ticker is not None
+            if interactive:
+                self.stream.write(self._clear())
+                self._lines_drawn = 0
+            self.stream.write(text)
+            self.stream.flush()
+        if interactive:
+            self.refresh(force=True)
+
+    # ========== pytest钩子 ==========
+    def pytest_collection_finish(self, session):
+        self.set_cases((item.nodeid, case_of_item(item)) for item in session.items)
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_xdist_node_collection_finished(self, node, ids):
+        """pytest-xdist主进程：每个worker收集完成时调用，各worker收集到的用例相同"""
+        self._workers.add(node.gateway.id)
+        self.workers = len(self._workers)
+        if not self._cases:
+            self.set_cases((nodeid, case_of(nodeid)) for nodeid in ids)
+
+    def pytest_runtest_logstart(self, nodeid, location):
+        self.case_started(nodeid)
+
+    def pytest_runtest_logreport(self, report):
+        self.record(report)
+        self.refresh()
+
+    def pytest_runtest_logfinish(self, nodeid, location):
+        self.case_finished(nodeid)
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_report_teststatus(self, report, config):
+        """保留结果分类供最终摘要统计，不再逐条输出用例结果"""
+        result = yield
+        if result:
+            category = result[0]
+            return category, "", ""
+        return result
+
+    def pytest_sessionfinish(self, session):
+        self.stop()
+
+
+# 全局进度面板实例
+progress_dashboard = ProgressDashboard()
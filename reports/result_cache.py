@@ -0,0 +1,122 @@
+"""
+结果缓存 - 按内容寻址缓存只读用例的通过结果，代码和目标版本都没变时直接回放到TestReporter
+
+键为以下内容的SHA-256：
+    测试源码     测试函数源码，场景用例另加场景定义
+    用到的代码   用例影响记录(nightly生成)中该用例及所有用例共享的符号，以及它们引用的常量(配置项、
+                 定位器等，传递)在当前工作区中的源码
+    用户         用例使用的用户
+    目标版本     被测应用的版本标识(RESULT_CACHE_BUILD_ID / --target-build)
+任一部分变化都会得到新的键，旧条目不会再被命中；条目另有有效期(TTL)，过期后重新执行。
+只缓存通过的结果，用例失败时删除对应条目。每个条目一个JSON文件，多个worker可以共用同一目录。
+"""
+import hashlib
+import inspect
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+
+from config import RESULT_CACHE_DIR, RESULT_CACHE_TTL, IMPACT_MAP_PATH
+from core.impact import ImpactMap, index_tree
+from core.logger_config import logger
+from reports.test_reporter import TestResult
+
+# 回放时从缓存恢复的字段
+_REPLAYED_FIELDS = ("test_name", "username", "description")
+
+
+def case_source(function):
+    """测试函数源码，场景编译出的用例另加场景定义(所有场景用例共用同一个函数体)"""
+    try:
+        source = inspect.getsource(function)
+    except (OSError, TypeError):
+        source = getattr(function, "__qualname__", repr(function))
+    scenario = getattr(function, "scenario", None)
+    return source if scenario is None else f"{source}\n{scenario!r}"
+
+
+class ResultCache:
+    """内容寻址的用例结果缓存"""
+
+    def __init__(self, directory=RESULT_CACHE_DIR, ttl=RESULT_CACHE_TTL, impact_map_path=IMPACT_MAP_PATH):
+        self.directory = directory
+        self.ttl = ttl
+        self.impact_map_path = impact_map_path
+        self._impact_map = None
+        self._index = None
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "stored": 0, "invalidated": 0, "uncacheable": 0}
+
+    def key(self, nodeid, source, username, build_id) -> Optional[str]:
+        """用例的缓存键，用例不在影响记录中(不知道用到了哪些代码)时返回None"""
+        with self._lock:
+            if self._impact_map is None:
+                self._impact_map = ImpactMap.load(self.impact_map_path)
+                self._index = index_tree()
+            symbols = self._impact_map.cases.get(nodeid)
+            if symbols is None:
+                self.stats["uncacheable"] += 1
+                return None
+            digest = hashlib.sha256()
+            for part in (source, username, build_id):
+                digest.update(part.encode("utf-8") + b"\0")
+            used = symbols | self._impact_map.shared
+            for symbol in sorted(used | self._index.referenced_constants(used)):
+                digest.update(symbol.encode("utf-8") + b"\0" + self._index.source_of(symbol).encode("utf-8") + b"\0")
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def lookup(self, key, ttl=None):
+        """读取未过期的条目，未命中或已过期时返回None(过期条目被删除)"""
+        ttl = self.ttl if ttl is None else ttl
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.stats["misses"] += 1
+            return None
+        if time.time() - entry["stored_at"] > ttl:
+            self.stats["expired"] += 1
+            self.invalidate(key, count=False)
+            return None
+        self.stats["hits"] += 1
+        return entry
+
+    def store(self, key, result: TestResult):
+        """缓存通过的结果(写临时文件后原子替换)"""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        entry = {field: getattr(result, field) for field in _REPLAYED_FIELDS}
+        entry.update(duration=result.duration, execution_time=result.execution_time, stored_at=time.time())
+        temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(temporary, path)
+        self.stats["stored"] += 1
+        logger.debug("结果已缓存: %s - %s (%s)", result.test_name, result.username, key[:12])
+
+    def invalidate(self, key, count=True):
+        """删除条目(用例失败时)"""
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            return
+        if count:
+            self.stats["invalidated"] += 1
+
+    @staticmethod
+    def replay(entry) -> TestResult:
+        """把缓存的通过结果回放为本次运行的测试结果(本次未执行，耗时为0)"""
+        result = TestResult(status="PASSED", execution_time=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                            **{field: entry[field] for field in _REPLAYED_FIELDS})
+        result.cached_from = entry["execution_time"]
+        return result
+
+
+# 全局结果缓存实例
+result_cache = ResultCache()
@@ -0,0 +1,187 @@
+"""
+测试结果持久化存储 - 基于SQLite保存每次运行的结果，支持历史趋势查询
+
+表结构:
+    runs    每次运行一行(开始/结束时间、总数、通过、失败)
+    results 每个测试用例一行(运行时间冗余存储，便于按时间窗口走索引)
+常用查询都按(测试名/用户, 运行时间)建了复合索引，多年的夜间运行数据下也只扫描时间窗口内的行。
+"""
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import List, Dict, Optional
+
+from config import RESULTS_DB_PATH
+from core.logger_config import logger
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at  TEXT NOT NULL,
+    finished_at TEXT NOT NULL,
+    total       INTEGER NOT NULL,
+    passed      INTEGER NOT NULL,
+    failed      INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id        INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    run_ts        TEXT NOT NULL,
+    test_name     TEXT NOT NULL,
+    username      TEXT NOT NULL,
+    status        TEXT NOT NULL,
+    duration      REAL NOT NULL DEFAULT 0,
+    error_message TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_runs_started_at ON runs(started_at);
+CREATE INDEX IF NOT EXISTS idx_results_test_ts ON results(test_name, run_ts, duration, status);
+CREATE INDEX IF NOT EXISTS idx_results_test_user_ts ON results(test_name, username, run_ts, status);
+CREATE INDEX IF NOT EXISTS idx_results_user_ts ON results(username, run_ts);
+CREATE INDEX IF NOT EXISTS idx_results_ts ON results(run_ts);
+CREATE INDEX IF NOT EXISTS idx_results_run ON results(run_id);
+"""
+
+_TS_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _since(days):
+    """将“最近N天”转换为时间窗口下界"""
+    if days is None:
+        return "0000-00-00 00:00:00"
+    return (datetime.now() - timedelta(days=days)).strftime(_TS_FORMAT)
+
+
+class ResultStore:
+    """SQLite测试结果存储"""
+
+    def __init__(self, db_path=RESULTS_DB_PATH):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(db_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # ========== 写入 ==========
+    def save_run(self, results, started_at=None, finished_at=None) -> int:
+        """保存一次运行的全部结果，返回run_id"""
+        started = (started_at or datetime.now()).strftime(_TS_FORMAT)
+        finished = (finished_at or datetime.now()).strftime(_TS_FORMAT)
+        passed = sum(1 for result in results if result.status == "PASSED")
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO runs (started_at, finished_at, total, passed, failed) VALUES (?, ?, ?, ?, ?)",
+                (started, finished, len(results), passed, len(results) - passed),
+            )
+            run_id = cursor.lastrowid
+            self._conn.executemany(
+                "INSERT INTO results (run_id, run_ts, test_name, username, status, duration, error_message) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (run_id, started, result.test_name, result.username or "", result.status,
+                     float(getattr(result, "duration", 0.0) or 0.0), result.error_message or "")
+                    for result in results
+                ],
+            )
+        logger.debug(f"测试结果已写入结果库: {self.db_path} (run_id={run_id}, {len(results)} 条)")
+        return run_id
+
+    def purge_older_than(self, days):
+        """删除超过保留期的历史运行"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute("DELETE FROM runs WHERE started_at < ?", (_since(days),))
+        return cursor.rowcount
+
+    # ========== 查询 ==========
+    def _query(self, sql, params=()):
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params).fetchall()]
+
+    def duration_trend(self, test_name, days: Optional[int] = 30, username: Optional[str] = None,
+                       bucket="day") -> List[Dict]:
+        """测试耗时趋势：按天(或按次运行)聚合的平均/最大耗时"""
+        period = "substr(run_ts, 1, 10)" if bucket == "day" else "run_ts"
+        sql = (
+            f"SELECT {period} AS period, COUNT(*) AS runs, AVG(duration) AS avg_duration, "
+            "MAX(duration) AS max_duration, SUM(status != 'PASSED') AS failed "
+            "FROM results WHERE test_name = ? AND run_ts >= ?"
+        )
+        params = [test_name, _since(days)]
+        if username:
+            sql += " AND username = ?"
+            params.append(username)
+        sql += " GROUP BY period ORDER BY period"
+        return self._query(sql, params)
+
+    def slowest(self, n=10, days: Optional[int] = 7, by_user=False) -> List[Dict]:
+        """时间窗口内平均耗时最长的N个测试(可按用户拆分)"""
+        group = "test_name, username" if by_user else "test_name"
+        return self._query(
+            f"SELECT {group}, COUNT(*) AS runs, AVG(duration) AS avg_duration, MAX(duration) AS max_duration "
+            f"FROM results WHERE run_ts >= ? GROUP BY {group} ORDER BY avg_duration DESC LIMIT ?",
+            (_since(days), n),
+        )
+
+    def average_durations(self, days: Optional[int] = 30) -> Dict:
+        """时间窗口内每个测试+用户的平均耗时，{(test_name, username): 秒}"""
+        rows = self._query(
+            "SELECT test_name, username, AVG(duration) AS avg_duration FROM results "
+            "WHERE run_ts >= ? GROUP BY test_name, username",
+            (_since(days),),
+        )
+        return {(row["test_name"], row["username"]): row["avg_duration"] for row in rows}
+
+    def slowdowns(self, days=7, baseline_days=30, n=10) -> List[Dict]:
+        """最近days天相比之前baseline_days天变慢最多的测试("这周哪个测试变慢了")"""
+        recent_since, baseline_since = _since(days), _since(days + baseline_days)
+        return self._query(
+            "SELECT test_name, "
+            "AVG(CASE WHEN run_ts >= :recent THEN duration END) AS recent_avg, "
+            "AVG(CASE WHEN run_ts < :recent THEN duration END) AS baseline_avg "
+            "FROM results WHERE run_ts >= :baseline GROUP BY test_name "
+            "HAVING recent_avg IS NOT NULL AND baseline_avg IS NOT NULL AND baseline_avg > 0 "
+            "ORDER BY recent_avg / baseline_avg DESC LIMIT :n",
+            {"recent": recent_since, "baseline": baseline_since, "n": n},
+        )
+
+    def flakiness(self, days: Optional[int] = 30, min_runs=2, n=None) -> List[Dict]:
+        """不稳定率：同一测试+用户在相邻两次运行间状态翻转的比例，以及失败率"""
+        sql = (
+            "WITH ordered AS ("
+            "  SELECT test_name, username, status, "
+            "         LAG(status) OVER (PARTITION BY test_name, username ORDER BY run_ts, id) AS previous "
+            "  FROM results WHERE run_ts >= ?"
+            ") "
+            "SELECT test_name, username, COUNT(*) AS runs, "
+            "       SUM(status != 'PASSED') AS failed, "
+            "       SUM(previous IS NOT NULL AND previous != status) AS flips, "
+            "       CAST(SUM(status != 'PASSED') AS REAL) / COUNT(*) * 100 AS fail_rate, "
+            "       CAST(SUM(previous IS NOT NULL AND previous != status) AS REAL) "
+            "           / MAX(COUNT(*) - 1, 1) * 100 AS flaky_rate "
+            "FROM ordered GROUP BY test_name, username HAVING runs >= ? "
+            "ORDER BY flaky_rate DESC, fail_rate DESC"
+        )
+        params = [_since(days), min_runs]
+        if n:
+            sql += " LIMIT ?"
+            params.append(n)
+        return self._query(sql, params)
+
+    def run_history(self, n=20) -> List[Dict]:
+        """最近N次运行的概况"""
+        return self._query("SELECT * FROM runs ORDER BY started_at DESC LIMIT ?", (n,))
@@ -3,7 +3,7 @@
 """
 import os
 from datetime import datetime
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List, Dict
 import openpyxl
 from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
@@ -11,6 +11,8 @@ from openpyxl.utils import get_column_letter
 import re
 
 from core.logger_config import logger
+from config import RESULTS_DB_PATH
+from reports.result_store import ResultStore
 
 @dataclass
 class TestResult:
@@ -21,18 +23,43 @@ class TestResult:
     execution_time: str
     error_message: str = ""
     description: str = ""
+    duration: float = 0.0               # 总耗时(秒) = 各阶段耗时之和
+    setup_duration: float = 0.0         # setup阶段耗时(含用户切换)
+    call_duration: float = 0.0          # 测试主体耗时
+    teardown_duration: float = 0.0      # teardown阶段耗时
+    reset_duration: float = 0.0         # 用例结束后重置应用状态耗时
+    user_switch_duration: float = 0.0   # user_session中登出/登录切换用户耗时
+    artifact_dir: str = ""              # 失败附件目录(仅失败用例)
+    artifact_files: Dict[str, str] = field(default_factory=dict)  # 附件类型 -> 文件路径(后台写入后填充)
+    rerun_status: str = ""              # 失败重跑结论: FLAKY(重跑通过) / CONSISTENT(重跑仍失败)
+    rerun_attempts: int = 0             # 重跑次数
+    cached_from: str = ""               # 结果缓存回放：原通过结果的执行时间(本次未执行)
+    
+    def update_duration(self):
+        """根据各阶段耗时重新计算总耗时"""
+        self.duration = self.setup_duration + self.call_duration + self.teardown_duration + self.reset_duration
 
 class TestReporter:
     """测试报告生成器"""
     
     def __init__(self):
         self.test_results: List[TestResult] = []
+        self.run_started_at = datetime.now()
     
     def add_test_result(self, result: TestResult):
         """添加测试结果"""
         self.test_results.append(result)
         logger.debug(f"添加测试结果: {result.test_name} - {result.username} - {result.status}")
     
+    def record_rerun(self, result: TestResult, classification: str, attempts: int, error_message: str = ""):
+        """记录失败用例的重跑结论(由重跑线程调用)"""
+        result.rerun_status = classification
+        result.rerun_attempts = attempts
+        if classification == "FLAKY":
+            logger.warning(f"偶发失败: {result.test_name} - {result.username}，重跑 {attempts} 次后通过")
+        else:
+            logger.error(f"稳定失败: {result.test_name} - {result.username}，重跑 {attempts} 次仍失败: {error_message}")
+    
     def save_results_to_excel(self) -> str:
         """保存测试结果到Excel文件"""
         try:
@@ -50,7 +77,7 @@ class TestReporter:
             wb = openpyxl.Workbook()
             
             # 创建详细结果工作表
-            self._create_detailed_results_sheet(wb)
+            self._create_detailed_results_sheet(wb, reports_dir)
             
             # 创建汇总统计工作表
             self._create_summary_sheet(wb)
@@ -58,6 +85,9 @@ class TestReporter:
             # 创建按功能分组的工作表
             self._create_function_summary_sheet(wb)
             
+            # 创建耗时排名工作表
+            self._create_duration_ranking_sheet(wb)
+            
             # 删除默认工作表
             if 'Sheet' in wb.sheetnames:
                 wb.remove(wb['Sheet'])
@@ -72,13 +102,28 @@ class TestReporter:
             logger.error(f"保存Excel报告失败: {str(e)}")
             return ""
     
-    def _create_detailed_results_sheet(self, wb):
+    def save_results_to_store(self, db_path=RESULTS_DB_PATH):
+        """保存测试结果到SQLite历史结果库"""
+        if not db_path:
+            return None
+        try:
+            # 回放的缓存结果本次没有执行，不计入历史耗时和不稳定率
+            executed = [result for result in self.test_results if not result.cached_from]
+            with ResultStore(db_path) as store:
+                run_id = store.save_run(executed, started_at=self.run_started_at)
+            logger.info(f"测试结果已写入结果库: {db_path} (run_id={run_id})")
+            return run_id
+        except Exception as e:
+            logger.error(f"保存结果到结果库失败: {str(e)}")
+            return None
+    
+    def _create_detailed_results_sheet(self, wb, reports_dir="test_reports"):
         """创建详细结果工作表"""
         ws = wb.active
         ws.title = "详细测试结果"
         
         # 设置表头
-        headers = ["测试功能", "用户名", "测试状态", "执行时间", "错误信息", "功能描述"]
+        headers = ["测试功能", "用户名", "测试状态", "执行时间", "耗时(秒)", "错误信息", "功能描述", "重跑结论", "结果缓存", "失败附件"]
         ws.append(headers)
         
         # 设置表头样式
@@ -106,10 +151,20 @@ class TestReporter:
                 self._clean_text(result.username),
                 result.status,
                 result.execution_time,
+                round(result.duration, 3),
                 self._clean_text(result.error_message),
-                self._clean_text(result.description)
+                self._clean_text(result.description),
+                self._rerun_label(result),
+                f"回放 {result.cached_from} 的通过结果" if result.cached_from else "",
+                "查看附件" if result.artifact_dir else ""
             ]
             ws.append(row_data)
+            if result.artifact_dir:
+                # 优先链接截图，否则链接附件目录 (相对报告文件所在目录)
+                target = result.artifact_files.get("screenshot") or result.artifact_dir
+                link_cell = ws.cell(row=ws.max_row, column=len(headers))
+                link_cell.hyperlink = os.path.relpath(target, reports_dir)
+                link_cell.font = Font(color="0563C1", underline="single")
         
         # 设置数据行样式
         for row_num in range(2, len(self.test_results) + 2):
@@ -122,7 +177,7 @@ class TestReporter:
                     if cell.value == "PASSED":
                         cell.fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
                         cell.font = Font(color="006100")
-                    elif cell.value == "FAILED":
+                    elif cell.value in ("FAILED", "ERROR", "TIMEOUT"):
                         cell.fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
                         cell.font = Font(color="9C0006")
                 
@@ -130,7 +185,7 @@ class TestReporter:
                 cell.alignment = Alignment(horizontal="left", vertical="center", wrap_text=True)
         
         # 自适应列宽
-        column_widths = [25, 15, 12, 20, 40, 30]
+        column_widths = [25, 15, 12, 20, 12, 40, 30, 20, 20, 12]
         for col_num, width in enumerate(column_widths, 1):
             ws.column_dimensions[get_column_letter(col_num)].width = width
     
@@ -154,6 +209,11 @@ class TestReporter:
             ["通过测试数", summary["passed"]],
             ["失败测试数", summary["failed"]],
             ["通过率", f"{summary['pass_rate']:.2f}%"],
+            ["总耗时(秒)", f"{summary['total_duration']:.2f}"],
+            ["平均耗时(秒)", f"{summary['avg_duration']:.2f}"],
+            ["偶发失败数", summary["flaky"]],
+            ["稳定失败数", summary["consistent_failures"]],
+            ["缓存回放数", summary["cached"]],
             ["", ""],  # 空行
             ["执行时间", datetime.now().strftime("%Y-%m-%d %H:%M:%S")]
         ]
@@ -215,14 +275,14 @@ class TestReporter:
         function_stats = self._get_function_statistics()
         
         # 设置标题
-        ws.merge_cells('A1:E1')
+        ws.merge_cells('A1:F1')
         title_cell = ws['A1']
         title_cell.value = "按测试功能统计"
         title_cell.font = Font(size=16, bold=True)
         title_cell.alignment = Alignment(horizontal="center", vertical="center")
         
         # 设置表头
-        headers = ["测试功能", "总执行次数", "通过次数", "失败次数", "通过率"]
+        headers = ["测试功能", "总执行次数", "通过次数", "失败次数", "通过率", "平均耗时(秒)"]
         for col_num, header in enumerate(headers, 1):
             cell = ws.cell(row=3, column=col_num)
             cell.value = header
@@ -238,6 +298,7 @@ class TestReporter:
             ws.cell(row=row_num, column=3, value=stats['passed'])
             ws.cell(row=row_num, column=4, value=stats['failed'])
             ws.cell(row=row_num, column=5, value=f"{stats['pass_rate']:.1f}%")
+            ws.cell(row=row_num, column=6, value=round(stats['avg_duration'], 3))
             
             # 根据通过率设置颜色
             pass_rate_cell = ws.cell(row=row_num, column=5)
@@ -251,7 +312,39 @@ class TestReporter:
             row_num += 1
         
         # 设置列宽
-        column_widths = [30, 15, 15, 15, 15]
+        column_widths = [30, 15, 15, 15, 15, 15]
+        for col_num, width in enumerate(column_widths, 1):
+            ws.column_dimensions[get_column_letter(col_num)].width = width
+    
+    def _create_duration_ranking_sheet(self, wb):
+        """创建耗时排名工作表 - 按总耗时从高到低列出每个用例及各阶段耗时"""
+        ws = wb.create_sheet("耗时排名")
+        
+        headers = ["排名", "测试功能", "用户名", "测试状态", "总耗时(秒)", "setup(秒)", "call(秒)",
+                   "teardown(秒)", "状态重置(秒)", "用户切换(秒)"]
+        ws.append(headers)
+        for col_num in range(1, len(headers) + 1):
+            cell = ws.cell(row=1, column=col_num)
+            cell.font = Font(bold=True, color="FFFFFF")
+            cell.fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+            cell.alignment = Alignment(horizontal="center", vertical="center")
+        
+        ranked = sorted(self.test_results, key=lambda result: result.duration, reverse=True)
+        for rank, result in enumerate(ranked, 1):
+            ws.append([
+                rank,
+                self._clean_text(result.test_name),
+                self._clean_text(result.username),
+                result.status,
+                round(result.duration, 3),
+                round(result.setup_duration, 3),
+                round(result.call_duration, 3),
+                round(result.teardown_duration, 3),
+                round(result.reset_duration, 3),
+                round(result.user_switch_duration, 3)
+            ])
+        
+        column_widths = [8, 30, 15, 12, 12, 12, 12, 12, 14, 14]
         for col_num, width in enumerate(column_widths, 1):
             ws.column_dimensions[get_column_letter(col_num)].width = width
     
@@ -285,9 +378,10 @@ class TestReporter:
         for result in self.test_results:
             func_name = result.test_name
             if func_name not in function_stats:
-                function_stats[func_name] = {'total': 0, 'passed': 0, 'failed': 0}
+                function_stats[func_name] = {'total': 0, 'passed': 0, 'failed': 0, 'duration': 0.0}
             
             function_stats[func_name]['total'] += 1
+            function_stats[func_name]['duration'] += result.duration
             if result.status == "PASSED":
                 function_stats[func_name]['passed'] += 1
             else:
@@ -298,9 +392,18 @@ class TestReporter:
             total = function_stats[func_name]['total']
             passed = function_stats[func_name]['passed']
             function_stats[func_name]['pass_rate'] = (passed / total * 100) if total > 0 else 0
+            function_stats[func_name]['avg_duration'] = (function_stats[func_name]['duration'] / total) if total > 0 else 0
         
         return function_stats
     
+    def _rerun_label(self, result: TestResult) -> str:
+        """详细结果中的重跑结论"""
+        if result.rerun_status == "FLAKY":
+            return f"偶发失败(重跑{result.rerun_attempts}次通过)"
+        if result.rerun_status == "CONSISTENT":
+            return f"稳定失败(重跑{result.rerun_attempts}次)"
+        return ""
+    
     def _clean_text(self, text: str) -> str:
         """清理文本，移除不合适的字符"""
         if not text:
@@ -323,22 +426,30 @@ class TestReporter:
         """获取测试摘要统计"""
         total = len(self.test_results)
         if total == 0:
-            return {"total": 0, "passed": 0, "failed": 0, "pass_rate": 0.0}
+            return {"total": 0, "passed": 0, "failed": 0, "pass_rate": 0.0, "total_duration": 0.0, "avg_duration": 0.0,
+                    "flaky": 0, "consistent_failures": 0, "cached": 0}
         
         passed = sum(1 for result in self.test_results if result.status == "PASSED")
         failed = total - passed
         pass_rate = (passed / total) * 100
+        total_duration = sum(result.duration for result in self.test_results)
         
         return {
             "total": total,
             "passed": passed,
             "failed": failed,
-            "pass_rate": pass_rate
+            "pass_rate": pass_rate,
+            "total_duration": total_duration,
+            "avg_duration": total_duration / total,
+            "flaky": sum(1 for result in self.test_results if result.rerun_status == "FLAKY"),
+            "consistent_failures": sum(1 for result in self.test_results if result.rerun_status == "CONSISTENT"),
+            "cached": sum(1 for result in self.test_results if result.cached_from)
         }
     
     def clear_results(self):
         """清空测试结果"""
         self.test_results.clear()
+        self.run_started_at = datetime.now()
         logger.info("测试结果已清空")
 
 # 全局测试报告实例
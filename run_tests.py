@@ -3,6 +3,9 @@
 """
 import os
 import sys
+import json
+import argparse
+import tempfile
 import pytest
 from datetime import datetime
 
@@ -12,9 +15,16 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 from core.logger_config import logger
+from config import LOAD_VIRTUAL_USERS, LOAD_RAMP_UP, LOAD_ITERATIONS, REPORTS_DIR, IMPACT_BASE_REF
 
-def run_tests():
-    """运行测试套件"""
+def run_tests(dashboard=False, extra_args=None):
+    """
+    运行测试套件
+    
+    参数:
+        dashboard (bool): 控制台显示实时进度面板，代替逐条用例输出和INFO日志
+        extra_args (list): 附加的pytest参数，例如 ["--impact-base", "origin/main"]
+    """
     try:
         logger.info("=" * 80)
         logger.info("开始执行SauceDemo自动化测试 - 重构优化版本")
@@ -32,7 +42,7 @@ def run_tests():
         # 构建pytest参数
         pytest_args = [
             "tests/test_saucedemo.py",     # 测试文件路径
-            "-v",                          # 详细输出
+            "-q" if dashboard else "-v",   # 进度面板模式下不逐条输出用例
             "--tb=short",                  # 简短的错误信息
             f"--html={html_report}",       # HTML报告
             "--self-contained-html",       # 自包含的HTML
@@ -40,6 +50,9 @@ def run_tests():
             "--strict-markers",            # 严格标记模式
             "--disable-warnings",          # 禁用警告（可选）
         ]
+        if dashboard:
+            pytest_args.append("--dashboard")
+        pytest_args.extend(extra_args or [])
         
         logger.info(f"执行参数: {' '.join(pytest_args)}")
         logger.info("测试模式：优化版本 - 每个功能测试所有用户，减少浏览器开关次数")
@@ -207,6 +220,201 @@ def run_tests_by_marker(marker):
         logger.error(f"运行标记测试失败: {str(e)}")
         return False
 
+def run_load_test(scenario="complete_checkout_flow", virtual_users=LOAD_VIRTUAL_USERS,
+                  ramp_up=LOAD_RAMP_UP, iterations=LOAD_ITERATIONS, use_stub=False):
+    """
+    负载模式：并发回放业务场景
+    
+    参数:
+        scenario (str): 场景名称，默认 "complete_checkout_flow"
+        virtual_users (int): 虚拟用户数
+        ramp_up (float): 爬坡时间(秒)，虚拟用户在此时间内依次启动
+        iterations (int): 每个虚拟用户的场景迭代次数
+        use_stub (bool): 是否使用本地桩驱动作为替身目标
+    """
+    from core.browser_pool import BrowserPool
+    from core.load_generator import LoadGenerator, SCENARIOS
+    from core.webdriver_utils import WebDriverManager
+    
+    stub_server = None
+    browser_pool = None
+    try:
+        if scenario not in SCENARIOS:
+            logger.error(f"未知负载场景: {scenario}, 可选: {', '.join(SCENARIOS)}")
+            return False
+        
+        factory = None
+        if use_stub:
+            from core.stub_driver import StubDriverServer
+            stub_server = StubDriverServer().start()
+            factory = lambda: WebDriverManager.create_remote_driver(stub_server.url)
+            logger.info(f"使用本地桩驱动: {stub_server.url}")
+        
+        browser_pool = BrowserPool(virtual_users, factory=factory, name="load")
+        report = LoadGenerator(SCENARIOS[scenario], virtual_users, ramp_up, iterations, browser_pool).run()
+        report.log_summary()
+        
+        # 保存JSON结果
+        if not os.path.exists(REPORTS_DIR):
+            os.makedirs(REPORTS_DIR)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filepath = os.path.join(REPORTS_DIR, f"load_report_{timestamp}.json")
+        with open(filepath, "w", encoding="utf-8") as f:
+            json.dump(report.to_dict(), f, ensure_ascii=False, indent=2)
+        logger.info(f"📊 负载测试报告已生成: {filepath}")
+        
+        return report.failed_iterations == 0
+        
+    except Exception as e:
+        logger.error(f"负载测试失败: {str(e)}")
+        return False
+    finally:
+        if browser_pool:
+            browser_pool.close()
+        if stub_server:
+            stub_server.stop()
+
+def run_network_benchmark(browsers=3, use_stub=False, resource_latency=0.005):
+    """
+    网络整形基准：分别在关闭/开启网络整形时启动新浏览器整页加载页面，对比页面加载耗时
+    
+    参数:
+        browsers (int): 每种配置启动的浏览器数(开启时后启动的浏览器复用共享的静态资源缓存)
+        use_stub (bool): 是否使用本地桩驱动作为替身目标
+        resource_latency (float): 桩驱动中每个经网络下载的资源的模拟耗时(秒)
+    """
+    from core.load_generator import percentile
+    from core.network_shaping import NetworkShaper, measure_page_loads
+    from core.webdriver_utils import WebDriverManager
+    
+    stub_server = None
+    try:
+        if use_stub:
+            from core.stub_driver import StubDriverServer
+            stub_server = StubDriverServer(resource_latency=resource_latency).start()
+            logger.info(f"使用本地桩驱动: {stub_server.url}")
+        
+        results = {}
+        # 关闭时显式不整形(不受NETWORK_SHAPING影响)，开启时使用全新的缓存目录，避免沿用之前运行留下的缓存
+        with tempfile.TemporaryDirectory() as cache_dir:
+            for label, shaping in (("off", False), ("on", NetworkShaper(asset_cache_dir=cache_dir, stub_images=True))):
+                if stub_server:
+                    factory = lambda: WebDriverManager.create_remote_driver(stub_server.url, shaping=shaping)
+                else:
+                    factory = lambda: WebDriverManager.create_driver(shaping=shaping)
+                samples = sorted(measure_page_loads(factory, browsers))
+                results[label] = {
+                    "loads": len(samples),
+                    "avg_ms": sum(samples) / len(samples) * 1000,
+                    "p50_ms": percentile(samples, 50) * 1000,
+                    "p95_ms": percentile(samples, 95) * 1000,
+                }
+                logger.info(f"网络整形{'开启' if label == 'on' else '关闭'}: 加载 {results[label]['loads']} 次, "
+                            f"平均 {results[label]['avg_ms']:.1f}ms, p50 {results[label]['p50_ms']:.1f}ms, "
+                            f"p95 {results[label]['p95_ms']:.1f}ms")
+        results["ratio"] = results["on"]["avg_ms"] / results["off"]["avg_ms"] if results["off"]["avg_ms"] else 0.0
+        logger.info(f"📊 网络整形后平均页面加载耗时为原来的 {results['ratio']:.0%}")
+        
+        if not os.path.exists(REPORTS_DIR):
+            os.makedirs(REPORTS_DIR)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filepath = os.path.join(REPORTS_DIR, f"network_benchmark_{timestamp}.json")
+        with open(filepath, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        logger.info(f"📊 网络整形基准报告已生成: {filepath}")
+        return True
+        
+    except Exception as e:
+        logger.error(f"网络整形基准测试失败: {str(e)}")
+        return False
+    finally:
+        if stub_server:
+            stub_server.stop()
+
+def measure_object_churn(driver, iterations=200, flyweight=True):
+    """
+    页面对象/等待对象分配的微基准：重复执行用例收尾钩子中的典型操作
+    (两次构造商品页对象、跳转到商品页、查找一次购物车链接)，统计新建对象数和每次迭代耗时
+    
+    flyweight为False时每次迭代前丢弃缓存的对象，模拟每次都新建页面对象和等待对象。
+    driver需已登录；返回 {"iterations", "objects_created", "us_per_iteration"}。
+    """
+    import time
+    from core.webdriver_utils import Wait, release_flyweights
+    from pages.page_objects import BasePage, InventoryPage
+    
+    created_before = BasePage.flyweight_stats["created"] + Wait.stats["created"]
+    start = time.perf_counter()
+    for _ in range(iterations):
+        if not flyweight:
+            release_flyweights(driver)
+        page = InventoryPage(driver)
+        page.go_to("inventory.html")
+        InventoryPage(driver).element_ops.safe_find_element(driver, *InventoryPage.CART_LINK)
+    elapsed = time.perf_counter() - start
+    return {
+        "iterations": iterations,
+        "objects_created": BasePage.flyweight_stats["created"] + Wait.stats["created"] - created_before,
+        "us_per_iteration": elapsed / iterations * 1e6,
+    }
+
+def run_object_churn_benchmark(iterations=200):
+    """
+    对象分配微基准：在本地桩驱动上对比每次新建页面对象/等待对象与按driver复用(享元)的新建对象数和耗时
+    
+    参数:
+        iterations (int): 每种配置的迭代次数
+    """
+    from config import PASSWORD
+    from core.stub_driver import StubDriverServer
+    from core.webdriver_utils import WebDriverManager
+    from pages.page_objects import LoginPage
+    
+    try:
+        with StubDriverServer() as stub_server:
+            driver = WebDriverManager.create_remote_driver(stub_server.url)
+            try:
+                LoginPage(driver).login("standard_user", PASSWORD)
+                results = {}
+                for label, flyweight in (("fresh", False), ("flyweight", True)):
+                    results[label] = measure_object_churn(driver, iterations, flyweight=flyweight)
+                    logger.info(f"{'享元复用' if flyweight else '每次新建'}: {iterations} 次迭代, "
+                                f"新建对象 {results[label]['objects_created']} 个, "
+                                f"每次迭代 {results[label]['us_per_iteration']:.0f}µs")
+            finally:
+                WebDriverManager.close_driver(driver)
+        
+        if not os.path.exists(REPORTS_DIR):
+            os.makedirs(REPORTS_DIR)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filepath = os.path.join(REPORTS_DIR, f"object_churn_benchmark_{timestamp}.json")
+        with open(filepath, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        logger.info(f"📊 对象分配基准报告已生成: {filepath}")
+        return True
+        
+    except Exception as e:
+        logger.error(f"对象分配基准测试失败: {str(e)}")
+        return False
+
+def parse_load_args(argv):
+    """解析负载模式参数"""
+    parser = argparse.ArgumentParser(prog="python run_tests.py load")
+    parser.add_argument("--scenario", default="complete_checkout_flow", help="负载场景名称")
+    parser.add_argument("--users", type=int, default=LOAD_VIRTUAL_USERS, help="虚拟用户数")
+    parser.add_argument("--ramp-up", type=float, default=LOAD_RAMP_UP, help="爬坡时间(秒)")
+    parser.add_argument("--iterations", type=int, default=LOAD_ITERATIONS, help="每个虚拟用户的迭代次数")
+    parser.add_argument("--stub", action="store_true", help="使用本地桩驱动作为替身目标")
+    return parser.parse_args(argv)
+
+def parse_netbench_args(argv):
+    """解析网络整形基准参数"""
+    parser = argparse.ArgumentParser(prog="python run_tests.py netbench")
+    parser.add_argument("--browsers", type=int, default=3, help="每种配置启动的浏览器数")
+    parser.add_argument("--stub", action="store_true", help="使用本地桩驱动作为替身目标")
+    parser.add_argument("--resource-latency", type=float, default=0.005, help="桩驱动中每个资源的模拟下载耗时(秒)")
+    return parser.parse_args(argv)
+
 if __name__ == "__main__":
     try:
         # 检查命令行参数
@@ -217,16 +425,39 @@ if __name__ == "__main__":
                 print("\n可用命令:")
                 print("  python run_tests.py              - 运行所有测试")
                 print("  python run_tests.py help         - 显示帮助信息")
+                print("  python run_tests.py dashboard    - 运行所有测试，控制台显示实时进度面板（进度、吞吐、剩余时间）")
+                print("  python run_tests.py nightly      - 运行所有测试并记录每个用例用到的页面对象方法/定位器（用例影响记录）")
+                print("  python run_tests.py impact       - 只运行受 git diff 改动影响的用例（--base REF，默认 origin/main）")
                 print("  python run_tests.py quick        - 快速运行（最多失败3次后停止）")
                 print("  python run_tests.py login        - 只运行登录相关测试")
                 print("  python run_tests.py cart         - 只运行购物车相关测试")
                 print("  python run_tests.py checkout     - 只运行结账相关测试")
                 print("  python run_tests.py sort         - 只运行排序相关测试")
+                print("  python run_tests.py load         - 负载模式（--users N --ramp-up S --iterations K --stub）")
+                print("  python run_tests.py netbench     - 网络整形基准（--browsers N --stub）")
+                print("  python run_tests.py churnbench   - 页面对象/等待对象分配微基准（桩驱动，--iterations N）")
                 print("\n示例:")
                 print("  python run_tests.py quick")
                 print("  python run_tests.py login")
+                print("  python run_tests.py load --users 10 --ramp-up 5 --stub")
                 sys.exit(0)
             
+            elif command == "dashboard":
+                # 实时进度面板：详细日志只写入日志文件
+                success = run_tests(dashboard=True)
+            
+            elif command == "nightly":
+                # 全量运行并刷新用例影响记录
+                success = run_tests(extra_args=["--record-impact"])
+            
+            elif command == "impact":
+                # 合并前运行：只运行受 pages/、core/、config/、scenarios/、conftest.py 改动影响的用例
+                parser = argparse.ArgumentParser(prog="python run_tests.py impact")
+                parser.add_argument("--base", default=IMPACT_BASE_REF, help="git diff的比较基准")
+                parser.add_argument("--dashboard", action="store_true", help="显示实时进度面板")
+                args = parser.parse_args(sys.argv[2:])
+                success = run_tests(dashboard=args.dashboard, extra_args=["--impact-base", args.base])
+            
             elif command == "quick":
                 # 快速测试模式：最多3次失败后停止
                 success = run_tests_with_custom_options(
@@ -250,6 +481,33 @@ if __name__ == "__main__":
                 # 只运行排序相关测试
                 success = run_specific_test("sort")
             
+            elif command == "load":
+                # 负载模式：并发回放结账流程
+                args = parse_load_args(sys.argv[2:])
+                success = run_load_test(
+                    scenario=args.scenario,
+                    virtual_users=args.users,
+                    ramp_up=args.ramp_up,
+                    iterations=args.iterations,
+                    use_stub=args.stub
+                )
+            
+            elif command == "netbench":
+                # 网络整形基准：对比开启前后的页面加载耗时
+                args = parse_netbench_args(sys.argv[2:])
+                success = run_network_benchmark(
+                    browsers=args.browsers,
+                    use_stub=args.stub,
+                    resource_latency=args.resource_latency
+                )
+            
+            elif command == "churnbench":
+                # 对象分配微基准：对比每次新建与按driver复用页面对象/等待对象
+                parser = argparse.ArgumentParser(prog="python run_tests.py churnbench")
+                parser.add_argument("--iterations", type=int, default=200, help="每种配置的迭代次数")
+                args = parser.parse_args(sys.argv[2:])
+                success = run_object_churn_benchmark(iterations=args.iterations)
+            
             else:
                 print(f"未知命令: {command}")
                 print("使用 'python run_tests.py help' 查看可用命令")
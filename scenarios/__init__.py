@@ -0,0 +1 @@
+from .saucedemo import SAUCEDEMO_SCENARIOS
\ No newline at end of file
@@ -0,0 +1,135 @@
+"""
+SauceDemo测试场景 - 每个场景编译为一个按用户参数化的测试方法
+"""
+from core.scenario_engine import Scenario, Step, Given
+
+SAUCEDEMO_SCENARIOS = [
+    # 1. 登录功能测试
+    Scenario(
+        name="test_01_login_success",
+        description="测试用户登录成功",
+        expect={"url_contains": "inventory"},
+        cacheable=True,
+    ),
+    # 2. 添加单个商品到购物车
+    Scenario(
+        name="test_02_add_single_product_to_cart",
+        description="测试添加单个商品到购物车",
+        steps=[Step("add_product", 0)],
+        expect={"cart_count": 1},
+    ),
+    # 3. 添加多个商品到购物车
+    Scenario(
+        name="test_03_add_multiple_products_to_cart",
+        description="测试添加多个商品到购物车",
+        steps=[Step("add_product", 0), Step("add_product", 1), Step("add_product", 2)],
+        expect={"cart_count": 3},
+    ),
+    # 4. 添加所有商品到购物车
+    Scenario(
+        name="test_04_add_all_products_to_cart",
+        description="测试添加所有商品到购物车",
+        steps=[Step("add_all_products")],
+        expect={"cart_count": "all"},
+    ),
+    # 5-8. 商品排序测试
+    Scenario(
+        name="test_05_sort_products_price_low_to_high",
+        description="测试商品按价格从低到高排序",
+        steps=[Step("sort", "lohi")],
+        expect={"sorted": True},
+    ),
+    Scenario(
+        name="test_06_sort_products_price_high_to_low",
+        description="测试商品按价格从高到低排序",
+        steps=[Step("sort", "hilo")],
+        expect={"sorted": True},
+    ),
+    Scenario(
+        name="test_07_sort_products_name_a_to_z",
+        description="测试商品按名称A-Z排序",
+        steps=[Step("sort", "az")],
+        expect={"sorted": True},
+    ),
+    Scenario(
+        name="test_08_sort_products_name_z_to_a",
+        description="测试商品按名称Z-A排序",
+        steps=[Step("sort", "za")],
+        expect={"sorted": True},
+    ),
+    # 9. 查看购物车
+    Scenario(
+        name="test_09_view_cart",
+        description="测试查看购物车",
+        given=Given(cart=[0]),
+        steps=[Step("go_to_cart")],
+        expect={"url_contains": "cart", "cart_items": 1},
+        end_page="cart",
+    ),
+    # 10. 从购物车移除商品
+    Scenario(
+        name="test_10_remove_product_from_cart",
+        description="测试从购物车移除商品",
+        given=Given(cart=[0], page="cart.html"),
+        steps=[Step("remove_from_cart", 0)],
+        expect={"cart_items": 0},
+        end_page="cart",
+    ),
+    # 11. 继续购物功能
+    Scenario(
+        name="test_11_continue_shopping",
+        description="测试继续购物功能",
+        given=Given(cart=[0], page="cart.html"),
+        steps=[Step("continue_shopping")],
+        expect={"url_contains": "inventory"},
+    ),
+    # 12. 查看商品详情
+    Scenario(
+        name="test_12_view_product_details",
+        description="测试查看商品详情",
+        steps=[Step("open_product", 0)],
+        expect={"url_contains": "inventory-item"},
+        end_page="inventory-item",
+    ),
+    # 13. 从商品详情页返回
+    Scenario(
+        name="test_13_back_to_products_from_details",
+        description="测试从商品详情页返回商品列表",
+        steps=[Step("open_product", 0), Step("back_to_products")],
+        expect={"url_contains": "inventory.html"},
+    ),
+    # 14. 完整结账流程
+    Scenario(
+        name="test_14_complete_checkout_flow",
+        description="测试完整结账流程",
+        given=Given(cart=[0], page="checkout-step-one.html"),
+        steps=[Step("fill_checkout_info"), Step("continue_checkout"), Step("finish_checkout")],
+        expect={"url_contains": "checkout-complete"},
+        end_page="checkout-complete",
+    ),
+    # 15. 取消结账流程
+    Scenario(
+        name="test_15_cancel_checkout_flow",
+        description="测试取消结账流程",
+        given=Given(cart=[0], page="checkout-step-one.html"),
+        steps=[Step("cancel_checkout")],
+        expect={"url_contains": "cart"},
+        end_page="cart",
+    ),
+    # 16. 验证商品信息准确性
+    Scenario(
+        name="test_16_product_information_accuracy",
+        description="测试商品信息的准确性",
+        expect={"product_info": 0},
+        cacheable=True,
+    ),
+    # 17. 登出功能测试 (登出后重新登录以便后续测试，重新登录使用真实键盘输入)
+    Scenario(
+        name="test_17_logout_success",
+        description="测试用户登出成功",
+        steps=[
+            Step("logout", expect={"url_contains": "saucedemo.com", "url_not_contains": "inventory"}),
+            Step("login", True),
+        ],
+    ),
+]
@@ -0,0 +1,52 @@
+"""
+单元测试共用的fixture - 本地桩驱动服务器和其上的浏览器
+"""
+from dataclasses import dataclass
+
+import pytest
+
+from config import PASSWORD
+from core.dirty_state import dirty_state
+from core.webdriver_utils import WebDriverManager
+from pages.page_objects import LoginPage
+from core.stub_driver import StubDriverServer
+
+
+@dataclass
+class StubBrowser:
+    """桩驱动服务器上的一个浏览器"""
+    server: StubDriverServer
+    driver: object
+
+    @property
+    def session(self):
+        """桩驱动中该浏览器的会话(页面、存储、输入框等状态)"""
+        return self.server.sessions[self.driver.session_id]
+
+
+@pytest.fixture
+def stub_server():
+    """桩驱动服务器"""
+    with StubDriverServer() as server:
+        yield server
+
+
+@pytest.fixture
+def stub_browser(stub_server):
+    """桩驱动上一个未登录的浏览器"""
+    driver = WebDriverManager.create_remote_driver(stub_server.url)
+    try:
+        yield StubBrowser(stub_server, driver)
+    finally:
+        stub_server.latency = 0.0
+        dirty_state.clear(driver)
+        WebDriverManager.close_driver(driver)
+
+
+@pytest.fixture
+def logged_in_stub(stub_browser):
+    """桩驱动上一个已登录standard_user的浏览器"""
+    login_page = LoginPage(stub_browser.driver)
+    login_page.login("standard_user", PASSWORD)
+    assert login_page.is_login_success()
+    return stub_browser
@@ -0,0 +1,86 @@
+"""
+失败附件采集测试 - 后台写盘、截图去重和总大小上限
+"""
+import sys
+import os
+import json
+import threading
+from types import SimpleNamespace
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from config import PASSWORD
+from core.transport import _redact
+from core.webdriver_utils import WebDriverManager, ElementOperations
+from pages.page_objects import LoginPage, InventoryPage
+from reports.artifacts import ArtifactCollector
+
+
+class TestArtifacts:
+    """失败附件采集测试类"""
+
+    def test_capture_writes_artifacts_and_dedups_screenshots(self, logged_in_stub, tmp_path):
+        """测试附件在后台写入，相同截图只保存一份"""
+        collector = ArtifactCollector(base_dir=str(tmp_path))
+        first = collector.capture(logged_in_stub.driver, "test_02[0]_standard_user", "AssertionError: 购物车数量不正确")
+        second = collector.capture(logged_in_stub.driver, "test_02[0]_standard_user", "AssertionError: 购物车数量不正确")
+        collector.close()
+
+        assert first.directory != second.directory
+        assert set(first.files) == {"screenshot", "page_source", "details"}
+        assert second.screenshot == first.screenshot
+        assert collector.stats["deduplicated"] == 1
+
+        with open(first.files["details"], encoding="utf-8") as f:
+            details = json.load(f)
+        assert "inventory" in details["url"]
+        assert details["cookies"][0]["name"] == "session-username"
+        assert details["commands"] and details["commands"][-1]["command"]
+
+    def test_size_cap_skips_large_files(self, logged_in_stub, tmp_path):
+        """测试超出总大小上限时跳过大文件"""
+        collector = ArtifactCollector(base_dir=str(tmp_path), max_bytes=64)
+        record = collector.capture(logged_in_stub.driver, "test_capped")
+        assert record.wait(timeout=10)
+        collector.close()
+
+        assert "page_source" not in record.files
+        assert "details" not in record.files
+        assert collector.stats["skipped_over_cap"] >= 1
+        assert collector.stats["bytes_written"] <= 64
+
+    def test_capture_and_html_extras_do_not_wait_for_writes(self, logged_in_stub, tmp_path, monkeypatch):
+        """测试失败用例采集附件、生成HTML报告附件后立即返回，写盘在后台完成"""
+        collector = ArtifactCollector(base_dir=str(tmp_path))
+        release = threading.Event()
+        write = collector._write
+        monkeypatch.setattr(collector, "_write", lambda *job: (release.wait(10), write(*job)))
+        extras = SimpleNamespace(url=lambda content, name: ("url", content, name),
+                                 png=lambda content, name: ("png", content, name))
+        try:
+            record = collector.capture(logged_in_stub.driver, "test_slow_disk", "AssertionError")
+            html = record.html_extras(extras)
+            assert not record.wait(0) and not record.files
+            assert html[0] == ("url", os.path.abspath(record.directory), "失败附件")
+            assert html[1][0] == "png" and html[1][1] == record.screenshot_base64
+        finally:
+            release.set()
+            collector.close()
+        assert set(record.files) == {"screenshot", "page_source", "details"}
+
+    def test_recorded_commands_hide_input_values(self, stub_browser):
+        """测试最近的驱动命令不记录输入框内容和表单脚本参数，密码不会写入附件"""
+        driver = stub_browser.driver
+        for keystrokes, command in ((True, "sendKeysToElement"), (False, "w3cExecuteScript")):
+            LoginPage(driver).login("standard_user", PASSWORD, keystrokes=keystrokes)
+            commands = WebDriverManager.get_recent_commands(driver)
+            assert PASSWORD not in json.dumps(commands, ensure_ascii=False)
+            assert any(entry["command"] == command for entry in commands)
+            InventoryPage(driver).logout()
+
+        params = _redact("w3cExecuteScript", {"script": ElementOperations._FILL_FORM_JS, "args": [PASSWORD]})
+        assert params["args"] == "***"
+        assert _redact("sendKeysToElement", {"text": PASSWORD, "value": list(PASSWORD)}) == {"text": "***", "value": "***"}
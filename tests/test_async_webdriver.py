@@ -0,0 +1,66 @@
+"""
+异步WebDriver客户端测试 - 基于本地桩驱动，无需真实浏览器
+"""
+import asyncio
+import sys
+import os
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.by import By
+
+from config import USERNAMES, PASSWORD
+from core.async_webdriver import AsyncWebDriverManager
+from core.stub_driver import StubDriverServer
+from pages.async_page_objects import AsyncLoginPage
+
+
+@pytest.fixture(scope="module")
+def stub_server():
+    """模块级桩驱动服务器"""
+    with StubDriverServer() as server:
+        yield server
+
+
+class TestAsyncWebDriver:
+    """异步WebDriver客户端测试类"""
+
+    def test_concurrent_logins_share_one_event_loop(self, stub_server):
+        """测试单个事件循环并发驱动多个浏览器会话登录"""
+        session_count = 24
+
+        async def login_one(manager, index):
+            driver = await manager.create_driver()
+            login_page = await AsyncLoginPage(driver).open()
+            await login_page.login(USERNAMES[index % len(USERNAMES)], PASSWORD)
+            return await login_page.is_login_success()
+
+        async def scenario():
+            async with AsyncWebDriverManager(stub_server.url, max_connections_per_host=8) as manager:
+                results = await asyncio.gather(*(login_one(manager, i) for i in range(session_count)))
+                return results, dict(manager.pool.stats)
+
+        results, stats = asyncio.run(scenario())
+        assert all(results), f"部分会话登录失败: {results}"
+        assert stats["connections_opened"] <= 8, f"连接数超过连接池上限: {stats}"
+        assert stats["connections_reused"] > stats["connections_opened"], f"连接未被复用: {stats}"
+
+    def test_w3c_errors_map_to_selenium_exceptions(self, stub_server):
+        """测试W3C错误码映射为Selenium异常"""
+        async def scenario():
+            async with AsyncWebDriverManager(stub_server.url) as manager:
+                driver = await manager.create_driver()
+                with pytest.raises(NoSuchElementException):
+                    await driver.find_element(By.ID, "does-not-exist")
+
+                login_page = await AsyncLoginPage(driver).open()
+                await login_page.login("locked_out_user", PASSWORD)
+                return await login_page.get_error_message()
+
+        assert "locked out" in asyncio.run(scenario())
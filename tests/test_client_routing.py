@@ -0,0 +1,53 @@
+"""
+应用内路由测试 - 通过history.pushState + popstate切换页面，SPA未加载时退回整页加载
+"""
+import sys
+import os
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core.dirty_state import CART, SORT, CHECKOUT
+from core.stub_driver import SCRIPT_HANDLERS
+from pages.page_objects import InventoryPage
+
+
+class TestClientRouting:
+    """应用内路由测试类"""
+
+    def test_route_switches_pages_without_reload(self, logged_in_stub):
+        """测试应用内路由切换页面不触发整页加载"""
+        driver, session = logged_in_stub.driver, logged_in_stub.session
+        page = InventoryPage(driver)
+        loads = session.page_loads
+        for route in ("cart.html", "inventory-item.html?id=4", "inventory.html"):
+            page.route_to(route)
+            assert driver.current_url.endswith(route)
+        assert session.page_loads == loads
+
+    def test_falls_back_to_full_load_when_spa_not_loaded(self, logged_in_stub, monkeypatch):
+        """测试SPA未加载时退回driver.get"""
+        driver, session = logged_in_stub.driver, logged_in_stub.session
+        monkeypatch.setitem(SCRIPT_HANDLERS, "routeTo", lambda session, *args: False)
+        loads = session.page_loads
+        InventoryPage(driver).route_to("cart.html")
+        assert driver.current_url.endswith("cart.html")
+        assert session.page_loads == loads + 1
+
+    def test_reset_reloads_only_for_sort_on_inventory(self, logged_in_stub):
+        """测试重置状态时只有商品页上的排序需要整页加载，其余情况应用内路由"""
+        driver, session = logged_in_stub.driver, logged_in_stub.session
+        page = InventoryPage(driver)
+        page.sort_products("za")
+        loads = session.page_loads
+        page.reset_app_state({SORT})
+        assert session.page_loads == loads + 1
+        assert page.get_product_order()["sort"] == "az"
+
+        page.add_product_by_index(0)
+        page.go_to_cart()
+        page.reset_app_state({CART, CHECKOUT})
+        assert session.page_loads == loads + 1
+        assert "inventory.html" in driver.current_url and page.get_cart_count() == 0
@@ -0,0 +1,65 @@
+"""
+时间预算测试 - 预算用完时中止正在进行的WebDriver调用，并报告超时所在的步骤
+"""
+import sys
+import os
+import time
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core.deadlines import time_budget, remaining
+from core.exceptions import DeadlineException
+from core.scenario_engine import ScenarioRunner, Scenario, Step
+
+
+class TestDeadlines:
+    """时间预算测试类"""
+
+    def test_in_flight_call_is_aborted(self, logged_in_stub):
+        """测试卡住的WebDriver调用在预算用完时被中止，浏览器随后仍可使用"""
+        server, driver = logged_in_stub.server, logged_in_stub.driver
+        server.latency = 1.0
+        start = time.perf_counter()
+        with pytest.raises(DeadlineException) as excinfo:
+            with time_budget(0.3, "步骤 读取URL"):
+                driver.current_url
+        assert time.perf_counter() - start < 0.9
+        assert excinfo.value.step == "步骤 读取URL"
+
+        server.latency = 0.0
+        assert "inventory" in driver.current_url
+
+    def test_expired_budget_stops_before_next_command(self, logged_in_stub):
+        """测试预算已用完时不再发送新的命令"""
+        server, driver = logged_in_stub.server, logged_in_stub.driver
+        outer = remaining()
+        server.reset_stats()
+        with pytest.raises(DeadlineException, match="超出时间预算"):
+            with time_budget(0.05, "步骤 等待"):
+                time.sleep(0.1)
+                driver.title
+        assert server.stats["requests"] == 0
+        assert remaining() is None if outer is None else remaining() > 0.05
+
+    def test_scenario_step_overrun_names_the_step(self, logged_in_stub):
+        """测试场景步骤超时时报告超时的步骤，并穿透页面对象的异常包装"""
+        server, driver = logged_in_stub.server, logged_in_stub.driver
+        server.latency = 0.3
+        scenario = Scenario("test_slow_add", "慢速加购", steps=[Step("add_product", 0, budget=0.2)])
+        with pytest.raises(DeadlineException) as excinfo:
+            ScenarioRunner(driver, "standard_user").run(scenario)
+        assert excinfo.value.step == "步骤 add_product"
+
+    def test_outer_budget_reports_inner_step(self, logged_in_stub):
+        """测试外层(用例)预算用完时，报告中包含当时正在执行的步骤"""
+        server, driver = logged_in_stub.server, logged_in_stub.driver
+        server.latency = 0.3
+        with pytest.raises(DeadlineException, match="用例 test_x 超出时间预算.*超时发生在 步骤 读取标题"):
+            with time_budget(0.2, "用例 test_x"):
+                with time_budget(10, "步骤 读取标题"):
+                    driver.title
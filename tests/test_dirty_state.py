@@ -0,0 +1,50 @@
+"""
+应用状态脏标记测试 - 只重置被改动的状态，审计模式发现残留
+"""
+import sys
+import os
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core.dirty_state import dirty_state, CART, SORT, CHECKOUT
+from pages.page_objects import InventoryPage
+
+
+class TestDirtyState:
+    """应用状态脏标记测试类"""
+
+    def test_read_only_actions_skip_reset(self, logged_in_stub):
+        """测试只读操作不产生脏标记，重置直接跳过且不发送任何命令"""
+        server, driver = logged_in_stub.server, logged_in_stub.driver
+        inventory_page = InventoryPage(driver)
+        inventory_page.get_product_details(0)
+        assert dirty_state.peek(driver) == frozenset()
+
+        server.reset_stats()
+        inventory_page.reset_app_state(dirty_state.pop(driver))
+        assert server.stats["requests"] == 0
+
+    def test_only_changed_state_is_reset(self, logged_in_stub):
+        """测试页面对象登记改动，重置后状态恢复干净"""
+        server, driver = logged_in_stub.server, logged_in_stub.driver
+        inventory_page = InventoryPage(driver)
+        inventory_page.add_product_by_index(0)
+        inventory_page.sort_products("hilo")
+        assert dirty_state.peek(driver) == {CART, SORT}
+
+        inventory_page.reset_app_state(dirty_state.pop(driver))
+        assert inventory_page.audit_app_state() == set()
+        assert inventory_page.get_cart_count() == 0
+
+    def test_audit_detects_unrecorded_changes(self, logged_in_stub):
+        """测试审计模式能发现绕过页面对象的改动"""
+        server, driver = logged_in_stub.server, logged_in_stub.driver
+        inventory_page = InventoryPage(driver)
+        inventory_page.add_product_by_index(0)
+        dirty_state.clear(driver)  # 模拟漏登记
+        driver.get(server.base_url + "checkout-step-one.html")
+
+        assert inventory_page.audit_app_state() == {CART, CHECKOUT}
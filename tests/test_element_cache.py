@@ -0,0 +1,59 @@
+"""
+元素句柄缓存测试 - 同一页面内复用位置固定的元素，页面跳转或元素失效后重新查找
+"""
+import sys
+import os
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core.dirty_state import CART
+from core.element_cache import element_cache
+from pages.page_objects import InventoryPage
+
+
+def lookups(server):
+    return server.stats["commands"].get("find_element", 0)
+
+
+class TestElementCache:
+    """元素句柄缓存测试类"""
+
+    def test_repeated_lookups_on_same_page_are_free(self, logged_in_stub):
+        """测试同一页面内重复重置购物车时菜单元素不再查找"""
+        server, driver = logged_in_stub.server, logged_in_stub.driver
+        page = InventoryPage(driver)
+        page.add_product_by_index(0)
+        page.reset_app_state({CART})
+        server.reset_stats()
+        hits = element_cache.stats["hits"]
+
+        page.add_product_by_index(0)
+        page.reset_app_state({CART})
+        assert lookups(server) == 0
+        assert element_cache.stats["hits"] - hits == 3
+        assert page.get_cart_count() == 0
+
+    def test_navigation_clears_cache(self, logged_in_stub):
+        """测试页面跳转后旧页面的元素不再复用"""
+        server, driver = logged_in_stub.server, logged_in_stub.driver
+        page = InventoryPage(driver)
+        page.go_to_cart()
+        page.go_to("inventory.html")
+        server.reset_stats()
+        page.go_to_cart()
+        assert lookups(server) == 1
+        assert driver.current_url.endswith("cart.html")
+
+    def test_stale_element_is_found_again(self, logged_in_stub):
+        """测试缓存的元素失效时移除缓存，重新查找后点击成功"""
+        server, driver = logged_in_stub.server, logged_in_stub.driver
+        page = InventoryPage(driver)
+        page.element_ops.safe_find_element(driver, *page.CART_LINK, cached=True)
+        driver.refresh()  # 页面对象之外的重新加载，缓存的元素随之失效
+        stale = element_cache.stats["stale"]
+        page.go_to_cart()
+        assert element_cache.stats["stale"] - stale == 1
+        assert driver.current_url.endswith("cart.html")
@@ -0,0 +1,82 @@
+"""
+享元测试 - 页面对象和等待对象按driver复用，元素操作全局共用一个实例
+"""
+import sys
+import os
+import threading
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from config import PASSWORD
+from core.webdriver_utils import WebDriverManager, Wait
+from run_tests import measure_object_churn
+from pages.page_objects import BasePage, LoginPage, InventoryPage, CartPage
+
+
+class TestFlyweights:
+    """享元测试类"""
+
+    def test_page_objects_are_shared_per_driver(self, logged_in_stub):
+        """测试同一driver上的同类页面对象只创建一次，不同driver或不同页面类各自独立"""
+        first = logged_in_stub.driver
+        second = WebDriverManager.create_remote_driver(logged_in_stub.server.url)
+        try:
+            page = InventoryPage(first)
+            assert InventoryPage(first) is page
+            assert InventoryPage(second) is not page
+            assert CartPage(first) is not page
+            assert page.element_ops is CartPage(second).element_ops
+        finally:
+            WebDriverManager.close_driver(second)
+
+    def test_login_page_still_navigates_on_construction(self, logged_in_stub):
+        """测试复用的登录页对象在每次构造时仍会回到登录页"""
+        driver = logged_in_stub.driver
+        login_page = LoginPage(driver)
+        login_page.login("standard_user", PASSWORD)
+        assert LoginPage(driver) is login_page
+        assert driver.current_url.endswith("/")
+
+    def test_wait_objects_are_reused_and_slotted(self, logged_in_stub):
+        """测试等待对象按driver和超时复用，且没有实例字典"""
+        driver = logged_in_stub.driver
+        wait = Wait.of(driver, 3)
+        assert Wait.of(driver, 3) is wait
+        assert Wait.of(driver, 5) is not wait
+        assert not hasattr(wait, "__dict__")
+
+    def test_churn_benchmark_shows_allocation_savings(self, logged_in_stub):
+        """测试微基准：复用时不再新建对象，每次新建时每次迭代新建页面对象和等待对象"""
+        driver = logged_in_stub.driver
+        fresh = measure_object_churn(driver, iterations=20, flyweight=False)
+        shared = measure_object_churn(driver, iterations=20, flyweight=True)
+        assert fresh["objects_created"] == 40
+        assert shared["objects_created"] == 0
+
+    def test_counters_are_exact_across_threads(self, logged_in_stub):
+        """测试多个线程(如失败重跑)同时构造页面对象和等待对象时计数不丢失"""
+        driver = logged_in_stub.driver
+        InventoryPage(driver)
+        Wait.of(driver, 3)
+        pages_before, waits_before = BasePage.flyweight_stats["reused"], Wait.stats["reused"]
+
+        def construct():
+            for _ in range(2000):
+                InventoryPage(driver)
+                Wait.of(driver, 3)
+
+        threads = [threading.Thread(target=construct) for _ in range(4)]
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)  # 频繁切换线程，让未加锁的计数更容易丢失
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            sys.setswitchinterval(interval)
+        assert BasePage.flyweight_stats["reused"] - pages_before == 8000
+        assert Wait.stats["reused"] - waits_before == 8000
@@ -0,0 +1,70 @@
+"""
+表单填写测试 - 一次脚本调用填写React受控输入框并逐字段读回校验，真实键盘输入作为可选模式
+"""
+import sys
+import os
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from config import PASSWORD
+from core.exceptions import ElementException, LoginException
+from core.stub_driver import SCRIPT_HANDLERS
+from pages.page_objects import LoginPage, InventoryPage, CheckoutPage
+
+
+def login_requests(server, driver, keystrokes):
+    login_page = LoginPage(driver)
+    server.reset_stats()
+    login_page.login("standard_user", PASSWORD, keystrokes=keystrokes)
+    requests = server.stats["requests"]
+    assert login_page.is_login_success()
+    InventoryPage(driver).logout()
+    return requests
+
+
+class TestFormFill:
+    """表单填写测试类"""
+
+    def test_scripted_login_needs_fewer_round_trips(self, stub_browser):
+        """测试脚本填写登录表单只需一次请求，键盘输入模式同样可以登录"""
+        server, driver = stub_browser.server, stub_browser.driver
+        scripted = login_requests(server, driver, keystrokes=False)
+        typed = login_requests(server, driver, keystrokes=True)
+        assert scripted == 1
+        assert typed > scripted
+
+    def test_checkout_fields_are_read_back(self, stub_browser):
+        """测试结账信息填写后读回的值被React状态接受，可以继续结账"""
+        driver = stub_browser.driver
+        LoginPage(driver).login("standard_user", PASSWORD)
+        checkout_page = CheckoutPage(driver)
+        checkout_page.go_to("checkout-step-one.html")
+        checkout_page.fill_checkout_info("John", "Doe", "12345")
+        values = [checkout_page.element_ops.safe_find_element(driver, *locator).get_attribute("value")
+                  for locator in (checkout_page.FIRST_NAME_INPUT, checkout_page.LAST_NAME_INPUT,
+                                  checkout_page.POSTAL_CODE_INPUT)]
+        assert values == ["John", "Doe", "12345"]
+        checkout_page.continue_checkout()
+        assert driver.current_url.endswith("checkout-step-two.html")
+
+    def test_mismatched_readback_does_not_submit(self, stub_browser, monkeypatch):
+        """测试读回的值与期望不一致时报错且不提交"""
+        driver = stub_browser.driver
+        login_page = LoginPage(driver)
+        monkeypatch.setitem(SCRIPT_HANDLERS, "fillForm", lambda session, fields, submit, *args: {
+            "values": {field["selector"]: "" for field in fields}, "missing": [], "submitted": False})
+        with pytest.raises(LoginException, match="读回不一致"):
+            login_page.login("standard_user", PASSWORD)
+        assert not login_page.is_login_success()
+
+    def test_missing_field_is_reported(self, stub_browser):
+        """测试表单中找不到的字段被报告"""
+        driver = stub_browser.driver
+        LoginPage(driver).login("standard_user", PASSWORD)
+        with pytest.raises(ElementException, match="找不到元素"):
+            InventoryPage(driver).element_ops.fill_form(driver, [(LoginPage.USERNAME_INPUT, "x")])
@@ -0,0 +1,178 @@
+"""
+用例影响分析测试 - 记录用例用到的页面对象方法和定位器，改动行映射到符号，按改动选择用例
+"""
+import sys
+import os
+import subprocess
+import textwrap
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from config import PASSWORD
+from core.impact import ImpactRecorder, ImpactMap, ChangeSet, SourceIndex, diff_changes, select_cases
+from core.stub_driver import StubDriverServer
+from core.webdriver_utils import WebDriverManager
+from pages.page_objects import LoginPage, InventoryPage, CartPage
+
+PAGE_SOURCE = textwrap.dedent('''\
+    from selenium.webdriver.common.by import By
+    from config import WAIT
+
+
+    def transition(target):
+        def decorator(func):
+            def wrapper(self):
+                return func(self)
+            return wrapper
+        return decorator
+
+
+    class CartPage:
+        CHECKOUT_BUTTON = (By.ID, "checkout")
+
+        def checkout(self):
+            return self.CHECKOUT_BUTTON
+
+        def remove(self):
+            return WAIT
+''')
+
+CONFIG_SOURCE = "WAIT = 1\nOTHER = 2\n"
+
+
+def git(root, *args):
+    subprocess.run(["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+                   cwd=root, check=True, capture_output=True)
+
+
+class TestImpact:
+    """用例影响分析测试类"""
+
+    def test_changed_lines_map_to_innermost_symbol(self):
+        """测试改动行映射到最内层的函数、定位器常量或整个文件，改动的常量扩展到引用它的函数"""
+        index = SourceIndex()
+        index.add_source("pages/p.py", PAGE_SOURCE)
+        lines = PAGE_SOURCE.splitlines()
+        line_of = lambda text: next(number for number, line in enumerate(lines, 1) if text in line)
+
+        assert index.symbol_at("pages/p.py", line_of("return func(self)")) == \
+            "pages/p.py::transition.<locals>.decorator.<locals>.wrapper"
+        assert index.symbol_at("pages/p.py", line_of("CHECKOUT_BUTTON = ")) == "pages/p.py::CartPage.CHECKOUT_BUTTON"
+        assert index.symbol_at("pages/p.py", line_of("import By")) == "pages/p.py::"
+        assert index.locators[("id", "checkout")] == ["pages/p.py::CartPage.CHECKOUT_BUTTON"]
+        assert "pages/p.py::CartPage.checkout" in index.expand({"pages/p.py::CartPage.CHECKOUT_BUTTON"})
+
+    def test_recorder_records_page_methods_and_locators(self):
+        """测试记录call阶段用到的页面对象方法和定位器常量，setup阶段记为共享"""
+        recorder = ImpactRecorder()
+        with StubDriverServer() as server:
+            driver = WebDriverManager.create_remote_driver(server.url)
+            try:
+                recorder.start()
+                try:
+                    recorder.phase("case", "setup")
+                    LoginPage(driver).login("standard_user", PASSWORD)
+                    recorder.phase("case", "call")
+                    InventoryPage(driver).go_to_cart()
+                    CartPage(driver).get_cart_items()
+                finally:
+                    recorder.stop()
+            finally:
+                WebDriverManager.close_driver(driver)
+
+        symbols = recorder.cases["case"]
+        assert "pages/page_objects.py::InventoryPage.go_to_cart" in symbols
+        assert "pages/page_objects.py::CartPage.CART_ITEMS" in symbols
+        assert "pages/page_objects.py::LoginPage.login" in recorder.shared
+        assert "pages/page_objects.py::LoginPage.login" not in symbols
+        assert not any(symbol.startswith("core/impact.py") for symbol in symbols)
+
+    def test_select_only_affected_cases(self):
+        """测试只选择用到改动符号的用例和新用例；改动共享代码或无法归属时选择全部"""
+        impact_map = ImpactMap(cases={
+            "checkout": {"pages/page_objects.py::CheckoutPage.finish_checkout",
+                         "pages/page_objects.py::CheckoutPage.FINISH_BUTTON"},
+            "sort": {"pages/page_objects.py::InventoryPage.sort_products"},
+        }, shared={"pages/page_objects.py::LoginPage.login"})
+        nodeids = ["checkout", "sort", "new"]
+
+        selected, _ = select_cases(nodeids, impact_map, ChangeSet({"pages/page_objects.py::CheckoutPage"}))
+        assert selected == ["checkout", "new"]
+        selected, _ = select_cases(nodeids, impact_map, ChangeSet({"pages/page_objects.py::LoginPage.login"}))
+        assert selected == nodeids
+        selected, _ = select_cases(nodeids, impact_map, ChangeSet(unattributed=["run_tests.py"]))
+        assert selected == nodeids
+        selected, _ = select_cases(nodeids, impact_map, ChangeSet())
+        assert selected == ["new"]
+
+    def test_git_diff_to_changed_symbols(self, tmp_path):
+        """测试git diff中的删除行、新增行和配置项改动映射到符号"""
+        root = str(tmp_path)
+        os.makedirs(os.path.join(root, "pages"))
+        os.makedirs(os.path.join(root, "config"))
+        page_path = os.path.join(root, "pages", "p.py")
+        config_path = os.path.join(root, "config", "config.py")
+        with open(page_path, "w", encoding="utf-8") as f:
+            f.write(PAGE_SOURCE)
+        with open(config_path, "w", encoding="utf-8") as f:
+            f.write(CONFIG_SOURCE)
+        git(root, "init", "-q")
+        git(root, "add", ".")
+        git(root, "commit", "-q", "-m", "base")
+
+        with open(page_path, "w", encoding="utf-8") as f:
+            f.write(PAGE_SOURCE.replace('"checkout")', '"checkout-button")'))
+        with open(config_path, "w", encoding="utf-8") as f:
+            f.write(CONFIG_SOURCE.replace("WAIT = 1", "WAIT = 3"))
+        changes = diff_changes("HEAD", root=root)
+
+        assert changes.files == ["config/config.py", "pages/p.py"]
+        assert not changes.unattributed
+        assert {"pages/p.py::CartPage.CHECKOUT_BUTTON", "pages/p.py::CartPage.checkout",
+                "config/config.py::WAIT", "pages/p.py::CartPage.remove"} <= changes.symbols
+        assert "config/config.py::OTHER" not in changes.symbols
+
+        with open(os.path.join(root, "run_tests.py"), "w", encoding="utf-8") as f:
+            f.write("\n")
+        git(root, "add", "run_tests.py")
+        assert diff_changes("HEAD", root=root).unattributed == ["run_tests.py"]
+
+    def test_config_read_only_by_conftest_runs_all_cases(self, tmp_path):
+        """测试只在conftest钩子中读取的配置项和场景定义改动时运行全部用例，用例用到的配置项改动时只选受影响的用例"""
+        root = str(tmp_path)
+        os.makedirs(os.path.join(root, "pages"))
+        os.makedirs(os.path.join(root, "config"))
+        os.makedirs(os.path.join(root, "scenarios"))
+        files = {
+            "pages/p.py": PAGE_SOURCE,
+            "config/config.py": CONFIG_SOURCE + "BUDGET = 60\n",
+            "conftest.py": "from config import BUDGET\n\n\ndef pytest_runtest_call(item):\n    return BUDGET\n",
+            "scenarios/s.py": "SCENARIOS = ['checkout']\n",
+        }
+        for relative, source in files.items():
+            with open(os.path.join(root, relative), "w", encoding="utf-8") as f:
+                f.write(source)
+        git(root, "init", "-q")
+        git(root, "add", ".")
+        git(root, "commit", "-q", "-m", "base")
+        impact_map = ImpactMap(cases={"checkout": {"pages/p.py::CartPage.checkout"},
+                                      "remove": {"pages/p.py::CartPage.remove"}})
+
+        def select_after(relative, old, new):
+            with open(os.path.join(root, relative), "w", encoding="utf-8") as f:
+                f.write(files[relative].replace(old, new))
+            try:
+                return select_cases(["checkout", "remove"], impact_map, diff_changes("HEAD", root=root))
+            finally:
+                git(root, "checkout", "-q", "--", relative)
+
+        selected, reason = select_after("config/config.py", "BUDGET = 60", "BUDGET = 90")
+        assert selected == ["checkout", "remove"]
+        assert "config/config.py::BUDGET" in reason
+        selected, _ = select_after("scenarios/s.py", "'checkout'", "'checkout', 'remove'")
+        assert selected == ["checkout", "remove"]
+        selected, _ = select_after("config/config.py", "WAIT = 1", "WAIT = 3")
+        assert selected == ["remove"]
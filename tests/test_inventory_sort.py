@@ -0,0 +1,45 @@
+"""
+商品排序校验测试 - 基于本地桩驱动，一次脚本调用读取排序结果
+"""
+import sys
+import os
+import time
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from config import SORT_OPTIONS
+from core.exceptions import ProductException
+from pages.page_objects import InventoryPage
+
+
+@pytest.fixture
+def inventory_page(logged_in_stub):
+    """已登录并停留在商品页的桩驱动浏览器"""
+    return InventoryPage(logged_in_stub.driver)
+
+
+class TestInventorySort:
+    """商品排序校验测试类"""
+
+    @pytest.mark.parametrize("sort_value", SORT_OPTIONS)
+    def test_sort_and_verify_every_option(self, inventory_page, sort_value):
+        """测试所有排序选项都能在一次读取中校验顺序"""
+        keys, expected = inventory_page.sort_and_verify(sort_value)
+        assert keys == expected
+        assert len(keys) == 6
+
+    def test_already_sorted_list_does_not_wait_for_change(self, inventory_page):
+        """测试默认已按名称排序时选择az不会等待到超时"""
+        start = time.perf_counter()
+        inventory_page.sort_and_verify("az", timeout=2)
+        assert time.perf_counter() - start < 1
+
+    def test_unknown_sort_option_is_rejected(self, inventory_page):
+        """测试不支持的排序选项抛出ProductException"""
+        with pytest.raises(ProductException):
+            inventory_page.sort_and_verify("price")
@@ -0,0 +1,135 @@
+"""
+实时进度面板测试 - 按用户/功能汇总进度、按历史耗时估算剩余时间、刷新频率上限
+"""
+import sys
+import os
+import io
+from types import SimpleNamespace
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from config import USERNAMES
+from reports.live_progress import ProgressDashboard, case_of
+from reports.result_store import ResultStore
+from reports.test_reporter import TestResult as ResultRecord
+
+NODEIDS = [f"tests/test_saucedemo.py::TestSauceDemo::{function}[{index}]"
+           for function in ("test_01_login_success", "test_14_complete_checkout_flow")
+           for index in range(len(USERNAMES))]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class Terminal(io.StringIO):
+    def isatty(self):
+        return True
+
+
+def report(nodeid, when="call", outcome="passed", duration=1.0):
+    return SimpleNamespace(nodeid=nodeid, when=when, duration=duration, passed=outcome == "passed",
+                           failed=outcome == "failed")
+
+
+def dashboard(stream=None, interval=0.5):
+    clock = FakeClock()
+    panel = ProgressDashboard(stream=stream or Terminal(), interval=interval, clock=clock)
+    panel._started = clock.now
+    panel.set_cases((nodeid, case_of(nodeid)) for nodeid in NODEIDS)
+    return panel, clock
+
+
+class TestLiveProgress:
+    """实时进度面板测试类"""
+
+    def test_progress_per_user_and_function(self):
+        """测试总进度、按用户和按功能的进度、失败数和吞吐"""
+        panel, clock = dashboard()
+        clock.now += 30
+        panel.record(report(NODEIDS[0]))
+        panel.record(report(NODEIDS[1], outcome="failed"))
+        panel.record(report(NODEIDS[2], when="setup", outcome="skipped"))
+        panel.record(report(NODEIDS[3], when="setup"))  # setup通过，用例尚未完成
+
+        header, *rest = panel.render()
+        assert header.startswith(f"进度 3/{len(NODEIDS)}")
+        assert "失败 1" in header
+        assert "吞吐 6.0 用例/分" in header
+        assert any(line.strip().startswith(USERNAMES[1]) and "失败 1" in line for line in rest)
+        assert any("01 2/2✗" in line and "14 1/2 " in line for line in rest)
+        assert case_of(NODEIDS[1]) == ("test_01_login_success", USERNAMES[1])
+
+    def test_cases_from_collected_items(self):
+        """测试用户取自参数化参数user_count，与nodeid中的参数化id格式无关"""
+        items = [SimpleNamespace(nodeid="tests/test_saucedemo.py::TestSauceDemo::test_01_login_success[user-a]",
+                                 name="test_01_login_success[user-a]", originalname="test_01_login_success",
+                                 callspec=SimpleNamespace(params={"user_count": len(USERNAMES) + 1})),
+                 SimpleNamespace(nodeid="tests/test_saucedemo.py::TestSauceDemo::test_00_smoke",
+                                 name="test_00_smoke", originalname="test_00_smoke")]
+        panel = ProgressDashboard(stream=Terminal())
+        panel.pytest_collection_finish(SimpleNamespace(items=items))
+        assert list(panel._cases.values()) == [("test_01_login_success", USERNAMES[1]), ("test_00_smoke", "-")]
+
+    def test_eta_from_historical_durations(self, tmp_path):
+        """测试剩余时间按历史耗时估算，并按已完成用例的实际速度校正(体现并行)"""
+        db_path = str(tmp_path / "results.db")
+        with ResultStore(db_path) as store:
+            store.save_run([ResultRecord(test_name=case_of(nodeid)[0], username=case_of(nodeid)[1],
+                                         status="PASSED", execution_time="", duration=10.0)
+                            for nodeid in NODEIDS])
+        panel, clock = dashboard(interval=3600)
+        panel.start(db_path=db_path)
+        panel._started = clock.now
+        try:
+            assert panel.eta(clock.now) == 10.0 * len(NODEIDS)
+            clock.now += 5  # 两个worker并行，10秒的用例各用了5秒墙钟时间
+            panel.record(report(NODEIDS[0], duration=10.0))
+            assert panel.eta(clock.now) == 10.0 * (len(NODEIDS) - 1) / 2
+        finally:
+            panel.stop()
+
+    def test_eta_without_history_uses_observed_rate(self):
+        """测试没有历史时按本次运行的速度估算，尚无完成用例时无法估算"""
+        panel, clock = dashboard()
+        assert panel.eta(clock.now) is None
+        clock.now += 4
+        panel.record(report(NODEIDS[0], duration=4.0))
+        assert panel.eta(clock.now) == 4.0 * (len(NODEIDS) - 1)
+
+    def test_refresh_rate_is_bounded(self):
+        """测试刷新间隔内的重复刷新不重绘，日志输出在面板上方"""
+        terminal = Terminal()
+        panel, clock = dashboard(terminal)
+        for _ in range(100):
+            panel.refresh()
+        assert panel.stats["renders"] == 1
+        clock.now += 0.5
+        assert panel.refresh()
+        assert panel.stats["renders"] == 2
+
+        panel._ticker = object()  # 面板运行中
+        panel.console.write("WARNING 登出失败\n")
+        output = terminal.getvalue()
+        assert output.rindex("WARNING 登出失败") < output.rindex("进度 0/")
+        assert panel.stats["renders"] == 3
+
+    def test_slowest_running_case_and_action(self):
+        """测试显示耗时最长的进行中用例和场景动作"""
+        panel, clock = dashboard()
+        panel.case_started(NODEIDS[0])
+        clock.now += 2
+        panel.case_started(NODEIDS[1])
+        with panel.action("fill_checkout_info"):
+            clock.now += 1.5
+            assert panel.render()[-1] == "最慢进行中: test_01_login_success[0] 3.5s  动作 fill_checkout_info 1.5s"
+        panel.case_finished(NODEIDS[0])
+        panel.case_finished(NODEIDS[1])
+        assert not panel.render()[-1].startswith("最慢进行中")
@@ -0,0 +1,87 @@
+"""
+负载模式测试 - 基于本地桩驱动回放结账流程
+"""
+import sys
+import os
+import threading
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core.browser_pool import BrowserPool
+from core.exceptions import ProductException
+from core.load_generator import LoadGenerator, Scenario, ScenarioStep, CHECKOUT_SCENARIO
+from core.stub_driver import StubDriverServer
+from core.webdriver_utils import WebDriverManager
+
+
+@pytest.fixture
+def stub_pool():
+    """连接本地桩驱动的浏览器池"""
+    with StubDriverServer() as server:
+        pool = BrowserPool(3, factory=lambda: WebDriverManager.create_remote_driver(server.url))
+        yield pool
+        pool.close()
+
+
+class TestLoadGenerator:
+    """负载生成器测试类"""
+
+    def test_checkout_flow_under_load(self, stub_pool):
+        """测试多个虚拟用户并发完成结账流程"""
+        report = LoadGenerator(CHECKOUT_SCENARIO, virtual_users=3, ramp_up=0.2, browser_pool=stub_pool).run()
+
+        assert report.iterations == 3
+        assert report.failed_iterations == 0, f"存在失败迭代: {dict(report.errors)}"
+        assert report.throughput > 0
+        summary = report.step_summary()
+        assert list(summary) == [step.name for step in CHECKOUT_SCENARIO.steps]
+        assert all(stats["count"] == 3 and stats["p99"] >= stats["p50"] > 0 for stats in summary.values())
+        assert stub_pool.stats["created"] == 3
+
+    def test_errors_are_broken_down_by_step(self, stub_pool):
+        """测试错误按步骤和异常类型分类统计"""
+        def broken_step(driver, context):
+            raise ProductException("模拟失败")
+
+        scenario = Scenario("broken", CHECKOUT_SCENARIO.steps[:1] + [ScenarioStep("broken_step", broken_step)])
+        report = LoadGenerator(scenario, virtual_users=2, iterations=2, browser_pool=stub_pool).run()
+
+        assert report.failed_iterations == 4
+        assert report.errors == {"broken_step: ProductException": 4}
+        assert stub_pool.stats["discarded"] == 4
+
+    def test_failed_iteration_continues_on_fresh_browser(self, stub_pool):
+        """测试迭代失败后丢弃浏览器，后续迭代在新借用的浏览器上执行"""
+        drivers = []
+
+        def flaky_step(driver, context):
+            drivers.append(driver)
+            if len(drivers) == 1:
+                raise ProductException("模拟失败")
+
+        scenario = Scenario("flaky", CHECKOUT_SCENARIO.steps[:1] + [ScenarioStep("flaky_step", flaky_step)])
+        report = LoadGenerator(scenario, virtual_users=1, iterations=3, browser_pool=stub_pool).run()
+
+        assert (report.iterations, report.failed_iterations) == (3, 1)
+        assert drivers[1] is not drivers[0] and drivers[2] is drivers[1]
+        assert (stub_pool.stats["created"], stub_pool.stats["discarded"]) == (2, 1)
+
+    def test_discard_wakes_waiting_acquire(self, stub_pool):
+        """测试池满时等待的借用者在其他浏览器被丢弃后创建新浏览器，不会一直阻塞"""
+        drivers = [stub_pool.acquire() for _ in range(stub_pool.size)]
+        acquired = []
+        waiter = threading.Thread(target=lambda: acquired.append(stub_pool.acquire()), daemon=True)
+        waiter.start()
+        waiter.join(0.2)
+        assert not acquired
+
+        stub_pool.release(drivers.pop(), discard=True)
+        waiter.join(10)
+        assert len(acquired) == 1 and stub_pool.stats["created"] == stub_pool.size + 1
+        for driver in drivers + acquired:
+            stub_pool.release(driver)
@@ -0,0 +1,98 @@
+"""
+运行指标测试 - OpenMetrics文本格式、本地HTTP端点、场景动作/WebDriver命令/浏览器池指标
+"""
+import sys
+import os
+import urllib.error
+import urllib.request
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from config import PASSWORD
+from core.browser_pool import BrowserPool
+from core.dirty_state import dirty_state
+from core.metrics import RunMetrics, MetricsServer, run_metrics, CONTENT_TYPE
+from core.scenario_engine import ScenarioRunner, Scenario, Step
+from core.stub_driver import StubDriverServer
+from core.webdriver_utils import WebDriverManager
+from pages.page_objects import LoginPage, InventoryPage
+
+
+def sample(text, line_prefix):
+    """取出以line_prefix开头的样本值"""
+    for line in text.splitlines():
+        if line.startswith(line_prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+class TestMetrics:
+    """运行指标测试类"""
+
+    def test_openmetrics_text_format(self):
+        """测试计数器、直方图的OpenMetrics文本格式"""
+        metrics = RunMetrics()
+        metrics.tests.inc("passed")
+        metrics.tests.inc("passed")
+        metrics.tests.inc("failed")
+        for seconds in (0.07, 0.3, 100):
+            metrics.action_duration.observe(seconds, 'add "x"')
+        text = metrics.render()
+
+        assert "# TYPE saucedemo_tests counter" in text
+        assert sample(text, 'saucedemo_tests_total{status="passed"}') == 2
+        assert sample(text, 'saucedemo_action_duration_seconds_bucket{action="add \\"x\\"",le="0.1"}') == 1
+        assert sample(text, 'saucedemo_action_duration_seconds_bucket{action="add \\"x\\"",le="60.0"}') == 2
+        assert sample(text, 'saucedemo_action_duration_seconds_bucket{action="add \\"x\\"",le="+Inf"}') == 3
+        assert sample(text, 'saucedemo_action_duration_seconds_count{action="add \\"x\\""}') == 3
+        assert text.endswith("# EOF\n")
+
+    def test_endpoint_serves_live_scenario_metrics(self, tmp_path):
+        """测试运行期间端点返回场景动作耗时和WebDriver命令数，结束时写出文件"""
+        with StubDriverServer() as server, MetricsServer(run_metrics) as endpoint:
+            driver = WebDriverManager.create_remote_driver(server.url)
+            try:
+                LoginPage(driver).login("standard_user", PASSWORD)
+                before = urllib.request.urlopen(endpoint.url).read().decode("utf-8")
+                ScenarioRunner(driver, "standard_user").run(
+                    Scenario("test_metric", "指标", steps=[Step("add_product", 0)], expect={"cart_count": 1}))
+                InventoryPage(driver).reset_app_state(dirty_state.pop(driver))
+
+                with urllib.request.urlopen(endpoint.url) as response:
+                    assert response.headers["Content-Type"] == CONTENT_TYPE
+                    after = response.read().decode("utf-8")
+            finally:
+                WebDriverManager.close_driver(driver)
+
+        count = 'saucedemo_action_duration_seconds_count{action="add_product"}'
+        assert sample(after, count) == sample(before, count) + 1
+        commands = 'saucedemo_webdriver_commands_total{command="findElement"}'
+        assert sample(after, commands) > sample(before, commands)
+
+        filepath = run_metrics.write(str(tmp_path))
+        with open(filepath, encoding="utf-8") as f:
+            assert f.read().endswith("# EOF\n")
+
+    def test_browser_pool_utilisation(self):
+        """测试浏览器池的容量和借出数作为gauge导出"""
+        with StubDriverServer() as server:
+            pool = BrowserPool(2, factory=lambda: WebDriverManager.create_remote_driver(server.url), name="metrics")
+            try:
+                with pool.browser():
+                    text = run_metrics.render()
+                    assert sample(text, 'saucedemo_browser_pool_in_use{pool="metrics"}') == 1
+                    assert sample(text, 'saucedemo_browser_pool_size{pool="metrics"}') == 2
+                assert sample(run_metrics.render(), 'saucedemo_browser_pool_in_use{pool="metrics"}') == 0
+            finally:
+                pool.close()
+
+    def test_unknown_path_is_not_found(self):
+        """测试端点只提供 /metrics"""
+        with MetricsServer(RunMetrics()) as endpoint:
+            with pytest.raises(urllib.error.HTTPError):
+                urllib.request.urlopen(endpoint.url.replace("/metrics", "/other"))
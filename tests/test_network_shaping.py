@@ -0,0 +1,103 @@
+"""
+网络整形测试 - 基于本地桩驱动验证统计请求屏蔽、共享静态资源缓存和商品图片占位
+"""
+import sys
+import os
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from config import BASE_URL
+from core import network_shaping
+from core.network_shaping import NetworkShaper, WARM_CACHE, measure_page_loads
+from core.stub_driver import StubDriverServer, STATIC_ASSETS, ANALYTICS_URLS, PRODUCTS, SESSION_COOKIE
+from core.webdriver_utils import WebDriverManager
+
+
+def _load_inventory(server, shaping):
+    """启动一个新浏览器整页加载商品页，返回该会话的资源请求计数"""
+    driver = WebDriverManager.create_remote_driver(server.url, shaping=shaping)
+    try:
+        driver.get(BASE_URL + "inventory.html")
+        return dict(server.sessions[driver.session_id].network)
+    finally:
+        WebDriverManager.close_driver(driver)
+
+
+class TestNetworkShaping:
+    """网络整形测试类"""
+
+    def test_without_shaping_everything_is_downloaded(self, monkeypatch, tmp_path):
+        """测试显式关闭网络整形时即使配置开启，统计请求和图片也都经网络下载"""
+        monkeypatch.setattr(network_shaping, "NETWORK_SHAPING", True)
+        monkeypatch.setattr(network_shaping, "NETWORK_ASSET_CACHE_DIR", str(tmp_path))
+        with StubDriverServer() as server:
+            network = _load_inventory(server, False)
+            configured = _load_inventory(server, None)
+        assert network == {"fetched": len(STATIC_ASSETS) + len(ANALYTICS_URLS), "cached": 0, "blocked": 0}
+        assert configured["blocked"] == len(ANALYTICS_URLS)
+
+    def test_analytics_blocked_and_assets_shared_across_browsers(self, tmp_path):
+        """测试开启后统计请求被屏蔽，后启动的浏览器从共享缓存读取静态资源"""
+        shaping = NetworkShaper(asset_cache_dir=str(tmp_path), stub_images=False)
+        with StubDriverServer() as server:
+            first = _load_inventory(server, shaping)
+            second = _load_inventory(server, shaping)
+        assert first == {"fetched": len(STATIC_ASSETS), "cached": 0, "blocked": len(ANALYTICS_URLS)}
+        assert second == {"fetched": 0, "cached": len(STATIC_ASSETS), "blocked": len(ANALYTICS_URLS)}
+
+    def test_concurrent_browsers_use_separate_cache_dirs(self, tmp_path):
+        """测试同时运行的浏览器各自使用预热缓存的副本，退出后副本替换预热缓存并被删除"""
+        shaping = NetworkShaper(asset_cache_dir=str(tmp_path), stub_images=False)
+        with StubDriverServer() as server:
+            _load_inventory(server, shaping)
+            drivers = [WebDriverManager.create_remote_driver(server.url, shaping=shaping) for _ in range(2)]
+            cache_dirs = [server.sessions[driver.session_id].cache_dir for driver in drivers]
+            for driver in drivers:
+                driver.get(BASE_URL + "inventory.html")
+                assert server.sessions[driver.session_id].network["cached"] == len(STATIC_ASSETS)
+                WebDriverManager.close_driver(driver)
+        assert len(set(cache_dirs)) == 2 and str(tmp_path / WARM_CACHE) not in cache_dirs
+        assert os.listdir(tmp_path) == [WARM_CACHE]
+
+    def test_product_images_replaced_by_placeholders(self, tmp_path):
+        """测试开启商品图片占位后图片请求被屏蔽，并注入占位图脚本"""
+        shaping = NetworkShaper(asset_cache_dir=str(tmp_path), stub_images=True)
+        with StubDriverServer() as server:
+            driver = WebDriverManager.create_remote_driver(server.url, shaping=shaping)
+            try:
+                driver.get(BASE_URL)
+                driver.add_cookie({"name": SESSION_COOKIE, "value": "standard_user"})
+                driver.get(BASE_URL + "inventory.html")
+                session = server.sessions[driver.session_id]
+                assert session.network["blocked"] == 2 * len(ANALYTICS_URLS) + len(PRODUCTS)
+                assert any("MutationObserver" in script for script in session.init_scripts)
+            finally:
+                WebDriverManager.close_driver(driver)
+
+    def test_benchmark_shaping_cuts_network_requests(self, tmp_path):
+        """测试基准：开启网络整形后统计请求被屏蔽，后启动的浏览器直接命中共享缓存而不再下载资源"""
+        with StubDriverServer() as server:
+            def run(shaping):
+                networks = []
+
+                def factory():
+                    driver = WebDriverManager.create_remote_driver(server.url, shaping=shaping)
+                    networks.append(server.sessions[driver.session_id].network)
+                    return driver
+                assert len(measure_page_loads(factory, browsers=2)) == 6
+                return networks
+
+            baseline = run(False)
+            shaped = run(NetworkShaper(asset_cache_dir=str(tmp_path), stub_images=True))
+        assert all(network["blocked"] == 0 for network in baseline)
+        assert baseline[0]["fetched"] == baseline[1]["fetched"] > 0
+        # 三次整页加载都屏蔽统计请求，两次商品页加载屏蔽商品图片
+        blocked = 3 * len(ANALYTICS_URLS) + 2 * len(PRODUCTS)
+        assert [network["blocked"] for network in shaped] == [blocked, blocked]
+        assert shaped[0]["fetched"] < baseline[0]["fetched"]
+        assert shaped[1] == {"fetched": 0, "cached": 3 * len(STATIC_ASSETS), "blocked": blocked}
@@ -0,0 +1,96 @@
+"""
+用例重排测试 - 代价模型、依赖约束与隔离标记
+"""
+import sys
+import os
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from config import USERNAMES
+from core.test_ordering import plan_order
+
+
+class _FakeCallSpec:
+    def __init__(self, params):
+        self.params = params
+
+
+class _FakeItem:
+    """模拟pytest用例：只提供重排用到的属性"""
+
+    def __init__(self, function, user_count=None, marks=()):
+        self.originalname = function
+        self.name = function if user_count is None else f"{function}[{user_count}]"
+        if user_count is not None:
+            self.callspec = _FakeCallSpec({"user_count": user_count})
+        self._marks = [mark.mark for mark in marks]
+
+    def get_closest_marker(self, name):
+        return next((mark for mark in self._marks if mark.name == name), None)
+
+    def iter_markers(self, name):
+        return (mark for mark in self._marks if mark.name == name)
+
+    def __repr__(self):
+        return self.name
+
+
+def _parametrized(functions, marks=None):
+    """按文件定义顺序生成 函数 x 用户 的用例"""
+    marks = marks or {}
+    return [_FakeItem(function, user, marks.get(function, ())) for function in functions
+            for user in range(len(USERNAMES))]
+
+
+class TestOrderingPlan:
+    """用例重排测试类"""
+
+    def test_cases_are_grouped_by_user(self):
+        """测试同一用户的用例被排在一起，用户切换次数降到最少"""
+        items = _parametrized(["test_01", "test_02", "test_03"])
+        ordered, stats = plan_order(items)
+
+        users = [item.callspec.params["user_count"] for item in ordered]
+        assert users == sorted(users)
+        assert stats["planned_switches"] == len(USERNAMES) - 1
+        assert stats["planned_switches"] < stats["original_switches"]
+        assert stats["planned_cost"] < stats["original_cost"]
+
+    def test_non_user_items_keep_their_position(self):
+        """测试不使用登录用户的用例位置不变"""
+        unit = _FakeItem("test_unit")
+        items = [unit] + _parametrized(["test_01", "test_02"])
+        ordered, _ = plan_order(items)
+        assert ordered[0] is unit
+        assert sorted(map(repr, ordered)) == sorted(map(repr, items))
+
+    def test_dependencies_are_respected(self):
+        """测试depends_on声明的测试函数总是先执行完"""
+        items = _parametrized(["test_01", "test_02"], {"test_01": (pytest.mark.depends_on("test_02"),)})
+        ordered, _ = plan_order(items)
+
+        names = [item.originalname for item in ordered]
+        last_dependency = max(i for i, name in enumerate(names) if name == "test_02")
+        first_dependent = min(i for i, name in enumerate(names) if name == "test_01")
+        assert last_dependency < first_dependent
+
+    def test_isolated_cases_count_as_switch(self):
+        """测试isolated用例无论位置都计为一次重新登录"""
+        items = _parametrized(["test_01", "test_02"], {"test_02": (pytest.mark.isolated,)})
+        _, stats = plan_order(items)
+        assert stats["planned_switches"] == (len(USERNAMES) - 1) + len(USERNAMES)
+
+    def test_navigation_prefers_matching_start_page(self):
+        """测试结束于购物车页的用例之后优先安排从购物车页开始的用例"""
+        items = [
+            _FakeItem("test_view_cart", 0, (pytest.mark.navigation(end="cart"),)),
+            _FakeItem("test_inventory", 0),
+            _FakeItem("test_cart_only", 0, (pytest.mark.navigation(start="cart"),)),
+        ]
+        ordered, _ = plan_order(items)
+        assert [item.originalname for item in ordered] == ["test_view_cart", "test_cart_only", "test_inventory"]
@@ -0,0 +1,197 @@
+"""
+页面脚本测试 - 在真实JS引擎(Node.js)中执行页面对象注入的脚本，核对桩驱动中对应脚本处理器模拟的行为
+
+桩驱动按脚本开头的 /* 名称 */ 识别脚本并用Python实现其效果，本文件直接执行原始脚本，
+浏览器环境(document/localStorage/sessionStorage/history/事件)由下方的最小实现提供。
+未安装Node.js时跳过。
+"""
+import sys
+import os
+import json
+import shutil
+import subprocess
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from config import BASE_URL
+from core.scenario_tree import _CAPTURE_STATE_JS, _RESTORE_STATE_JS
+from core.webdriver_utils import ElementOperations
+from pages.page_objects import BasePage, InventoryPage
+from pages.state_seeding import _SEED_STATE_JS
+
+NODE = shutil.which("node")
+
+# 最小浏览器环境：env.elements 为 选择器 -> 元素描述(或元素描述列表)，元素的children同样按选择器查找
+BROWSER_JS = r"""
+var env = JSON.parse(require('fs').readFileSync(0, 'utf8'));
+var window = globalThis;
+
+function Storage(items) { this._items = Object.assign({}, items || {}); }
+Object.defineProperty(Storage.prototype, 'length', {get: function () { return Object.keys(this._items).length; }});
+Storage.prototype.key = function (i) { var keys = Object.keys(this._items); return i < keys.length ? keys[i] : null; };
+Storage.prototype.getItem = function (key) { return key in this._items ? this._items[key] : null; };
+Storage.prototype.setItem = function (key, value) { this._items[key] = String(value); };
+Storage.prototype.removeItem = function (key) { delete this._items[key]; };
+Storage.prototype.clear = function () { this._items = {}; };
+
+function Event(type, init) { this.type = type; this.bubbles = !!(init && init.bubbles); }
+function PopStateEvent(type, init) { Event.call(this, type, init); this.state = init ? init.state : null; }
+function HTMLInputElement() {}
+Object.defineProperty(HTMLInputElement.prototype, 'value', {
+    get: function () { return this._value; },
+    set: function (value) { this._value = String(value); }
+});
+window.Event = Event;
+window.PopStateEvent = PopStateEvent;
+window.HTMLInputElement = HTMLInputElement;
+
+var elements = {};
+function build(spec) {
+    var element = spec.tag === 'input' ? Object.create(HTMLInputElement.prototype) : {value: spec.value};
+    if (spec.tag === 'input') { element._value = spec.value || ''; }
+    element.textContent = spec.text || '';
+    element.events = [];
+    element.clicks = 0;
+    element.children = spec.children || {};
+    element.querySelectorAll = function (selector) { return lookup(element.children, selector); };
+    element.querySelector = function (selector) { return lookup(element.children, selector)[0] || null; };
+    element.dispatchEvent = function (event) { element.events.push(event.type); return true; };
+    element.click = function () { element.clicks += 1; };
+    return element;
+}
+function lookup(specs, selector) {
+    var spec = specs[selector];
+    if (!spec) { return []; }
+    return (Array.isArray(spec) ? spec : [spec]).map(function (item) {
+        return item._built || (item._built = build(item));
+    });
+}
+
+var cookies = Object.assign({}, env.cookies || {});
+window.document = {
+    querySelectorAll: function (selector) { return lookup(env.elements || {}, selector); },
+    querySelector: function (selector) { return lookup(env.elements || {}, selector)[0] || null; },
+    getElementById: function (id) { return document.querySelector('#' + id); }
+};
+Object.defineProperty(window.document, 'cookie', {
+    get: function () { return Object.keys(cookies).map(function (name) { return name + '=' + cookies[name]; }).join('; '); },
+    set: function (text) {
+        var pair = text.split(';')[0], index = pair.indexOf('=');
+        cookies[pair.slice(0, index)] = decodeURIComponent(pair.slice(index + 1));
+    }
+});
+window.location = {href: env.url};
+window.localStorage = new Storage(env.localStorage);
+window.sessionStorage = new Storage(env.sessionStorage);
+window.events = [];
+window.dispatchEvent = function (event) { window.events.push(event.type); return true; };
+window.history = {pushState: function (state, title, url) { window.location.href = url; }};
+
+var result = (new Function(env.script)).apply(null, env.args);
+var touched = {};
+Object.keys(env.elements || {}).forEach(function (selector) {
+    lookup(env.elements, selector).forEach(function (element) {
+        touched[selector] = {value: element.value, events: element.events, clicks: element.clicks};
+    });
+});
+process.stdout.write(JSON.stringify({
+    result: result === undefined ? null : result, url: window.location.href, cookies: cookies,
+    localStorage: window.localStorage._items, sessionStorage: window.sessionStorage._items,
+    events: window.events, elements: touched
+}));
+"""
+
+
+def run_script(script, *args, url=BASE_URL + "inventory.html", elements=None, cookies=None,
+               local_storage=None, session_storage=None):
+    """在Node.js中执行脚本，返回脚本返回值和执行后的页面状态"""
+    env = {"script": script, "args": list(args), "url": url, "elements": elements or {}, "cookies": cookies or {},
+           "localStorage": local_storage or {}, "sessionStorage": session_storage or {}}
+    completed = subprocess.run([NODE, "-e", BROWSER_JS], input=json.dumps(env), capture_output=True,
+                               text=True, encoding="utf-8", timeout=30)
+    assert completed.returncode == 0, completed.stderr
+    return json.loads(completed.stdout)
+
+
+SORT_SELECT = "select[data-test='product-sort-container']"
+CHECKOUT_FIELDS = ["#first-name", "#last-name", "#postal-code"]
+
+
+@pytest.mark.skipif(NODE is None, reason="未安装Node.js")
+class TestPageScripts:
+    """页面脚本测试类"""
+
+    def test_seed_state_writes_cookie_and_cart(self):
+        """测试seedState写入登录cookie和购物车，值为null时删除存储项"""
+        state = run_script(_SEED_STATE_JS, {"cookies": {"session-username": "standard_user"},
+                                            "localStorage": {"cart-contents": "[4,0]"}})
+        assert state["cookies"] == {"session-username": "standard_user"}
+        assert state["localStorage"] == {"cart-contents": "[4,0]"}
+
+        state = run_script(_SEED_STATE_JS, {"localStorage": {"cart-contents": None}},
+                           local_storage={"cart-contents": "[4]", "other": "1"})
+        assert state["localStorage"] == {"other": "1"}
+
+    def test_audit_state_and_product_order(self):
+        """测试auditState和productOrder读取购物车、排序选项、URL和商品名称/价格"""
+        elements = {SORT_SELECT: {"value": "lohi"}, ".inventory_item": [
+            {"children": {".inventory_item_name": {"text": "Sauce Labs Onesie"},
+                          ".inventory_item_price": {"text": "$7.99"}}},
+            {"children": {".inventory_item_name": {"text": "Sauce Labs Bike Light"},
+                          ".inventory_item_price": {"text": "$9.99"}}},
+        ]}
+        state = run_script(InventoryPage._AUDIT_STATE_JS, elements=elements, local_storage={"cart-contents": "[4]"})
+        assert state["result"] == {"cart": "[4]", "sort": "lohi", "url": BASE_URL + "inventory.html"}
+        state = run_script(InventoryPage._PRODUCT_ORDER_JS, elements=elements)
+        assert state["result"] == {"sort": "lohi", "products": [{"name": "Sauce Labs Onesie", "price": 7.99},
+                                                                {"name": "Sauce Labs Bike Light", "price": 9.99}]}
+
+        state = run_script(InventoryPage._AUDIT_STATE_JS, url=BASE_URL + "cart.html")
+        assert state["result"] == {"cart": None, "sort": None, "url": BASE_URL + "cart.html"}
+        assert run_script(InventoryPage._PRODUCT_ORDER_JS)["result"] == {"sort": None, "products": []}
+
+    def test_capture_and_restore_state(self):
+        """测试captureState导出URL和两种存储，restoreState清空后按检查点恢复"""
+        state = run_script(_CAPTURE_STATE_JS, local_storage={"cart-contents": "[4]"}, session_storage={"s": "1"})
+        assert state["result"] == {"url": BASE_URL + "inventory.html", "localStorage": {"cart-contents": "[4]"},
+                                   "sessionStorage": {"s": "1"}}
+
+        state = run_script(_RESTORE_STATE_JS, {"localStorage": {"cart-contents": "[0]"}, "sessionStorage": {}},
+                           local_storage={"cart-contents": "[4]", "stale": "1"}, session_storage={"s": "1"})
+        assert state["localStorage"] == {"cart-contents": "[0]"}
+        assert state["sessionStorage"] == {}
+
+    def test_route_to_pushes_state_only_inside_the_app(self):
+        """测试routeTo在SPA内pushState并触发popstate，不在应用源或应用未加载时返回false"""
+        root = {"#root": {}}
+        state = run_script(BasePage._ROUTE_TO_JS, BASE_URL + "cart.html", BASE_URL, elements=root)
+        assert state["result"] is True
+        assert state["url"] == BASE_URL + "cart.html"
+        assert state["events"] == ["popstate"]
+
+        state = run_script(BasePage._ROUTE_TO_JS, BASE_URL + "cart.html", BASE_URL, url="about:blank", elements=root)
+        assert (state["result"], state["url"], state["events"]) == (False, "about:blank", [])
+        assert run_script(BasePage._ROUTE_TO_JS, BASE_URL + "cart.html", BASE_URL)["result"] is False
+
+    def test_fill_form_sets_values_and_submits(self):
+        """测试fillForm通过原生setter赋值并派发input/change事件，全部读回一致才点击提交，缺少字段时不提交"""
+        elements = {selector: {"tag": "input"} for selector in CHECKOUT_FIELDS}
+        elements["#continue"] = {}
+        fields = [{"selector": selector, "value": value} for selector, value in zip(CHECKOUT_FIELDS, ["Test", "User", "1"])]
+
+        state = run_script(ElementOperations._FILL_FORM_JS, fields, "#continue", elements=elements)
+        assert state["result"] == {"values": {"#first-name": "Test", "#last-name": "User", "#postal-code": "1"},
+                                   "missing": [], "submitted": True}
+        assert state["elements"]["#first-name"]["events"] == ["input", "change"]
+        assert state["elements"]["#continue"]["clicks"] == 1
+
+        del elements["#postal-code"]
+        state = run_script(ElementOperations._FILL_FORM_JS, fields, "#continue", elements=elements)
+        assert state["result"]["missing"] == ["#postal-code"]
+        assert state["result"]["submitted"] is False
+        assert state["elements"]["#continue"]["clicks"] == 0
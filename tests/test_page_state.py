@@ -0,0 +1,76 @@
+"""
+页面状态机测试 - 跟随页面对象操作记录当前页面，按最短路径导航，状态不确定时才查询浏览器
+"""
+import sys
+import os
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core.exceptions import TestException as ScenarioError
+from core.page_state import page_state, shortest_path, transition, CLICK, ROUTE, LOAD
+from pages.page_objects import LoginPage, InventoryPage, CartPage, CheckoutPage
+
+
+def url_queries(server):
+    return server.stats["commands"].get("current_url", 0)
+
+
+class TestPageState:
+    """页面状态机测试类"""
+
+    def test_shortest_path(self):
+        """测试导航路径规划：已在目标页不跳转，有按钮时点击，否则路由，不在应用中时整页加载"""
+        assert shortest_path("cart.html", "cart.html") == []
+        assert [(e.kind, e.target) for e in shortest_path("cart.html", "inventory.html")] == [(CLICK, "inventory.html")]
+        assert [e.kind for e in shortest_path("checkout-step-one.html", "inventory.html")] == [ROUTE]
+        assert [e.kind for e in shortest_path(None, "")] == [LOAD]
+        with pytest.raises(ScenarioError):
+            shortest_path("inventory.html", "inventory-item.html")
+
+    def test_flow_is_tracked_without_querying_browser(self, logged_in_stub):
+        """测试页面对象操作引起的跳转都被记录，整个流程不读取current_url"""
+        server, driver = logged_in_stub.server, logged_in_stub.driver
+        server.reset_stats()
+        inventory_page = InventoryPage(driver)
+        inventory_page.go_to_cart()
+        CartPage(driver).checkout()
+        CheckoutPage(driver).cancel_checkout()
+        assert page_state.peek(driver) == "cart.html"
+        CartPage(driver).continue_shopping()
+        inventory_page.reset_app_state()
+        inventory_page.logout()
+        LoginPage(driver)
+        assert url_queries(server) == 0
+        assert page_state.peek(driver) == ""
+        assert driver.current_url == server.base_url
+
+    def test_uncertain_state_queries_browser_once(self, logged_in_stub):
+        """测试状态不确定时查询一次浏览器，之后按记录判断"""
+        server, driver = logged_in_stub.server, logged_in_stub.driver
+        page = InventoryPage(driver)
+        page.go_to_cart()
+        page_state.forget(driver)
+        server.reset_stats()
+        page.go_to("inventory.html")
+        page.go_to("inventory.html")
+        assert url_queries(server) == 1
+        assert driver.current_url.endswith("inventory.html")
+
+    def test_failed_action_marks_state_uncertain(self, logged_in_stub):
+        """测试页面对象操作失败时状态标记为不确定"""
+        driver = logged_in_stub.driver
+
+        class Broken(InventoryPage):
+            @transition("cart.html")
+            def go_to_cart(self):
+                raise ScenarioError("点击失败")
+
+        with pytest.raises(ScenarioError):
+            Broken(driver).go_to_cart()
+        assert page_state.peek(driver) is None
+        assert page_state.current(driver) == "inventory.html"
@@ -0,0 +1,91 @@
+"""
+失败重跑测试 - 失败场景在浏览器池的独立浏览器上重跑，并区分偶发失败与稳定失败
+"""
+import sys
+import os
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core.rerun import RerunManager, FLAKY, CONSISTENT
+from core.scenario_engine import ACTIONS, Scenario, Step
+from core.stub_driver import StubDriverServer
+from core.webdriver_utils import WebDriverManager
+from reports.test_reporter import TestReporter as ResultReporter, TestResult as ResultRecord
+from scenarios import SAUCEDEMO_SCENARIOS
+
+
+@pytest.fixture
+def manager():
+    """使用桩驱动浏览器池的重跑管理器"""
+    with StubDriverServer() as server:
+        reporter = ResultReporter()
+        manager = RerunManager(max_attempts=2, pool_size=2, reporter=reporter,
+                               factory=lambda: WebDriverManager.create_remote_driver(server.url))
+        try:
+            yield manager, reporter
+        finally:
+            manager.close()
+
+
+def _failed_result(name):
+    return ResultRecord(test_name=name, username="standard_user", status="FAILED", execution_time="")
+
+
+class TestRerun:
+    """失败重跑测试类"""
+
+    def test_flaky_and_consistent_failures_are_classified(self, manager, monkeypatch):
+        """测试重跑通过记为偶发失败，重跑仍失败记为稳定失败"""
+        manager, reporter = manager
+        calls = []
+
+        def fail_once(runner):
+            calls.append(runner.driver)
+            assert len(calls) > 1, "首次执行失败"
+
+        monkeypatch.setitem(ACTIONS, "fail_once", fail_once)
+        flaky = _failed_result("test_flaky")
+        broken = _failed_result("test_broken")
+        reporter.add_test_result(flaky)
+        reporter.add_test_result(broken)
+
+        manager.submit(flaky, Scenario("test_flaky", "首次失败", steps=[Step("fail_once")]), "standard_user")
+        manager.submit(broken, Scenario("test_broken", "始终失败", steps=[Step("add_product", 0)],
+                                        expect={"cart_count": 2}), "standard_user")
+        manager.wait()
+
+        assert (flaky.rerun_status, flaky.rerun_attempts) == (FLAKY, 2)
+        assert (broken.rerun_status, broken.rerun_attempts) == (CONSISTENT, 2)
+        summary = reporter.get_test_summary()
+        assert (summary["flaky"], summary["consistent_failures"]) == (1, 1)
+        # 每次失败都丢弃浏览器，重跑总在全新的浏览器上执行
+        assert manager._pool.stats["discarded"] == 3
+
+    def test_rerun_starts_from_clean_session(self, manager):
+        """测试复用池中浏览器重跑时不继承上一次的购物车和登录态"""
+        manager, _ = manager
+        by_name = {scenario.name: scenario for scenario in SAUCEDEMO_SCENARIOS}
+        for name in ("test_03_add_multiple_products_to_cart", "test_02_add_single_product_to_cart"):
+            result = _failed_result(name)
+            manager.submit(result, by_name[name], "visual_user").result()
+            assert result.rerun_status == FLAKY and result.rerun_attempts == 1
+        assert manager._pool.stats["created"] == 1
+
+    def test_submit_after_close_restarts_pool(self, manager):
+        """测试关闭后再次提交会重新创建线程池和浏览器池"""
+        manager, _ = manager
+        scenario = {scenario.name: scenario for scenario in SAUCEDEMO_SCENARIOS}["test_02_add_single_product_to_cart"]
+        first = _failed_result("test_first")
+        manager.submit(first, scenario, "standard_user").result()
+        manager.close()
+        assert manager._executor is None and manager._pool is None
+
+        second = _failed_result("test_second")
+        manager.submit(second, scenario, "standard_user").result()
+        assert second.rerun_status == FLAKY
+        assert manager.stats[FLAKY] == 2
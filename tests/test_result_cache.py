@@ -0,0 +1,122 @@
+"""
+结果缓存测试 - 缓存键随测试源码、用到的代码、用户和目标版本变化，通过结果的回放、有效期与失效
+"""
+import sys
+import os
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core.impact import ImpactMap, SourceIndex
+from reports.result_cache import ResultCache, case_source
+from reports.test_reporter import TestResult as ResultRecord
+from scenarios.saucedemo import SAUCEDEMO_SCENARIOS
+
+NODEID = "tests/test_saucedemo.py::TestSauceDemo::test_01_login_success[0]"
+PAGE_SOURCE = '''\
+from config import PASSWORD
+
+
+class LoginPage:
+    USERNAME_INPUT = (By.ID, "user-name")
+
+    def login(self):
+        self.find(self.USERNAME_INPUT)
+        return PASSWORD, 1
+
+    def logout(self):
+        return 2
+'''
+CONFIG_SOURCE = '''\
+PASSWORD = "secret_sauce"
+TIMEOUT = 10
+'''
+
+
+def cache(tmp_path, source=PAGE_SOURCE, ttl=60, config_source=CONFIG_SOURCE):
+    """影响记录中用例只用到LoginPage.login的缓存，页面和配置源码可替换"""
+    impact_map_path = str(tmp_path / "impact_map.json")
+    ImpactMap(cases={NODEID: {"pages/p.py::LoginPage.login"}}).save(impact_map_path)
+    result_cache = ResultCache(directory=str(tmp_path / "cache"), ttl=ttl, impact_map_path=impact_map_path)
+    index = SourceIndex()
+    index.add_source("pages/p.py", source)
+    index.add_source("config/config.py", config_source)
+    result_cache._impact_map = ImpactMap.load(impact_map_path)
+    result_cache._index = index
+    return result_cache
+
+
+def passed_result():
+    return ResultRecord(test_name="test_01_login_success", username="standard_user", status="PASSED",
+                        execution_time="2026-10-18 02:00:00", description="测试用户登录成功", duration=3.5)
+
+
+class TestResultCache:
+    """结果缓存测试类"""
+
+    def test_key_covers_source_used_code_user_and_build(self, tmp_path):
+        """测试缓存键随测试源码、用到的代码、用户和目标版本变化，未用到的代码不影响键"""
+        key = cache(tmp_path).key(NODEID, "source", "standard_user", "build-1")
+        assert key == cache(tmp_path).key(NODEID, "source", "standard_user", "build-1")
+        assert key != cache(tmp_path).key(NODEID, "source2", "standard_user", "build-1")
+        assert key != cache(tmp_path).key(NODEID, "source", "visual_user", "build-1")
+        assert key != cache(tmp_path).key(NODEID, "source", "standard_user", "build-2")
+        assert key != cache(tmp_path, PAGE_SOURCE.replace("PASSWORD, 1", "PASSWORD, 3")).key(
+            NODEID, "source", "standard_user", "build-1")
+        assert key == cache(tmp_path, PAGE_SOURCE.replace("return 2", "return 3")).key(
+            NODEID, "source", "standard_user", "build-1")
+
+    def test_key_covers_constants_used_code_references(self, tmp_path):
+        """测试用到的代码引用的配置项和定位器改动时键变化，未被引用的配置项不影响键"""
+        key = cache(tmp_path).key(NODEID, "source", "standard_user", "build-1")
+        assert key != cache(tmp_path, config_source=CONFIG_SOURCE.replace("secret_sauce", "other")).key(
+            NODEID, "source", "standard_user", "build-1")
+        assert key != cache(tmp_path, PAGE_SOURCE.replace('"user-name"', '"username"')).key(
+            NODEID, "source", "standard_user", "build-1")
+        assert key == cache(tmp_path, config_source=CONFIG_SOURCE.replace("10", "20")).key(
+            NODEID, "source", "standard_user", "build-1")
+
+    def test_case_without_impact_record_is_uncacheable(self, tmp_path):
+        """测试不在影响记录中的用例没有缓存键"""
+        result_cache = cache(tmp_path)
+        assert result_cache.key(NODEID.replace("[0]", "[1]"), "source", "visual_user", "build-1") is None
+        assert result_cache.stats["uncacheable"] == 1
+
+    def test_scenario_definition_is_part_of_case_source(self):
+        """测试场景用例共用同一个函数体，源码中包含各自的场景定义"""
+        def scenario_test(self):
+            pass
+        first, second = scenario_test, lambda self: None
+        first.scenario, second.scenario = SAUCEDEMO_SCENARIOS[0], SAUCEDEMO_SCENARIOS[1]
+        assert repr(SAUCEDEMO_SCENARIOS[0]) in case_source(first)
+        assert case_source(first) != case_source(second)
+
+    def test_store_lookup_and_replay(self, tmp_path):
+        """测试缓存通过结果后命中并回放为本次运行的通过结果"""
+        result_cache = cache(tmp_path)
+        key = result_cache.key(NODEID, "source", "standard_user", "build-1")
+        assert result_cache.lookup(key) is None
+        result_cache.store(key, passed_result())
+
+        entry = cache(tmp_path).lookup(key)
+        replayed = ResultCache.replay(entry)
+        assert (replayed.test_name, replayed.username, replayed.status) == \
+            ("test_01_login_success", "standard_user", "PASSED")
+        assert replayed.cached_from == "2026-10-18 02:00:00"
+        assert replayed.duration == 0.0
+
+    def test_expired_and_invalidated_entries_miss(self, tmp_path):
+        """测试过期条目被删除，失败后删除的条目不再命中"""
+        result_cache = cache(tmp_path)
+        key = result_cache.key(NODEID, "source", "standard_user", "build-1")
+        result_cache.store(key, passed_result())
+        assert result_cache.lookup(key, ttl=-1) is None
+        assert result_cache.stats["expired"] == 1
+        assert result_cache.lookup(key) is None
+
+        result_cache.store(key, passed_result())
+        result_cache.invalidate(key)
+        assert result_cache.lookup(key) is None
+        assert result_cache.stats["invalidated"] == 1
@@ -0,0 +1,74 @@
+"""
+历史结果库测试 - 趋势、最慢N个、不稳定率查询
+"""
+import sys
+import os
+from datetime import datetime, timedelta
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from reports.result_store import ResultStore
+from reports.test_reporter import TestResult as ResultRecord
+
+
+def _result(test_name, username, status="PASSED", duration=1.0):
+    return ResultRecord(test_name=test_name, username=username, status=status,
+                        execution_time="", duration=duration)
+
+
+class TestResultStore:
+    """历史结果库测试类"""
+
+    def test_trend_slowest_and_flakiness(self, tmp_path):
+        """测试趋势线、最慢N个和不稳定率"""
+        with ResultStore(str(tmp_path / "results.db")) as store:
+            now = datetime.now()
+            statuses = ["PASSED", "FAILED", "PASSED", "PASSED"]
+            for day, status in enumerate(statuses):
+                store.save_run([
+                    _result("test_01_login_success", "standard_user", duration=1.0 + day),
+                    _result("test_14_complete_checkout_flow", "standard_user", status, duration=5.0),
+                ], started_at=now - timedelta(days=len(statuses) - day))
+
+            trend = store.duration_trend("test_01_login_success", days=30)
+            assert [row["avg_duration"] for row in trend] == [1.0, 2.0, 3.0, 4.0]
+
+            slowest = store.slowest(n=1, days=30)
+            assert slowest[0]["test_name"] == "test_14_complete_checkout_flow"
+
+            flaky = store.flakiness(days=30)[0]
+            assert flaky["test_name"] == "test_14_complete_checkout_flow"
+            assert flaky["flips"] == 2 and flaky["failed"] == 1
+            assert round(flaky["flaky_rate"], 1) == 66.7
+
+            slowdowns = store.slowdowns(days=2, baseline_days=10)
+            assert slowdowns[0]["test_name"] == "test_01_login_success"
+
+    def test_window_queries_use_indexes(self, tmp_path):
+        """测试时间窗口查询按索引读取结果表，历史数据增长时不需要读取整张表"""
+        with ResultStore(str(tmp_path / "results.db")) as store:
+            start = datetime.now() - timedelta(days=90)
+            tests = [f"test_{i:02d}" for i in range(1, 18)]
+            for day in range(90):
+                store.save_run(
+                    [_result(name, user, duration=day % 7) for name in tests
+                     for user in ("standard_user", "visual_user")],
+                    started_at=start + timedelta(days=day),
+                )
+
+            # 把查询替换为EXPLAIN QUERY PLAN，收集每个查询读取results表的方式
+            plans = []
+            query = store._query
+            store._query = lambda sql, params=(): plans.append(query("EXPLAIN QUERY PLAN " + sql, params)) or []
+            store.duration_trend("test_05", days=7)
+            store.slowest(n=10, days=7)
+            store.flakiness(days=30)
+            store.slowdowns(days=7)
+            store.average_durations(days=30)
+
+            for plan in plans:
+                reads = [row["detail"] for row in plan if row["detail"].startswith(("SCAN results", "SEARCH results"))]
+                assert reads and all(" INDEX " in detail for detail in reads), f"未使用索引: {reads}"
@@ -0,0 +1,51 @@
+"""
+声明式场景引擎测试 - 基于本地桩驱动执行全部SauceDemo场景
+"""
+import sys
+import os
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core.dirty_state import dirty_state
+from core.exceptions import TestException as ScenarioError
+from core.scenario_engine import ScenarioRunner, Scenario, Step, compile_scenarios
+from pages.page_objects import InventoryPage
+from scenarios import SAUCEDEMO_SCENARIOS
+
+
+class TestScenarioEngine:
+    """声明式场景引擎测试类"""
+
+    @pytest.mark.parametrize("scenario", SAUCEDEMO_SCENARIOS, ids=lambda scenario: scenario.name)
+    def test_saucedemo_scenarios_pass(self, logged_in_stub, scenario):
+        """测试场景目录中的每个场景都能在桩驱动上执行通过"""
+        driver = logged_in_stub.driver
+        ScenarioRunner(driver, "standard_user").run(scenario)
+        InventoryPage(driver).reset_app_state(dirty_state.pop(driver))
+
+    def test_failed_postcondition_raises_assertion(self, logged_in_stub):
+        """测试后置条件不满足时抛出AssertionError"""
+        scenario = Scenario("test_wrong_count", "购物车数量断言失败", steps=[Step("add_product", 0)],
+                            expect={"cart_count": 2})
+        driver = logged_in_stub.driver
+        try:
+            with pytest.raises(AssertionError, match="购物车数量不正确"):
+                ScenarioRunner(driver, "standard_user").run(scenario)
+        finally:
+            InventoryPage(driver).reset_app_state(dirty_state.pop(driver))
+
+    def test_unknown_action_and_name_are_rejected(self, logged_in_stub):
+        """测试未知动作和不以test_开头的场景名被拒绝"""
+        with pytest.raises(ScenarioError):
+            ScenarioRunner(logged_in_stub.driver).run(Scenario("test_bad", "未知动作", steps=[Step("fly")]))
+
+        class Holder:
+            pass
+
+        with pytest.raises(ScenarioError):
+            compile_scenarios(Holder, [Scenario("bad_name", "场景名不合法")])
@@ -0,0 +1,88 @@
+"""
+场景前缀树测试 - 共享前缀只执行一次，分支场景从检查点恢复
+"""
+import sys
+import os
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core.dirty_state import dirty_state
+from core.scenario_engine import ScenarioRunner, Scenario, Step, Given
+from core.scenario_tree import PrefixPlanner
+from pages.page_objects import InventoryPage
+from scenarios import SAUCEDEMO_SCENARIOS
+
+_CART_PREFIX = [Step("add_product", 1), Step("add_product", 2), Step("go_to_cart")]
+
+BRANCHING_SCENARIOS = [
+    Scenario("test_cart_remove", "移除商品", given=Given(cart=[0]),
+             steps=_CART_PREFIX + [Step("remove_from_cart", 0)], expect={"cart_items": 2}),
+    Scenario("test_cart_continue", "继续购物", given=Given(cart=[0]),
+             steps=_CART_PREFIX + [Step("continue_shopping")], expect={"cart_count": 3}),
+    Scenario("test_cart_checkout", "开始结账", given=Given(cart=[0]),
+             steps=_CART_PREFIX + [Step("checkout")], expect={"url_contains": "checkout-step-one"}),
+]
+
+
+def _run_all(driver, scenarios, planner):
+    for scenario in scenarios:
+        ScenarioRunner(driver, "standard_user", planner).run(scenario)
+        InventoryPage(driver).reset_app_state(dirty_state.pop(driver))
+
+
+class TestScenarioTree:
+    """场景前缀树测试类"""
+
+    def test_shared_prefix_runs_once(self, logged_in_stub):
+        """测试共享前缀只执行一次，后续分支从检查点恢复且结果正确"""
+        server, driver = logged_in_stub.server, logged_in_stub.driver
+        planner = PrefixPlanner(BRANCHING_SCENARIOS)
+        assert [planner.shared_steps(s) for s in BRANCHING_SCENARIOS] == [3, 3, 3]
+
+        server.reset_stats()
+        _run_all(driver, BRANCHING_SCENARIOS, planner)
+        shared_clicks = server.stats["commands"]["element_click"]
+
+        assert planner.stats == {"checkpoints": 1, "restores": 2, "steps_skipped": 6}
+
+        server.reset_stats()
+        _run_all(driver, BRANCHING_SCENARIOS, None)
+        assert server.stats["commands"]["element_click"] > shared_clicks
+
+    def test_volatile_prefix_is_not_checkpointed(self):
+        """测试包含页面内存状态的前缀不建立检查点(无论该步骤在前缀末尾还是中间)"""
+        scenarios = [
+            Scenario("test_a", "继续结账", given=Given(cart=[0], page="checkout-step-one.html"),
+                     steps=[Step("fill_checkout_info"), Step("continue_checkout")]),
+            Scenario("test_b", "取消结账", given=Given(cart=[0], page="checkout-step-one.html"),
+                     steps=[Step("fill_checkout_info"), Step("cancel_checkout")]),
+        ]
+        planner = PrefixPlanner(scenarios)
+        assert [planner.shared_steps(s) for s in scenarios] == [0, 0]
+
+        sorted_prefix = [Step("sort", "hilo")] + _CART_PREFIX
+        scenarios = [Scenario("test_c", "排序后移除", steps=sorted_prefix + [Step("remove_from_cart", 0)]),
+                     Scenario("test_d", "排序后继续", steps=sorted_prefix + [Step("continue_shopping")])]
+        planner = PrefixPlanner(scenarios)
+        assert [planner.shared_steps(s) for s in scenarios] == [0, 0]
+
+    def test_cheap_prefix_is_not_checkpointed(self):
+        """测试前缀执行比恢复检查点便宜时不建立检查点
+
+        场景目录中共享的前缀只有购物车页的预置(预置与恢复同样需要一次整页加载)和一次打开详情页的点击，
+        都不比恢复检查点贵，因此场景目录中没有场景建立检查点。
+        """
+        planner = PrefixPlanner(SAUCEDEMO_SCENARIOS)
+        assert [planner.shared_steps(scenario) for scenario in SAUCEDEMO_SCENARIOS] == [0] * len(SAUCEDEMO_SCENARIOS)
+
+    def test_invalidated_checkpoints_are_rebuilt(self, logged_in_stub):
+        """测试丢弃检查点(替换失效浏览器时)后，下一个分支重新执行共享前缀并重建检查点"""
+        driver = logged_in_stub.driver
+        planner = PrefixPlanner(BRANCHING_SCENARIOS)
+        _run_all(driver, BRANCHING_SCENARIOS[:1], planner)
+        planner.invalidate()
+        _run_all(driver, BRANCHING_SCENARIOS[1:], planner)
+        assert planner.stats == {"checkpoints": 2, "restores": 1, "steps_skipped": 3}
@@ -0,0 +1,68 @@
+"""
+会话健康检查测试 - 探测崩溃/卡死的浏览器，替换后重新登录
+"""
+import sys
+import os
+import time
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from config import PASSWORD
+from core.session_health import SessionHealthMonitor
+from core.stub_driver import StubDriverServer
+from core.webdriver_utils import WebDriverManager
+from pages.page_objects import LoginPage
+
+
+@pytest.fixture
+def stub():
+    """桩驱动服务器、使用它的健康检查器和一个已登录的浏览器"""
+    with StubDriverServer() as server:
+        monitor = SessionHealthMonitor(ping_deadline=0.3,
+                                       factory=lambda: WebDriverManager.create_remote_driver(server.url))
+        driver = monitor.factory()
+        LoginPage(driver).login("standard_user", PASSWORD)
+        drivers = [driver]
+        try:
+            yield server, monitor, drivers
+        finally:
+            server.latency = 0.0
+            for driver in drivers:
+                WebDriverManager.close_driver(driver)
+
+
+class TestSessionHealth:
+    """会话健康检查测试类"""
+
+    def test_healthy_session_passes_ping(self, stub):
+        """测试存活的会话探测通过"""
+        _, monitor, drivers = stub
+        assert monitor.ping(drivers[0])
+        assert monitor.stats == {"pings": 1, "dead": 0, "hung": 0, "replaced": 0}
+
+    def test_dead_session_is_replaced_and_reauthenticated(self, stub):
+        """测试浏览器崩溃时立即判定失效，替换后恢复登录态"""
+        server, monitor, drivers = stub
+        server.sessions.clear()
+        assert not monitor.ping(drivers[0])
+        assert monitor.stats["dead"] == 1
+
+        drivers.append(monitor.replace(drivers[0], "standard_user"))
+        assert "inventory" in drivers[-1].current_url
+        assert monitor.ping(drivers[-1])
+        assert monitor.stats["replaced"] == 1
+
+    def test_hung_session_is_detected_within_deadline(self, stub):
+        """测试浏览器卡死时在截止时间内判定失效"""
+        server, monitor, drivers = stub
+        server.latency = 1.0
+        start = time.perf_counter()
+        assert not monitor.ping(drivers[0])
+        assert time.perf_counter() - start < 1.0
+        assert monitor.stats["hung"] == 1
+        assert "未响应" in monitor.last_error
@@ -0,0 +1,66 @@
+"""
+状态预置测试 - 按商品索引预置购物车、深链接到目标页面、清空购物车
+"""
+import sys
+import os
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from config import BASE_URL
+from core.dirty_state import dirty_state, CART
+from core.exceptions import CheckoutException
+from core.page_state import page_state
+from pages.page_objects import InventoryPage
+from pages.state_seeding import StateSeeder, INVENTORY_ITEM_IDS
+from core.stub_driver import PRODUCTS
+
+
+class TestStateSeeding:
+    """状态预置测试类"""
+
+    def test_cart_is_seeded_by_inventory_index(self, logged_in_stub):
+        """测试购物车按默认排序下的商品索引预置，索引经INVENTORY_ITEM_IDS映射为商品id"""
+        driver = logged_in_stub.driver
+        StateSeeder(driver).seed(cart_indexes=[0, 2])
+
+        assert INVENTORY_ITEM_IDS == [product["id"] for product in PRODUCTS]
+        assert logged_in_stub.session.cart == [INVENTORY_ITEM_IDS[0], INVENTORY_ITEM_IDS[2]]
+        assert dirty_state.peek(driver) == frozenset({CART})
+        assert InventoryPage(driver).get_cart_count() == 2
+
+    @pytest.mark.parametrize("page", ["cart.html", "checkout-step-one.html", "checkout-step-two.html"])
+    def test_deep_link_opens_target_page(self, stub_browser, page):
+        """测试预置登录态和购物车后直接打开目标页面，页面状态随之记录"""
+        driver = stub_browser.driver
+        StateSeeder(driver).seed(cart_indexes=[1], username="standard_user", page=page)
+
+        assert driver.current_url == BASE_URL + page
+        assert page_state.current(driver) == page
+        assert stub_browser.session.username == "standard_user"
+        assert stub_browser.session.cart == [INVENTORY_ITEM_IDS[1]]
+
+    def test_unsupported_page_is_rejected(self, logged_in_stub):
+        """测试不支持深链接的页面被拒绝，且不写入任何状态"""
+        with pytest.raises(CheckoutException, match="不支持深链接"):
+            StateSeeder(logged_in_stub.driver).seed(cart_indexes=[0], page="checkout-complete.html")
+        assert logged_in_stub.session.cart == []
+
+    def test_empty_cart_indexes_clear_the_cart(self, logged_in_stub):
+        """测试空列表清空购物车(删除存储项)且不登记改动，None不修改购物车"""
+        driver = logged_in_stub.driver
+        seeder = StateSeeder(driver)
+        seeder.seed(cart_indexes=[0, 1])
+        dirty_state.clear(driver)
+
+        seeder.seed(cart_indexes=None, page="inventory.html")
+        assert logged_in_stub.session.cart == [INVENTORY_ITEM_IDS[0], INVENTORY_ITEM_IDS[1]]
+
+        seeder.seed(cart_indexes=[], page="inventory.html")
+        assert "cart-contents" not in logged_in_stub.session.local_storage
+        assert dirty_state.peek(driver) == frozenset()
+        assert InventoryPage(driver).get_cart_count() == 0
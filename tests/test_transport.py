@@ -0,0 +1,51 @@
+"""
+WebDriver传输层测试 - 基于本地桩驱动验证keep-alive连接复用和计数器
+"""
+import sys
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from config import PASSWORD, DRIVER_POOL_MAXSIZE
+from core.webdriver_utils import WebDriverManager
+from pages.page_objects import LoginPage, InventoryPage
+
+
+class TestTransport:
+    """WebDriver传输层测试类"""
+
+    def test_commands_reuse_keep_alive_connection(self, stub_server):
+        """测试串行命令复用同一个keep-alive连接"""
+        driver = WebDriverManager.create_remote_driver(stub_server.url)
+        try:
+            login_page = LoginPage(driver)
+            login_page.login("standard_user", PASSWORD, keystrokes=True)
+            inventory_page = InventoryPage(driver)
+            inventory_page.get_product_details(0)
+
+            stats = WebDriverManager.get_transport_stats(driver)
+            assert stats["connections_opened"] == 1, f"串行命令应只使用一个连接: {stats}"
+            assert stats["requests"] > 10
+            assert stats["reuse_rate"] > 90
+            assert stats["commands"]["findElement"] >= 3
+            assert stats["p95_latency_ms"] >= stats["p50_latency_ms"] > 0
+        finally:
+            WebDriverManager.close_driver(driver)
+
+    def test_parallel_commands_stay_within_pool(self, stub_server):
+        """测试并发命令不会超出连接池大小造成连接抖动"""
+        driver = WebDriverManager.create_remote_driver(stub_server.url)
+        try:
+            stub_server.latency = 0.005
+            with ThreadPoolExecutor(max_workers=DRIVER_POOL_MAXSIZE * 3) as executor:
+                list(executor.map(lambda _: driver.current_url, range(120)))
+
+            stats = WebDriverManager.get_transport_stats(driver)
+            assert stats["connections_opened"] <= DRIVER_POOL_MAXSIZE, f"连接数超出连接池大小: {stats}"
+            assert stub_server.stats["connections"] <= DRIVER_POOL_MAXSIZE
+        finally:
+            WebDriverManager.close_driver(driver)